@@ -6,27 +6,37 @@ Author: Minseok kim
 
 import arxiv
 
-from typing import Optional, Dict, Any, List
+import asyncio
+import httpx
+import json
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional, Dict, List, Union, Tuple
 import logging
 import os
-import tempfile
+import time
 from pathlib import Path
-from prompts import create_summary_user_prompt, create_system_summary_prompt, create_analyze_paper_content_prompt
-from langchain_openai import ChatOpenAI
-from type import ArXivMetadata, ContentChunk, ContentAnalysisResult
+from prompts import create_batch_summary_user_prompt, create_summary_user_prompt, create_system_summary_prompt, create_analyze_paper_content_prompt
+from type import ArXivMetadata, ContentChunk, ContentAnalysisResult, PackedChunk, Section
 import requests
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 
-from docling_core.types.doc import ImageRefMode, PictureItem, TableItem
-from docling.datamodel.base_models import InputFormat, DocumentStream
-
-from docling.datamodel.pipeline_options import PdfPipelineOptions
-from docling.document_converter import DocumentConverter, PdfFormatOption
-import markdown_to_json
 from uuid import uuid4
-from utils.str_utils import split_text_and_images
-from file_service import upload_file_to_oci
-from utils.str_utils import extract_image_url_from_markdown, replace_image_url_in_markdown
+from file_service import submit_upload
+from llm_cache import LLMCache
+from llm_governor import LLMGovernor
+from llm_resilience import LLMCallRunner
+from llm_router import LLMRouter
+from metrics import ABSTRACT_BATCH_RESULTS, record_llm_usage, timed
+from utils.batcher import MicroBatcher
+from utils.ttl_cache import TTLCache
+from utils.str_utils import extract_image_url_from_markdown, find_markdown_images, image_markdown, replace_markdown_images
+from utils.chunk_packer import count_tokens, pack_chunks, restore_image_placeholders
+
+if TYPE_CHECKING:
+    # docling(torch 포함)과 langchain은 import 비용이 커서 실제로 사용할 때 불러옴
+    from docling.datamodel.base_models import DocumentStream
+    from docling_core.types.doc import DoclingDocument
+    from langchain_openai import ChatOpenAI
 
 logger = logging.getLogger(__name__)
 
@@ -37,16 +47,60 @@ class ArXivRunner:
     def __init__(self):
         """ArXivRunner 초기화"""
         self.client = arxiv.Client()
-        # OpenAI API 설정
-        self.llm = ChatOpenAI(
-            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-            temperature=0.1,
-            api_key=os.getenv("OPENAI_API_KEY", "not-used"),
-            base_url=os.getenv("OPENAI_BASE_URL")
+        # 메타데이터 조회 마이크로 배치 + TTL 캐시
+        self.metadata_cache = TTLCache(
+            ttl_seconds=float(os.getenv("ARXIV_METADATA_CACHE_TTL_SECONDS", "3600")),
+            max_size=int(os.getenv("ARXIV_METADATA_CACHE_MAX_SIZE", "10000"))
+        )
+        self.metadata_batcher = MicroBatcher(
+            self._fetch_metadata_batch,
+            window_seconds=float(os.getenv("ARXIV_BATCH_WINDOW_MS", "200")) / 1000,
+            max_batch_size=int(os.getenv("ARXIV_BATCH_MAX_SIZE", "50")),
+            name="arxiv-metadata-batcher"
+        )
+        # 프롬프트 종류/토큰 수별 모델 라우팅 (라우트별 OpenAI API 클라이언트는 첫 호출 시 생성)
+        self.llm_router = LLMRouter()
+        # 프롬프트 단위 LLM 응답 캐시
+        self.llm_cache = LLMCache()
+        # 청크 분석 LLM 호출 동시 실행 수 제한
+        self.llm_max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        self.llm_executor = ThreadPoolExecutor(
+            max_workers=self.llm_max_concurrency,
+            thread_name_prefix="llm"
         )
+        # 모든 LLM 호출이 공유하는 RPM/TPM 예산 + AIMD 동시 호출 한도 (상한: LLM_MAX_CONCURRENCY)
+        self.llm_governor = LLMGovernor(max_concurrency=self.llm_max_concurrency)
+        # 프롬프트 종류(abstract, chunk)별 마감 시간/재시도/헤징
+        self.llm_calls = LLMCallRunner()
+        # 초록 요약 마이크로 배치: 짧은 시간 안에 들어온 초록들을 한 번의 LLM 호출로 요약 (기본값: 사용 안 함)
+        self.abstract_batcher: Optional[MicroBatcher[Tuple[str, str, str], Optional[str]]] = None
+        self.abstract_fallback_executor: Optional[ThreadPoolExecutor] = None
+        if os.getenv("LLM_ABSTRACT_BATCH", "false").lower() == "true":
+            # 배치에서 빠진 초록의 단독 호출은 청크 분석(llm_executor)과 스레드를 나누어 쓰지 않도록 전용 풀에서 실행
+            self.abstract_fallback_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("LLM_ABSTRACT_BATCH_FALLBACK_WORKERS", "4")),
+                thread_name_prefix="abstract-fallback"
+            )
+            self.abstract_batcher = MicroBatcher(
+                self._summary_abstract_batch,
+                window_seconds=float(os.getenv("LLM_ABSTRACT_BATCH_WINDOW_MS", "500")) / 1000,
+                max_batch_size=int(os.getenv("LLM_ABSTRACT_BATCH_MAX_SIZE", "8")),
+                name="abstract-batcher",
+                max_concurrent_batches=int(os.getenv("LLM_ABSTRACT_BATCH_CONCURRENCY", "4"))
+            )
+        # 청크 분석 프롬프트당 최대 토큰 수 (작은 조각은 합치고 큰 조각은 나눔, 0이면 패킹하지 않음)
+        self.chunk_max_tokens = int(os.getenv("LLM_CHUNK_MAX_TOKENS", "4000"))
+
+    @property
+    def llm(self) -> "ChatOpenAI":
+        """기본(OPENAI_MODEL) 라우트의 OpenAI API 클라이언트"""
+        return self.llm_router.client(self.llm_router.default_route)
+
+    @timed("arxiv.get_metadata", none_is_failure=True)
     def get_metadata(self, arxiv_id: str) -> Optional[ArXivMetadata]:
         """
         ArXiv ID로부터 논문 메타데이터를 가져옵니다.
+        짧은 시간 안에 들어온 요청들은 하나의 id_list 쿼리로 묶어서 조회합니다.
         
         Args:
             arxiv_id: ArXiv 논문 ID (예: "2301.00001" 또는 "cs.AI/2301.00001")
@@ -58,32 +112,19 @@ class ArXivRunner:
         try:
             # ArXiv ID 정규화 (버전 번호 제거)
             clean_id = arxiv_id.split('v')[0]
-            
-            # ArXiv 검색 쿼리 생성
-            search = arxiv.Search(
-                id_list=[clean_id],
-                max_results=1
-            )
-            
-            # 논문 검색
-            results = list(self.client.results(search))
-            
-            if not results:
+
+            metadata = self.metadata_cache.get(clean_id)
+            if metadata:
+                logger.info(f"메타데이터 캐시 사용: {arxiv_id}")
+                return metadata
+
+            metadata = self.metadata_batcher.get(clean_id)
+
+            if not metadata:
                 logger.warning(f"논문을 찾을 수 없습니다: {arxiv_id}")
                 return None
-            
-            paper = results[0]
-            
-            # 메타데이터 추출
-            metadata = {
-                'arxiv_id': clean_id,
-                'title': paper.title,
-                'authors': [author.name for author in paper.authors],
-                'abstract': paper.summary,
-                'updated': paper.updated.isoformat() if paper.updated else None,
-                'categories': paper.categories
-            }
-            
+
+            self.metadata_cache.set(clean_id, metadata)
             logger.info(f"메타데이터 조회 성공: {arxiv_id}")
             return metadata
             
@@ -94,6 +135,51 @@ class ArXivRunner:
             logger.error(f"메타데이터 조회 중 오류 발생: {e}")
             return None
 
+    def _fetch_metadata_batch(self, clean_ids: List[str]) -> Dict[str, ArXivMetadata]:
+        """
+        여러 ArXiv ID의 메타데이터를 하나의 id_list 쿼리로 조회합니다.
+        배치 조회가 실패하면 (잘못된 ID 포함 등) ID별로 나누어 다시 조회합니다.
+        
+        Args:
+            clean_ids: 버전 번호가 제거된 ArXiv ID 리스트
+            
+        Returns:
+            Dict[str, ArXivMetadata]: ArXiv ID -> 메타데이터 (찾지 못한 ID는 포함되지 않음)
+        """
+        search = arxiv.Search(
+            id_list=clean_ids,
+            max_results=len(clean_ids)
+        )
+
+        try:
+            results = list(self.client.results(search))
+        except arxiv.ArxivError:
+            if len(clean_ids) == 1:
+                raise
+            logger.warning(f"배치 메타데이터 조회 실패, 개별 조회로 전환: {len(clean_ids)}건")
+            metadata_map = {}
+            for clean_id in clean_ids:
+                try:
+                    metadata_map.update(self._fetch_metadata_batch([clean_id]))
+                except arxiv.ArxivError as e:
+                    logger.error(f"ArXiv API 오류: {clean_id} - {e}")
+            return metadata_map
+
+        logger.info(f"배치 메타데이터 조회: 요청 {len(clean_ids)}건, 결과 {len(results)}건")
+
+        metadata_map = {}
+        for paper in results:
+            clean_id = paper.get_short_id().split('v')[0]
+            metadata_map[clean_id] = {
+                'arxiv_id': clean_id,
+                'title': paper.title,
+                'authors': [author.name for author in paper.authors],
+                'abstract': paper.summary,
+                'updated': paper.updated.isoformat() if paper.updated else None,
+                'categories': paper.categories
+            }
+        return metadata_map
+
     def analyze_paper_content(self, pdf_url: str) -> List[ContentAnalysisResult]:
         """
         논문 본문을 요약/정리합니다.
@@ -105,30 +191,20 @@ class ArXivRunner:
             List[ContentAnalysisResult]: 논문 본문 요약/정리 결과
         """
         try:
+            from docling.datamodel.base_models import DocumentStream
 
             logging.info(f"논문 본문 요약/정리 시작: {pdf_url}")
 
             pdf_bytes = self._read_pdf_to_binary(pdf_url)
 
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_file_name = str(uuid4()) + ".pdf"
-                doc_stream = DocumentStream(
-                    name=temp_file_name,
-                    stream=pdf_bytes,
-                )
-
-                json_data = self._parse_pdf_to_json(doc_stream, temp_dir)
-
+            temp_file_name = str(uuid4()) + ".pdf"
+            doc_stream = DocumentStream(
+                name=temp_file_name,
+                stream=pdf_bytes,
+            )
 
-                result_list: List[ContentAnalysisResult] = [
-                    {
-                        "order": idx + 1,
-                        "contentTitle": title,
-                        "content": self._create_analyzed_content(split_text_and_images(content))
-                    }
-                    for idx, (title, content) in enumerate(json_data.items())
-                ]
-                return result_list
+            sections, images = self._parse_pdf_to_sections(doc_stream)
+            return self._analyze_sections(sections, images)
 
         except Exception as e:
             logger.error(f"논문 본문 요약/정리 중 오류 발생: {e}")
@@ -138,6 +214,106 @@ class ArXivRunner:
 
 
 
+    @timed("llm.analyze_sections")
+    def _analyze_sections(
+        self,
+        sections: List[Section],
+        images: Dict[str, bytes],
+        on_section_done: Optional[Callable[[ContentAnalysisResult], None]] = None,
+        uploads: Optional[Dict[str, Future]] = None,
+        completed_blocks: Optional[Dict[int, ContentAnalysisResult]] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> List[Optional[ContentAnalysisResult]]:
+        """
+        파싱된 섹션들을 LLM으로 분석합니다.
+        
+        Args:
+            sections: 문서 순서의 섹션 목록
+            images: 이미지 키 -> PNG 바이트
+            on_section_done: 섹션 하나의 분석이 끝날 때마다 (완료 순서대로) 호출되는 콜백
+            uploads: 이미 제출된 이미지 업로드 (기본값: images를 업로드)
+            completed_blocks: 이전 실행에서 완료된 섹션 (order -> 결과). 제목이 같으면 다시 분석하지 않습니다.
+            should_stop: True를 반환하면 남은 청크 분석을 취소하고 중단 (예: 작업 lease를 잃은 경우)
+            
+        Returns:
+            List[Optional[ContentAnalysisResult]]: 섹션 순서대로 정렬된 분석 결과 (중단된 경우 끝나지 않은 섹션은 None)
+        """
+        # 이미지 업로드를 먼저 시작하여 LLM 분석과 겹쳐서 진행
+        if uploads is None:
+            uploads = self._submit_image_uploads(images)
+        completed_blocks = completed_blocks or {}
+
+        # 모든 섹션의 텍스트 청크를 제출하여 LLM 호출을 병렬로 진행 (이전 실행에서 완료된 섹션은 그대로 사용)
+        result_list: List[Optional[ContentAnalysisResult]] = [None] * len(sections)
+        pending_sections = []
+        for idx, section in enumerate(sections):
+            title = section["title"]
+            done = completed_blocks.get(idx + 1)
+            if done and done["contentTitle"] == title:
+                result_list[idx] = done
+                pending_sections.append((title, None))
+            else:
+                pending_sections.append((title, self._submit_chunk_analysis(section["chunks"])))
+
+        # 섹션별 남은 청크 수를 세어, 마지막 청크가 끝난 섹션부터 결과를 조립
+        section_of: Dict[Future, int] = {}
+        remaining = [0] * len(pending_sections)
+        for idx, (_, parts) in enumerate(pending_sections):
+            for part in parts or []:
+                if isinstance(part, Future):
+                    section_of[part] = idx
+                    remaining[idx] += 1
+
+        def complete_section(idx: int):
+            title, parts = pending_sections[idx]
+            result_list[idx] = {
+                "order": idx + 1,
+                "contentTitle": title,
+                "content": self._collect_analyzed_content(parts, uploads)
+            }
+            if on_section_done:
+                try:
+                    on_section_done(result_list[idx])
+                except Exception as e:
+                    logger.error(f"섹션 완료 처리 중 오류 발생: {title} - {e}")
+
+        for idx, (_, parts) in enumerate(pending_sections):
+            if parts is not None and remaining[idx] == 0:
+                complete_section(idx)
+        for future in as_completed(section_of):
+            if should_stop and should_stop():
+                logger.warning("섹션 분석 중단: 남은 청크 분석을 취소합니다")
+                for pending in section_of:
+                    pending.cancel()
+                break
+            idx = section_of[future]
+            remaining[idx] -= 1
+            if remaining[idx] == 0:
+                complete_section(idx)
+
+        return result_list
+
+    def _submit_image_uploads(self, images: Dict[str, bytes], uploaded_urls: Optional[Dict[str, str]] = None) -> Dict[str, Future]:
+        """
+        이미지 업로드를 제출합니다.
+        
+        Args:
+            images: 이미지 키 -> 이미지 바이트
+            uploaded_urls: 이미 업로드된 이미지 키 -> 공개 URL (다시 업로드하지 않음)
+            
+        Returns:
+            Dict[str, Future]: 이미지 키 -> 업로드 Future (공개 URL)
+        """
+        uploads: Dict[str, Future] = {}
+        for key, url in (uploaded_urls or {}).items():
+            uploads[key] = Future()
+            uploads[key].set_result(url)
+        for key, data in images.items():
+            if key not in uploads:
+                uploads[key] = submit_upload(data, Path(key).suffix)
+        return uploads
+
+    @timed("pdf.download")
     def _read_pdf_to_binary(self, pdf_url: str) -> BytesIO:
         """
         웹으로 부터 PDF 파일을 바이트 스트림으로 읽어옵니다.
@@ -158,107 +334,292 @@ class ArXivRunner:
         pdf_bytes = BytesIO(response.content)
         return pdf_bytes
 
-    def _parse_pdf_to_json(self, doc_stream: DocumentStream, temp_dir: str) -> Dict[str, Any]:
+    @staticmethod
+    @timed("pdf.parse")
+    def _parse_pdf_to_sections(
+        doc_stream: "DocumentStream",
+        page_range: Optional[Tuple[int, int]] = None,
+        image_prefix: str = ""
+    ) -> Tuple[List[Section], Dict[str, bytes]]:
         """
-        PDF를 JSON으로 변환합니다.
+        PDF를 섹션 목록으로 변환합니다.
+        인스턴스 상태를 사용하지 않으므로 별도 프로세스에서도 호출할 수 있습니다.
         
         Args:
             doc_stream: DocumentStream
+            page_range: 변환할 페이지 범위 (1부터 시작, 끝 포함). None이면 전체
+            image_prefix: 이미지 키 접두어 (페이지 범위별 변환 결과를 합칠 때 키 충돌 방지)
             
         Returns:
-            Dict[str, Any]: JSON 데이터
+            Tuple[List[Section], Dict[str, bytes]]: 문서 순서의 섹션 목록, 이미지 키 -> PNG 바이트
         """
-        # 임시 디렉토리 생성
-        out_dir = Path(temp_dir)
-        temp_md_file_name = str(uuid4()) + ".md"
+        import converter_pool
 
-        # 이미지 생성 옵션 (페이지/그림/표 이미지 생성)
-        pipe_opts = PdfPipelineOptions()
-        pipe_opts.images_scale = 2.0                  # 해상도(1 ~= 72 DPI)
-        pipe_opts.generate_page_images = True
-        pipe_opts.generate_picture_images = True
+        # 워밍업된 컨버터 재사용 (그림 이미지 생성 프로필)
+        kwargs = {"page_range": page_range} if page_range else {}
+        res = converter_pool.convert(doc_stream, profile="default", **kwargs)
+        return ArXivRunner._document_to_sections(res.document, image_prefix=image_prefix)
 
-        conv = DocumentConverter(
-            format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipe_opts)}
-        )
-        res = conv.convert(doc_stream)
-
-        # doc_stream의 name을 사용하여 stem 생성
-        stem = Path(doc_stream.name).stem
-
-        # 1) 페이지 이미지 저장
-        for page_no, page in res.document.pages.items():
-            with (out_dir / f"{stem}-{page.page_no}.png").open("wb") as fp:
-                page.image.pil_image.save(fp, format="PNG")
-
-        # 2) 표/그림 이미지 저장
-        t, p = 0, 0
-        for elem, _ in res.document.iterate_items():
-            if isinstance(elem, TableItem):
-                t += 1
-                with (out_dir / f"{stem}-table-{t}.png").open("wb") as fp:
-                    elem.get_image(res.document).save(fp, "PNG")
-            if isinstance(elem, PictureItem):
-                p += 1
-                with (out_dir / f"{stem}-picture-{p}.png").open("wb") as fp:
-                    elem.get_image(res.document).save(fp, "PNG")
+    @staticmethod
+    def _merge_section_shards(shards: List[Tuple[List[Section], Dict[str, bytes]]]) -> Tuple[List[Section], Dict[str, bytes]]:
+        """
+        페이지 범위별 변환 결과를 문서 순서대로 합칩니다.
+        조각이 제목 없이 시작하면 이전 조각의 마지막 섹션이 페이지 경계를 넘어 이어지는 것이므로 그 섹션에 붙입니다.
+        합친 뒤에도 본문이 없는 섹션(상위 제목 등)은 다음 섹션 제목에 합치고, 마지막에 남으면 버립니다.
         
-
-        # 3) md 파일 export
-        res.document.save_as_markdown(out_dir / temp_md_file_name, image_mode=ImageRefMode.REFERENCED)
-
-        # 4)JSON 변환
-        json_data = self._md_file_to_json(out_dir / temp_md_file_name)
-
-        return json_data
-
-
-    def _md_file_to_json(self, md_file_name: str) -> Dict[str, Any]:
+        Args:
+            shards: 페이지 순서의 (섹션 목록, 이미지) 목록
+            
+        Returns:
+            Tuple[List[Section], Dict[str, bytes]]: 합쳐진 섹션 목록, 이미지 키 -> PNG 바이트
+        """
+        sections: List[Section] = []
+        images: Dict[str, bytes] = {}
+
+        for shard_sections, shard_images in shards:
+            images.update(shard_images)
+            for index, section in enumerate(shard_sections):
+                if index > 0 or section["title"] or not sections:
+                    sections.append({"title": section["title"], "chunks": list(section["chunks"])})
+                    continue
+
+                chunks = sections[-1]["chunks"]
+                for chunk in section["chunks"]:
+                    if chunks and chunk["type"] == "text" and chunks[-1]["type"] == "text":
+                        # 페이지 경계에서 끊긴 텍스트는 하나의 청크로 이어 붙임
+                        chunks[-1] = {"type": "text", "content": f"{chunks[-1]['content']}\n\n{chunk['content']}"}
+                    else:
+                        chunks.append(chunk)
+
+        return ArXivRunner._merge_title_only_sections(sections), images
+
+    @staticmethod
+    def _merge_title_only_sections(sections: List[Section]) -> List[Section]:
+        """
+        본문 청크가 없는 섹션을 다음 섹션의 제목 앞에 붙입니다. (예: "3 Method" + "3.1 Setup" -> "3 Method / 3.1 Setup")
+        빈 섹션이 분석 결과 없는 contentBlock 으로 저장되지 않도록 합니다.
         """
-        MD 파일을 JSON으로 변환합니다.
+        merged: List[Section] = []
+        pending_titles: List[str] = []
+        for section in sections:
+            if not section["chunks"]:
+                if section["title"]:
+                    pending_titles.append(section["title"])
+                continue
+            title = " / ".join([*pending_titles, section["title"]] if section["title"] else pending_titles)
+            merged.append({"title": title, "chunks": section["chunks"]})
+            pending_titles = []
+        return merged
+
+    @staticmethod
+    def _document_to_sections(document: "DoclingDocument", image_prefix: str = "") -> Tuple[List[Section], Dict[str, bytes]]:
+        """
+        docling 문서의 요소를 한 번 순회하여 섹션별 텍스트/이미지 청크를 만듭니다.
+        마크다운 export와 재파싱 없이, 이미지는 이미지 키로 참조합니다.
         
         Args:
-            md_file_name: MD 파일 이름
+            document: docling 변환 결과 문서
+            image_prefix: 이미지 키 접두어
             
         Returns:
-            Dict[str, Any]: JSON 데이터
+            Tuple[List[Section], Dict[str, bytes]]: 문서 순서의 섹션 목록, 이미지 키 -> PNG 바이트
         """
-        with open(md_file_name, "r", encoding="utf-8") as f:
-            md_content = f.read()
-            return markdown_to_json.dictify(md_content)
-
-    def _summary_abstract(self, abstract: str, title: str) -> Optional[str]:
+        from docling_core.types.doc import DocItemLabel, ListItem, PictureItem, TableItem, TextItem
+
+        sections: List[Section] = []
+        images: Dict[str, bytes] = {}
+        texts: List[str] = []
+        # 캡션은 그림/표와 함께 출력하므로 본문 순회에서는 건너뜀
+        caption_refs = {
+            ref.cref for item in [*document.pictures, *document.tables] for ref in item.captions
+        }
+
+        def current_chunks() -> List[ContentChunk]:
+            if not sections:
+                # 첫 제목 이전의 본문
+                sections.append({"title": "", "chunks": []})
+            return sections[-1]["chunks"]
+
+        def flush_text():
+            if texts:
+                current_chunks().append({"type": "text", "content": "\n\n".join(texts)})
+                texts.clear()
+
+        for item, _ in document.iterate_items():
+            if isinstance(item, TextItem) and item.label in (DocItemLabel.TITLE, DocItemLabel.SECTION_HEADER):
+                flush_text()
+                sections.append({"title": item.text.strip(), "chunks": []})
+            elif isinstance(item, ListItem):
+                if item.text.strip():
+                    texts.append(f"{getattr(item, 'marker', None) or '-'} {item.text.strip()}")
+            elif isinstance(item, TextItem):
+                if item.self_ref not in caption_refs and item.text.strip():
+                    texts.append(item.text.strip())
+            elif isinstance(item, TableItem):
+                # 표 마크다운에는 캡션이 포함됨
+                table = item.export_to_markdown(doc=document)
+                if table.strip():
+                    texts.append(table)
+            elif isinstance(item, PictureItem):
+                pil_image = item.get_image(document) if item.image is not None else None
+                if pil_image is not None:
+                    flush_text()
+                    key = f"{image_prefix}picture-{len(images) + 1}.png"
+                    buffer = BytesIO()
+                    pil_image.save(buffer, format="PNG")
+                    images[key] = buffer.getvalue()
+                    current_chunks().append({"type": "img", "content": key})
+                caption = item.caption_text(document)
+                if caption.strip():
+                    texts.append(caption.strip())
+
+        flush_text()
+        # 본문 없는 제목 섹션은 다음 페이지 범위 조각에서 본문이 이어질 수 있으므로 남겨 두고,
+        # 조각을 합친 뒤 _merge_section_shards 에서 정리
+        return [section for section in sections if section["chunks"] or section["title"]], images
+
+    @staticmethod
+    def _summary_messages(abstract: str, title: str) -> List[Dict[str, str]]:
+        """초록 하나를 요약하는 메시지를 생성합니다."""
+        return [
+            {"role": "system", "content": create_system_summary_prompt()},
+            {"role": "user", "content": create_summary_user_prompt(abstract, title)}
+        ]
+
+    @timed("llm.summary_abstract", none_is_failure=True)
+    def _summary_abstract(self, abstract: str, title: str, arxiv_id: Optional[str] = None) -> Optional[str]:
         """
         논문 초록을 요약합니다.
+        초록 배치(LLM_ABSTRACT_BATCH)를 사용하면 짧은 시간 안에 들어온 다른 초록들과 함께 요약합니다.
         
         Args:
             abstract: 논문 초록
             title: 논문 제목
+            arxiv_id: ArXiv 논문 ID (배치 응답의 키, 없으면 단독 호출)
             
         Returns:
             str: 요약된 초록 또는 None
         """
         try:
-            # 프롬프트 생성
-            user_prompt = create_summary_user_prompt(abstract, title)
-            system_prompt = create_system_summary_prompt()
-            
-            # 메시지 구성
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-            
-            # OpenAI API 호출
-            response = self.llm.invoke(messages)
+            if self.abstract_batcher is not None and arxiv_id:
+                summary = self.abstract_batcher.get((arxiv_id, title, abstract))
+            else:
+                # OpenAI API 호출 (캐시 우선)
+                summary = self._invoke_llm(self._summary_messages(abstract, title), prompt_type="abstract")
             
-            logger.info("초록 요약 완료")
-            return response.content
+            if summary:
+                logger.info("초록 요약 완료")
+            return summary
             
         except Exception as e:
             logger.error(f"초록 요약 중 오류 발생: {e}")
             return None
 
+    @staticmethod
+    def _parse_batch_summaries(content: str, arxiv_ids: List[str]) -> Dict[str, str]:
+        """
+        배치 요약 응답(JSON)을 검증하고 arXiv ID -> 요약 딕셔너리로 변환합니다.
+        요청한 ID가 아니거나 요약이 비어 있는 항목은 제외합니다.
+        """
+        text = content.strip()
+        if text.startswith("```"):
+            text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+
+        parsed = json.loads(text)
+        if not isinstance(parsed, dict):
+            raise ValueError(f"JSON 객체가 아닌 응답: {type(parsed).__name__}")
+
+        summaries = {}
+        for arxiv_id in arxiv_ids:
+            summary = parsed.get(arxiv_id)
+            if isinstance(summary, str) and summary.strip():
+                summaries[arxiv_id] = summary.strip()
+        return summaries
+
+    def _summary_abstract_batch(self, papers: List[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], Optional[str]]:
+        """
+        여러 초록을 한 번의 LLM 호출로 요약합니다. (abstract_batcher의 배치 함수)
+        응답에 없거나 검증에 실패한 초록은 단독 호출로 요약합니다.
+        
+        Args:
+            papers: (arxiv_id, title, abstract) 리스트
+            
+        Returns:
+            Dict: (arxiv_id, title, abstract) -> 요약 (실패 시 None)
+        """
+        results: Dict[Tuple[str, str, str], Optional[str]] = {}
+        batch: Dict[str, Tuple[str, str, str]] = {}
+        fallback: List[Tuple[str, str, str]] = []
+        # 단독 호출 모델, 배치 호출 모델 순서로 (단독 요약 메시지 기준) 캐시를 조회해 배치/단독 결과를 공유
+        cache_models = list(dict.fromkeys([
+            *self.llm_router.candidate_models("abstract"), *self.llm_router.candidate_models("abstract_batch")
+        ]))
+
+        for paper in papers:
+            arxiv_id, title, abstract = paper
+            if arxiv_id in batch:
+                # 같은 ID가 다른 제목/초록으로 들어온 경우 (응답 키가 겹치므로 단독 호출)
+                fallback.append(paper)
+                continue
+            messages = self._summary_messages(abstract, title)
+            cached = next(
+                (value for value in (self.llm_cache.get(LLMCache.make_key(model, messages)) for model in cache_models)
+                 if value is not None),
+                None
+            )
+            if cached is not None:
+                results[paper] = cached
+            else:
+                batch[arxiv_id] = paper
+
+        if len(batch) == 1:
+            fallback.extend(batch.values())
+        elif batch:
+            messages = [
+                {"role": "system", "content": create_system_summary_prompt()},
+                {"role": "user", "content": create_batch_summary_user_prompt([
+                    {"arxiv_id": arxiv_id, "title": title, "abstract": abstract}
+                    for arxiv_id, title, abstract in batch.values()
+                ])}
+            ]
+            # 배치 결과는 실제로 응답한 배치 라우트의 모델로 캐시
+            batch_model = self.llm_router.route(messages, "abstract_batch").model
+            try:
+                summaries = self._parse_batch_summaries(
+                    self._invoke_llm(messages, prompt_type="abstract_batch"), list(batch)
+                )
+            except Exception as e:
+                logger.error(f"초록 배치 요약 실패, 단독 호출로 요약합니다 ({len(batch)}건): {e}")
+                summaries = {}
+
+            for arxiv_id, paper in batch.items():
+                if arxiv_id in summaries:
+                    results[paper] = summaries[arxiv_id]
+                    _, title, abstract = paper
+                    cache_key = LLMCache.make_key(batch_model, self._summary_messages(abstract, title))
+                    self.llm_cache.set(cache_key, summaries[arxiv_id], batch_model)
+                else:
+                    fallback.append(paper)
+            ABSTRACT_BATCH_RESULTS.labels("batched").inc(len(summaries))
+            logger.info(f"초록 배치 요약: 요청 {len(batch)}건, 성공 {len(summaries)}건")
+
+        if fallback:
+            ABSTRACT_BATCH_RESULTS.labels("fallback").inc(len(fallback))
+            executor = self.abstract_fallback_executor or self.llm_executor
+            for paper, summary in zip(fallback, executor.map(self._summary_abstract_single, fallback)):
+                results[paper] = summary
+        return results
+
+    def _summary_abstract_single(self, paper: Tuple[str, str, str]) -> Optional[str]:
+        """배치에서 빠진 초록 하나를 단독 호출로 요약합니다."""
+        arxiv_id, title, abstract = paper
+        try:
+            return self._invoke_llm(self._summary_messages(abstract, title), prompt_type="abstract")
+        except Exception as e:
+            logger.error(f"초록 요약 중 오류 발생 ({arxiv_id}): {e}")
+            return None
+
+    @timed("llm.analyze_content", none_is_failure=True)
     def _create_analyzed_content(self, content: List[ContentChunk]) -> Optional[str]:
         """
         논문 본문을 요약합니다.
@@ -268,39 +629,342 @@ class ArXivRunner:
         Returns:
             str: 요약된 본문 또는 None
         """
+        return self._collect_analyzed_content(self._submit_chunk_analysis(content), {})
+
+    def _pack_chunks(self, content: List[ContentChunk]) -> List[PackedChunk]:
+        """
+        청크를 토큰 예산 단위로 합치거나 나눕니다. (LLM_CHUNK_MAX_TOKENS가 0 이하이면 그대로 반환)
+        """
+        if self.chunk_max_tokens <= 0:
+            return content
+        return pack_chunks(content, self.chunk_max_tokens)
+
+    def _submit_chunk_analysis(self, content: List[ContentChunk]) -> List[Union[Future, ContentChunk]]:
+        """
+        텍스트 청크의 LLM 분석을 executor에 제출합니다.
+        
+        Args:
+            content: 논문 본문 (ContentChunk 리스트)
+        Returns:
+            List[Union[Future, ContentChunk]]: 텍스트 청크는 Future, 이미지 청크는 원본 그대로 (청크 순서 유지)
+        """
+        parts = []
+        for chunk in self._pack_chunks(content):
+            if chunk["type"] == "img":
+                parts.append(chunk)
+            else:
+                parts.append(self.llm_executor.submit(self._analyze_chunk, chunk))
+        return parts
+
+    @staticmethod
+    def _chunk_tokens(chunk: PackedChunk) -> int:
+        """모델 라우팅에 사용할 청크 본문의 토큰 수 (패킹하지 않은 청크는 직접 계산)"""
+        return chunk["tokens"] if "tokens" in chunk else count_tokens(chunk["content"])
+
+    def _analyze_chunk(self, chunk: PackedChunk) -> str:
+        """
+        텍스트 청크 하나를 분석하고, 합쳐진 이미지의 자리표시자를 원래 이미지 마크다운으로 복원합니다.
+        """
+        images = chunk.get("images", [])
+        user_prompt = create_analyze_paper_content_prompt(chunk["content"], has_image_placeholders=bool(images))
+        analyzed = self._invoke_llm(user_prompt, prompt_type="chunk", route_tokens=self._chunk_tokens(chunk))
+        return restore_image_placeholders(analyzed, [image_markdown(key) for key in images]) if images else analyzed
+
+    def _collect_analyzed_content(self, parts: List[Union[Future, ContentChunk]], uploads: Dict[str, Future]) -> Optional[str]:
+        """
+        제출된 청크 분석 결과를 원래 순서대로 모읍니다.
+        
+        Args:
+            parts: _submit_chunk_analysis 의 반환값
+            uploads: 이미지 키 -> 업로드 Future (공개 URL)
+        Returns:
+            str: 요약된 본문 또는 None
+        """
         try:
             tmp = []
-            for chunk in content:
-                if chunk["type"] == "img":
-                    image_url = self._convert_local_image_to_fs(chunk["content"])
-                    tmp.append(f"\n{image_url}\n")
+            for part in parts:
+                if isinstance(part, Future):
+                    # 텍스트 청크에 합쳐진 이미지도 공개 URL로 교체
+                    tmp.append(replace_markdown_images(part.result(), lambda image: self._resolve_inline_image(image, uploads)))
                 else:
-                    user_prompt = create_analyze_paper_content_prompt(chunk["content"]) 
-                    response = self.llm.invoke(user_prompt)
-                    tmp.append(response.content)
+                    tmp.append(f"\n{self._resolve_image_url(part['content'], uploads)}\n")
             return "\n".join(tmp)
         except Exception as e:
             logger.error(f"논문 본문 요약 중 오류 발생: {e}")
             return None
 
-    def _convert_local_image_to_fs(self, image_url: str) -> str:
+    @timed("llm.invoke")
+    def _invoke_llm(
+        self,
+        prompt: Union[str, List[Dict[str, str]]],
+        prompt_type: str = "chunk",
+        route_tokens: Optional[int] = None
+    ) -> str:
         """
-        로컬 이미지를 s3 호환 파일 시스템에 저장합니다.
+        LLM을 호출합니다. 프롬프트 종류/토큰 수로 모델을 고르고,
+        같은 모델/프롬프트의 응답이 캐시에 있으면 캐시를 반환합니다.
         
         Args:
-            image_url: 파일 시스템 이미지 URL(마크다운 형태)
+            prompt: 프롬프트 문자열 또는 메시지 리스트
+            prompt_type: 프롬프트 종류 (모델 라우팅과 마감 시간/재시도/헤징 정책 선택, "abstract" 또는 "chunk")
+            route_tokens: 모델 라우팅에 사용할 토큰 수 (기본값: 전체 프롬프트의 토큰 수)
+            
+        Returns:
+            str: LLM 응답 본문
+        """
+        route = self.llm_router.route(prompt, prompt_type, route_tokens)
+        cache_key = LLMCache.make_key(route.model, prompt)
+        cached = self.llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        llm = self.llm_router.client(route)
+
+        def attempt(timeout: float):
+            sent = time.monotonic()
+            response = llm.invoke(prompt, timeout=timeout)
+            self.llm_router.record(route, prompt_type, time.monotonic() - sent, response)
+            return response
+
+        # 동시 호출 수와 호출 속도는 llm_governor로 제한 (요청마다 보내기 직전에 허가를 받음)
+        response = self.llm_calls.call(prompt_type, attempt, self.llm_governor.limiter(prompt, route.model))
+        record_llm_usage(route.model, response)
+        self.llm_cache.set(cache_key, response.content, route.model)
+        return response.content
+
+    def _resolve_image_url(self, image_key: str, uploads: Dict[str, Future]) -> str:
+        """
+        이미지 키를 업로드된 s3 호환 파일 시스템의 Public URL 마크다운 이미지로 변환합니다.
+        
+        Args:
+            image_key: 이미지 키 (예: "picture-1.png")
+            uploads: 이미지 키 -> 업로드 Future (공개 URL)
         
         Returns:
-            str: 웹 Public URL(마크다운 형태)
+            str: 웹 Public URL(마크다운 형태), 실패 시 이미지 키를 참조하는 마크다운
         """
         try:
-            local_image_url = extract_image_url_from_markdown(image_url)
+            if image_key not in uploads:
+                raise ValueError(f"업로드된 이미지를 찾을 수 없습니다: {image_key}")
+            return image_markdown(uploads[image_key].result())
+
+        except Exception as e:
+            logger.error(f"이미지를 웹 Public URL로 변환 중 오류 발생: {e}")
+            return image_markdown(image_key)
+
+    def _resolve_inline_image(self, markdown_img: str, uploads: Dict[str, Future]) -> str:
+        """
+        LLM 응답에 복원된 이미지 마크다운의 이미지 키를 Public URL로 교체합니다. (이미지 키가 아니면 그대로 반환)
+        """
+        image_key = extract_image_url_from_markdown(markdown_img)
+        if image_key not in uploads:
+            return markdown_img
+        return self._resolve_image_url(image_key, uploads)
+
+    # ---- asyncio 실행 모드 ----
+
+    @timed("arxiv.get_metadata", none_is_failure=True)
+    async def aget_metadata(self, arxiv_id: str) -> Optional[ArXivMetadata]:
+        """
+        get_metadata의 비동기 버전입니다.
+        배치 조회 스레드의 결과를 이벤트 루프에서 기다리므로 요청마다 스레드를 점유하지 않습니다.
+        
+        Args:
+            arxiv_id: ArXiv 논문 ID
+            
+        Returns:
+            ArXivMetadata: 논문 메타데이터 또는 None
+        """
+        try:
+            clean_id = arxiv_id.split('v')[0]
+
+            metadata = self.metadata_cache.get(clean_id)
+            if metadata:
+                return metadata
+
+            metadata = await asyncio.wrap_future(self.metadata_batcher.submit(clean_id))
+            if not metadata:
+                logger.warning(f"논문을 찾을 수 없습니다: {arxiv_id}")
+                return None
 
-            if not local_image_url:
-                raise ValueError("로컬 이미지 URL을 추출할 수 없습니다.")
-            public_url = upload_file_to_oci(local_image_url)
-            return replace_image_url_in_markdown(image_url, public_url)
+            self.metadata_cache.set(clean_id, metadata)
+            logger.info(f"메타데이터 조회 성공: {arxiv_id}")
+            return metadata
+
+        except Exception as e:
+            logger.error(f"메타데이터 조회 중 오류 발생: {e}")
+            return None
+
+    @timed("pdf.download")
+    async def _aread_pdf_to_binary(self, pdf_url: str, http_client: httpx.AsyncClient) -> bytes:
+        """
+        웹으로 부터 PDF 파일을 비동기로 읽어옵니다.
+        
+        Args:
+            pdf_url: PDF 파일 URL
+            http_client: 재사용할 httpx.AsyncClient
+            
+        Returns:
+            bytes: PDF 파일 바이트
+        """
+        response = await http_client.get(pdf_url, follow_redirects=True)
+        response.raise_for_status()
+
+        if response.headers.get('content-type') != 'application/pdf':
+            logger.error(f"PDF가 아닌 콘텐츠 타입: {response.headers.get('content-type')}")
+            raise ValueError("PDF 파일이 아닙니다")
+
+        return response.content
+
+    @timed("llm.summary_abstract", none_is_failure=True)
+    async def _asummary_abstract(self, abstract: str, title: str, arxiv_id: Optional[str] = None) -> Optional[str]:
+        """
+        _summary_abstract의 비동기 버전입니다.
+        """
+        try:
+            if self.abstract_batcher is not None and arxiv_id:
+                summary = await asyncio.wrap_future(self.abstract_batcher.submit((arxiv_id, title, abstract)))
+            else:
+                summary = await self._ainvoke_llm(self._summary_messages(abstract, title), prompt_type="abstract")
+
+            if summary:
+                logger.info("초록 요약 완료")
+            return summary
+
+        except Exception as e:
+            logger.error(f"초록 요약 중 오류 발생: {e}")
+            return None
+
+    @timed("llm.analyze_sections")
+    async def _aanalyze_sections(
+        self,
+        sections: List[Section],
+        images: Dict[str, bytes],
+        on_section_done: Optional[Callable[[ContentAnalysisResult], Awaitable[None]]] = None,
+        completed_blocks: Optional[Dict[int, ContentAnalysisResult]] = None
+    ) -> List[ContentAnalysisResult]:
+        """
+        _analyze_sections의 비동기 버전입니다.
+        
+        Args:
+            sections: 문서 순서의 섹션 목록
+            images: 이미지 키 -> PNG 바이트
+            on_section_done: 섹션 하나의 분석이 끝날 때마다 await 되는 코루틴 함수
+            completed_blocks: 이전 실행에서 완료된 섹션 (order -> 결과)
+            
+        Returns:
+            List[ContentAnalysisResult]: 섹션 순서대로 정렬된 분석 결과
+        """
+        # 업로드 스레드 풀의 Future를 이벤트 루프에서 대기
+        uploads = {
+            key: asyncio.wrap_future(submit_upload(data, Path(key).suffix))
+            for key, data in images.items()
+        }
+
+        def _retrieve_exception(task: asyncio.Future):
+            if not task.cancelled():
+                task.exception()
+
+        async def analyze_content(content: List[ContentChunk]) -> Optional[str]:
+            chunks = self._pack_chunks(content)
+            tasks = [
+                None if chunk["type"] == "img" else asyncio.ensure_future(self._aanalyze_chunk(chunk))
+                for chunk in chunks
+            ]
+            try:
+                tmp = []
+                for chunk, task in zip(chunks, tasks):
+                    if task is not None:
+                        analyzed = await task
+                        # 텍스트 청크에 합쳐진 이미지도 공개 URL로 교체
+                        resolved = {
+                            image: await self._aresolve_image_url(extract_image_url_from_markdown(image), uploads)
+                            for image in find_markdown_images(analyzed)
+                            if extract_image_url_from_markdown(image) in uploads
+                        }
+                        tmp.append(replace_markdown_images(analyzed, lambda image: resolved.get(image, image)))
+                    else:
+                        tmp.append(f"\n{await self._aresolve_image_url(chunk['content'], uploads)}\n")
+                return "\n".join(tmp)
+            except Exception as e:
+                logger.error(f"논문 본문 요약 중 오류 발생: {e}")
+                return None
+            finally:
+                # 오류/취소(예: 작업 임대를 잃음)로 빠져나오면 남은 청크 호출도 중단
+                # 실패한 다른 청크의 예외는 회수해 "Task exception was never retrieved" 경고를 막음
+                for task in tasks:
+                    if task is not None:
+                        task.cancel()
+                        task.add_done_callback(_retrieve_exception)
+
+        async def analyze_section(idx: int, title: str, content: List[ContentChunk]) -> ContentAnalysisResult:
+            done = (completed_blocks or {}).get(idx + 1)
+            if done and done["contentTitle"] == title:
+                return done
+
+            result: ContentAnalysisResult = {
+                "order": idx + 1,
+                "contentTitle": title,
+                "content": await analyze_content(content)
+            }
+            if on_section_done:
+                try:
+                    await on_section_done(result)
+                except Exception as e:
+                    logger.error(f"섹션 완료 처리 중 오류 발생: {title} - {e}")
+            return result
+
+        return list(await asyncio.gather(
+            *(analyze_section(idx, section["title"], section["chunks"]) for idx, section in enumerate(sections))
+        ))
+
+    async def _aanalyze_chunk(self, chunk: PackedChunk) -> str:
+        """
+        _analyze_chunk의 비동기 버전입니다.
+        """
+        images = chunk.get("images", [])
+        user_prompt = create_analyze_paper_content_prompt(chunk["content"], has_image_placeholders=bool(images))
+        analyzed = await self._ainvoke_llm(user_prompt, prompt_type="chunk", route_tokens=self._chunk_tokens(chunk))
+        return restore_image_placeholders(analyzed, [image_markdown(key) for key in images]) if images else analyzed
+
+    @timed("llm.invoke")
+    async def _ainvoke_llm(
+        self,
+        prompt: Union[str, List[Dict[str, str]]],
+        prompt_type: str = "chunk",
+        route_tokens: Optional[int] = None
+    ) -> str:
+        """
+        _invoke_llm의 비동기 버전입니다. 동시 호출 수와 호출 속도는 llm_governor로 제한됩니다.
+        """
+        route = self.llm_router.route(prompt, prompt_type, route_tokens)
+        cache_key = LLMCache.make_key(route.model, prompt)
+        cached = await self.llm_cache.aget(cache_key)
+        if cached is not None:
+            return cached
+
+        llm = self.llm_router.client(route)
+
+        async def attempt(timeout: float):
+            sent = time.monotonic()
+            response = await llm.ainvoke(prompt, timeout=timeout)
+            self.llm_router.record(route, prompt_type, time.monotonic() - sent, response)
+            return response
+
+        response = await self.llm_calls.acall(prompt_type, attempt, self.llm_governor.limiter(prompt, route.model))
+        record_llm_usage(route.model, response)
+        await self.llm_cache.aset(cache_key, response.content, route.model)
+        return response.content
+
+    async def _aresolve_image_url(self, image_key: str, uploads: Dict[str, "asyncio.Future"]) -> str:
+        """
+        _resolve_image_url의 비동기 버전입니다.
+        """
+        try:
+            if image_key not in uploads:
+                raise ValueError(f"업로드된 이미지를 찾을 수 없습니다: {image_key}")
+            return image_markdown(await uploads[image_key])
 
         except Exception as e:
-            logger.error(f"로컬 이미지를 웹 Public URL로 변환 중 오류 발생: {e}")
-            return image_url
\ No newline at end of file
+            logger.error(f"이미지를 웹 Public URL로 변환 중 오류 발생: {e}")
+            return image_markdown(image_key)
@@ -0,0 +1,325 @@
+"""
+asyncio 실행 모드 진입점
+
+하나의 이벤트 루프에서 Redis 구독, Mongo(AsyncMongoClient), HTTP(httpx), LLM(ainvoke)을 처리하고,
+docling 변환만 프로세스 풀로 보냅니다. 이미지 업로드는 file_service의 업로드 스레드 풀 Future를 await 합니다.
+
+실행: python async_main.py
+
+Author: Minseok kim
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+import httpx
+import redis.asyncio as aioredis
+from bson import ObjectId
+from dotenv import load_dotenv
+
+from arxiv_runner import ArXivRunner
+import file_service
+from async_mongo_service import AsyncMongoService, ThreadedImageIndex
+from checkpoint_store import CheckpointStore
+from job_lease import AsyncJobLease
+from metrics import record_message, start_metrics_server
+from mongo_service import is_analysis_completed
+from pipeline import parse_pdf_worker, parse_worker_count, plan_parse_tasks
+from type import PaperData, PaperMessage
+from utils.str_utils import convert_arxiv_url_to_pdf
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+
+class AsyncWorker:
+    """paper:abstract / paper:analysis 메시지를 하나의 이벤트 루프에서 처리하는 워커"""
+
+    def __init__(self):
+        # 워커 역할(WORKER_ROLE)에 해당하는 채널만 구독
+        worker_role = os.getenv("WORKER_ROLE", "all").lower()
+        self.handlers = {}
+        if worker_role in ("all", "abstract"):
+            self.handlers["paper:abstract"] = self.handle_abstract_queue
+        if worker_role in ("all", "analysis"):
+            self.handlers["paper:analysis"] = self.handle_content_queue
+        if not self.handlers:
+            raise RuntimeError(f"WORKER_ROLE 값이 올바르지 않습니다: {worker_role} (all, abstract, analysis)")
+
+        # docling 변환용 프로세스 풀은 다른 스레드(배치/업로드/이벤트 루프 executor 등)가 시작되기 전에 fork
+        # DOCLING_WARMUP=true(기본값)이면 fork 전에 docling 모델을 로드하고, 아니면 각 자식 프로세스가 백그라운드에서 로드
+        self.parse_workers = parse_worker_count()
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        if "paper:analysis" in self.handlers:
+            import converter_pool
+
+            self.process_pool = converter_pool.create_process_pool(
+                self.parse_workers, warmup_parent=os.getenv("DOCLING_WARMUP", "true").lower() == "true"
+            )
+
+        self.arxiv_runner = ArXivRunner()
+        self.mongo_service = AsyncMongoService()
+        self.http_client = httpx.AsyncClient(timeout=float(os.getenv("HTTP_TIMEOUT_SECONDS", "120")))
+
+        # 채널별 동시 처리 수 제한
+        self.semaphores = {
+            "paper:abstract": asyncio.Semaphore(int(os.getenv("ASYNC_ABSTRACT_CONCURRENCY", "200"))),
+            "paper:analysis": asyncio.Semaphore(int(os.getenv("ASYNC_ANALYSIS_CONCURRENCY", "4"))),
+        }
+
+    async def confirm_paper_abstract(self, message: PaperMessage) -> Optional[ObjectId]:
+        """
+        논문 초록 요약 정보를 확인하고 저장합니다. (main.confirm_paper_abstract의 비동기 버전)
+
+        Returns:
+            paper_object_id: 저장된(또는 기존) 논문 ID 또는 None
+        """
+        paper_object_id = await self.mongo_service.is_paper_exists(message["paper_id"])
+        if paper_object_id:
+            logger.info(f"논문이 이미 존재함 - 논문 파싱 진행하지 않음.: {message['paper_id']}")
+            return paper_object_id
+
+        lease = AsyncJobLease(self.mongo_service, f"abstract:{message['paper_id']}")
+        if not await lease.acquire():
+            return await self.wait_for_paper_abstract(message["paper_id"], lease.lease_seconds)
+
+        paper_object_id = None
+        try:
+            paper_object_id = await self.create_paper_abstract(message)
+        finally:
+            await lease.release("completed" if paper_object_id else "failed")
+        return paper_object_id
+
+    async def wait_for_paper_abstract(self, arxiv_id: str, timeout_seconds: float) -> Optional[ObjectId]:
+        """다른 워커가 실행 중인 초록 요약 작업이 끝날 때까지 대기합니다."""
+        deadline = time.monotonic() + timeout_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(float(os.getenv("JOB_WAIT_INTERVAL_SECONDS", "0.5")))
+            paper_object_id = await self.mongo_service.is_paper_exists(arxiv_id)
+            if paper_object_id:
+                return paper_object_id
+            job = await self.mongo_service.find_job(f"abstract:{arxiv_id}")
+            if not job or job.get("status") != "running":
+                break
+
+        logger.error(f"다른 워커의 논문 초록 요약 대기 실패: {arxiv_id}")
+        return None
+
+    async def create_paper_abstract(self, message: PaperMessage) -> Optional[ObjectId]:
+        """논문 메타데이터를 조회하고 초록을 요약하여 저장합니다. (작업 선점 후 호출)"""
+        paper_object_id = await self.mongo_service.is_paper_exists(message["paper_id"])
+        if paper_object_id:
+            return paper_object_id
+
+        paper_metadata = await self.arxiv_runner.aget_metadata(message["paper_id"])
+        if not paper_metadata:
+            logger.error(f"논문 메타데이터 조회 실패: {message['paper_id']}")
+            return None
+
+        summary = await self.arxiv_runner._asummary_abstract(
+            paper_metadata["abstract"], paper_metadata["title"], paper_metadata["arxiv_id"]
+        )
+        if not summary:
+            logger.error(f"논문 요약 실패: {message['paper_id']}")
+            return None
+
+        paper_data: PaperData = {
+            "title": paper_metadata["title"],
+            "summary": summary,
+            "contentBlocks": [],
+            "url": f"https://arxiv.org/abs/{paper_metadata['arxiv_id']}",
+            "authors": paper_metadata["authors"],
+            "categories": paper_metadata["categories"],
+            "abstract": paper_metadata["abstract"],
+            "lastPublishDate": paper_metadata["updated"]
+        }
+        return await self.mongo_service.save_paper(paper_data)
+
+    async def handle_abstract_queue(self, message: PaperMessage):
+        paper_object_id = await self.confirm_paper_abstract(message)
+
+        if paper_object_id:
+            await self.mongo_service.save_user_paper_abstract(ObjectId(message["user_id"]), paper_object_id)
+
+        logger.info(f"논문 초록 요약 정보 저장 완료: {message['paper_id']}")
+        return paper_object_id is not None
+
+    async def handle_content_queue(self, message: PaperMessage):
+        paper_data = await self.mongo_service.find_by_id(message["paper_id"])
+
+        if not paper_data:
+            logger.info(f"논문 데이터 조회 실패: {message['paper_id']}")
+            return False
+
+        if is_analysis_completed(paper_data):
+            logger.info(f"논문 콘텐츠 이미 존재함: {message['paper_id']}")
+            await self.mongo_service.save_user_library(message["user_id"], message["paper_id"])
+            return
+
+        # 같은 논문을 다른 워커가 분석 중이면 대기자로 등록하고 끝날 때까지 대기 (실패하면 작업을 이어받음)
+        job_key = f"analysis:{message['paper_id']}"
+        max_takeovers = int(os.getenv("PIPELINE_WAITER_MAX_TAKEOVERS", "3"))
+        for takeover in range(max_takeovers + 1):
+            lease = AsyncJobLease(self.mongo_service, job_key)
+            if await lease.acquire():
+                return await self.analyze_paper(message, lease)
+
+            await self.mongo_service.add_job_waiter(job_key, message["user_id"])
+            logger.info(f"실행 중인 분석 작업에 대기자로 등록: {message['paper_id']} (user: {message['user_id']})")
+            status = await self.wait_for_running_job(job_key)
+            if status in ("completed", "partial"):
+                await self.mongo_service.save_user_library(message["user_id"], message["paper_id"])
+                return True
+            logger.warning(f"다른 워커의 분석 작업이 끝나지 않아 이어받습니다: {message['paper_id']} ({status}, {takeover + 1}회)")
+
+        logger.error(f"다른 워커의 분석 작업이 실패함 (이어받기 {max_takeovers}회 초과): {message['paper_id']}")
+        return False
+
+    async def wait_for_running_job(self, job_key: str) -> str:
+        """
+        다른 워커가 실행 중인 작업이 끝날 때까지 대기합니다.
+
+        Returns:
+            str: 작업 종료 상태 ("completed", "partial", "failed", lease가 만료된 경우 "expired", 작업이 없으면 "missing")
+        """
+        while True:
+            await asyncio.sleep(float(os.getenv("PIPELINE_WAITER_POLL_SECONDS", "2")))
+            job_doc = await self.mongo_service.find_job(job_key)
+            if not job_doc:
+                return "missing"
+            if job_doc.get("status") != "running":
+                return job_doc.get("status")
+            expires_at = job_doc.get("leaseExpiresAt")
+            if expires_at and expires_at < datetime.utcnow():
+                return "expired"
+
+    async def analyze_paper(self, message: PaperMessage, lease: AsyncJobLease) -> bool:
+        """논문 본문을 분석하여 섹션별로 저장합니다. (작업 선점 후 호출, 끝나면 lease 해제)"""
+        status = "failed"
+        try:
+            paper_data = await self.mongo_service.find_by_id(message["paper_id"])
+            if is_analysis_completed(paper_data):
+                await self.mongo_service.save_user_library(message["user_id"], message["paper_id"])
+                status = "completed"
+                return True
+
+            pdf_url = convert_arxiv_url_to_pdf(paper_data["url"])
+            logger.info(f"논문 본문 요약/정리 시작: {pdf_url}")
+            pdf_bytes = await self.arxiv_runner._aread_pdf_to_binary(pdf_url, self.http_client)
+
+            # docling 변환만 프로세스 풀에서 실행 (큰 PDF는 페이지 범위별로 동시에 변환)
+            loop = asyncio.get_running_loop()
+            tasks = plan_parse_tasks(pdf_bytes, self.parse_workers)
+            shards = await asyncio.gather(*(
+                loop.run_in_executor(self.process_pool, parse_pdf_worker, pdf_bytes, page_range, image_prefix)
+                for page_range, image_prefix in tasks
+            ))
+            sections, images = ArXivRunner._merge_section_shards(shards)
+
+            # 섹션 분석이 끝나는 대로 저장
+            paper_id = message["paper_id"]
+            await self.mongo_service.start_paper_progress(paper_id, len(sections))
+
+            async def save_section(block):
+                # lease를 잃었으면 다른 워커가 이어서 처리하므로 쓰지 않음
+                if block["content"] is not None and not lease.lost:
+                    await self.mongo_service.save_content_block(paper_id, block)
+
+            # lease를 잃으면 분석을 취소
+            analysis = asyncio.ensure_future(self.arxiv_runner._aanalyze_sections(
+                sections,
+                images,
+                on_section_done=save_section,
+                completed_blocks=CheckpointStore.completed_blocks(paper_data)
+            ))
+            lost = asyncio.ensure_future(lease.lost_event.wait())
+            try:
+                await asyncio.wait({analysis, lost}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                lost.cancel()
+                if not analysis.done():
+                    analysis.cancel()
+            if lease.lost or analysis.cancelled():
+                logger.error(f"작업 lease를 잃어 분석 결과를 저장하지 않고 중단합니다: {paper_id}")
+                return False
+
+            paper_content = analysis.result()
+            if not any(block["content"] is not None for block in paper_content):
+                logger.error(f"논문 콘텐츠 요약 실패: {paper_id}")
+                await self.mongo_service.finish_paper_progress(paper_id, "partial")
+                return False
+
+            # 실패한 섹션이 있으면 partial로 남겨 대기자/다음 요청이 구분할 수 있도록 함
+            completed = all(block["content"] is not None for block in paper_content)
+            status = "completed" if completed else "partial"
+            await self.mongo_service.finish_paper_progress(paper_id, status)
+            await self.mongo_service.save_user_library(message["user_id"], paper_id)
+            logger.info(f"논문 콘텐츠 요약 정보 저장 완료: {paper_id} ({status})")
+            return True
+        finally:
+            job_doc = await lease.release(status)
+            if status != "failed":
+                for user_id in (job_doc or {}).get("waiters", []):
+                    if user_id != message["user_id"]:
+                        await self.mongo_service.save_user_library(user_id, message["paper_id"])
+
+    async def dispatch(self, channel: str, msg: str):
+        """메시지 하나를 처리합니다. (run()에서 채널 세마포어를 획득한 뒤 호출되며, 끝나면 해제)"""
+        try:
+            data = json.loads(msg)
+            message: PaperMessage = {**data}
+            # 핸들러는 실패 시 False를 반환
+            record_message(channel, await self.handlers[channel](message) is not False)
+        except Exception as e:
+            record_message(channel, False)
+            logger.error(f"논문 처리 중 오류 발생: {e}")
+        finally:
+            self.semaphores[channel].release()
+
+    async def run(self):
+        await self.mongo_service.connect()
+        start_metrics_server()
+
+        # 업로드된 이미지 해시 인덱스를 Mongo에 영속화 (업로드 스레드에서 이벤트 루프로 위임)
+        file_service.set_image_index(ThreadedImageIndex(self.mongo_service, asyncio.get_running_loop()))
+
+        # LLM 응답 캐시의 2차 저장소로 Mongo 사용 (선택, _ainvoke_llm이 aget/aset으로 await)
+        if os.getenv("LLM_CACHE_MONGO", "false").lower() == "true":
+            self.arxiv_runner.llm_cache.set_remote_tier(self.mongo_service)
+
+        redis_kwargs = {"decode_responses": True}
+        if os.getenv("REDIS_USERNAME") and os.getenv("REDIS_PASSWORD"):
+            redis_kwargs["username"] = os.getenv("REDIS_USERNAME")
+            redis_kwargs["password"] = os.getenv("REDIS_PASSWORD")
+        client = aioredis.from_url(os.getenv("REDIS_URL"), **redis_kwargs)
+
+        logger.info(f"asyncio 워커 구독 시작: {list(self.handlers)}")
+        # 채널마다 구독을 분리하여 한 채널이 한도에 걸려도 다른 채널의 메시지는 계속 처리
+        await asyncio.gather(*(self.listen(client, channel) for channel in self.handlers))
+
+    async def listen(self, client, channel: str):
+        """채널 하나를 구독하고, 동시 처리 한도 안에서 메시지마다 태스크를 생성합니다."""
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+
+        tasks = set()
+        async for item in pubsub.listen():
+            if item["type"] != "message":
+                continue
+            # 동시 처리 한도에 도달하면 빈 자리가 날 때까지 다음 메시지를 읽지 않음 (태스크 무제한 생성 방지)
+            await self.semaphores[channel].acquire()
+            task = asyncio.create_task(self.dispatch(channel, item["data"]))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+
+if __name__ == "__main__":
+    asyncio.run(AsyncWorker().run())
@@ -0,0 +1,325 @@
+"""
+MongoDB 비동기 서비스 모듈 (asyncio 실행 모드용)
+
+MongoService와 같은 컬렉션/쿼리(mongo_service의 build_* 함수)를 pymongo AsyncMongoClient로 실행합니다.
+
+Author: Minseok kim
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+from pymongo import AsyncMongoClient, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from metrics import instrument_methods
+from mongo_service import (
+    INDEX_SPECS,
+    JOB_STATUS_PROJECTION,
+    build_add_job_waiter_update,
+    build_claim_job_query,
+    build_content_block_update,
+    build_finish_progress_update,
+    build_llm_response_query,
+    build_llm_response_upsert,
+    build_paper_document,
+    build_release_job_update,
+    build_renew_lease_update,
+    build_start_progress_update,
+    build_uploaded_image_upsert,
+    build_user_library_upsert,
+    build_user_paper_abstract_upsert,
+    paper_url_for,
+)
+from type import ContentAnalysisResult, PaperData
+
+logger = logging.getLogger(__name__)
+
+
+@instrument_methods("mongo")
+class AsyncMongoService:
+    """논문 데이터베이스 비동기 레포지토리"""
+
+    def __init__(self):
+        """
+        레포지토리 초기화 (연결 확인은 connect()에서 수행)
+        """
+        mongo_db_url = os.getenv("MONGODB_URL")
+        database_name = os.getenv("MONGODB_DATABASE")
+
+        self.client = AsyncMongoClient(mongo_db_url)
+        self.db = self.client[database_name]
+        self.collection = self.db.papers
+        self.user_collection = self.db.user_paper_abstracts
+        self.user_library_collection = self.db.user_libraries
+        self.uploaded_image_collection = self.db.uploaded_images
+        self.llm_cache_collection = self.db.llm_cache
+        self.job_collection = self.db.paper_jobs
+
+    async def connect(self):
+        """연결 테스트 후 인덱스를 생성합니다."""
+        try:
+            await self.client.admin.command('ping')
+            logger.info(f"MongoDB 연결 성공: {self.db.name}")
+        except Exception as e:
+            logger.error(f"MongoDB 연결 실패: {e}")
+            raise
+
+        for collection_name, keys, options in INDEX_SPECS:
+            try:
+                await self.db[collection_name].create_index(keys, **options)
+            except Exception as e:
+                logger.error(f"인덱스 생성 실패 ({collection_name}.{options['name']}): {e}")
+
+    async def find_by_id(self, id: str) -> Optional[PaperData]:
+        """
+        논문 데이터를 조회합니다.
+
+        Args:
+            id: 논문 ID
+        """
+        try:
+            return await self.collection.find_one({"_id": ObjectId(id)})
+        except Exception as e:
+            logger.error(f"논문 조회 실패: {e}")
+            return None
+
+    async def save_paper(self, paper_data: PaperData) -> Optional[ObjectId]:
+        """
+        논문 데이터를 url 기준 upsert로 저장합니다.
+
+        Args:
+            paper_data: 논문 데이터 (PaperData 타입)
+
+        Returns:
+            ObjectId: 저장된(또는 기존) 문서의 ID 또는 None
+        """
+        document = build_paper_document(paper_data)
+        for attempt in range(2):
+            try:
+                result = await self.collection.find_one_and_update(
+                    {"url": document["url"]},
+                    {"$setOnInsert": document},
+                    projection={"_id": 1},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                logger.info(f"논문 저장됨: {paper_data.get('title', 'Unknown')}")
+                return result["_id"]
+            except DuplicateKeyError:
+                if attempt:
+                    logger.error(f"논문 저장 실패: 중복 키 ({document['url']})")
+                    return None
+            except Exception as e:
+                logger.error(f"논문 저장 실패: {e}")
+                return None
+
+    async def is_paper_exists(self, arxiv_id: str) -> Optional[ObjectId]:
+        """
+        ArXiv ID로 논문이 존재하는지 확인합니다. (URL 기반 체크)
+
+        Args:
+            arxiv_id: ArXiv 논문 ID
+
+        Returns:
+            id: 논문의 ObjectId 또는 None
+        """
+        try:
+            paper = await self.collection.find_one({"url": paper_url_for(arxiv_id)}, {"_id": 1})
+            return paper["_id"] if paper else None
+        except Exception as e:
+            logger.error(f"논문 존재 확인 실패: {e}")
+            return None
+
+    async def save_user_paper_abstract(self, user_id: ObjectId, paper_id: ObjectId) -> bool:
+        """
+        사용자 논문 초록 추가 정보를 저장합니다.
+
+        Args:
+            user_id: 사용자 ID
+            paper_id: 논문 ID
+        """
+        query, update = build_user_paper_abstract_upsert(user_id, paper_id)
+        try:
+            await self.user_collection.update_one(query, update, upsert=True)
+            return True
+        except Exception as e:
+            logger.error(f"사용자 논문 초록 추가 정보 저장 실패: {e}")
+            return False
+
+    async def start_paper_progress(self, paper_id: str, total: int) -> bool:
+        """
+        분석 진행 상태를 기록합니다. (MongoService.start_paper_progress 참고)
+        """
+        try:
+            paper = await self.collection.find_one({"_id": ObjectId(paper_id)}, {"contentBlocks.order": 1})
+            completed = len((paper or {}).get("contentBlocks") or [])
+            await self.collection.update_one({"_id": ObjectId(paper_id)}, build_start_progress_update(total, completed))
+            return True
+        except Exception as e:
+            logger.error(f"논문 분석 진행 상태 저장 실패: {e}")
+            return False
+
+    async def save_content_block(self, paper_id: str, block: ContentAnalysisResult) -> bool:
+        """
+        분석이 끝난 섹션 하나를 저장합니다. (MongoService.save_content_block 참고)
+        """
+        query, update = build_content_block_update(paper_id, block)
+        try:
+            result = await self.collection.update_one(query, update)
+            return result.modified_count == 1
+        except Exception as e:
+            logger.error(f"논문 섹션 저장 실패: {paper_id} ({block['order']}) - {e}")
+            return False
+
+    async def finish_paper_progress(self, paper_id: str, status: str) -> bool:
+        """
+        분석 진행 상태를 종료 상태로 변경합니다.
+        """
+        try:
+            await self.collection.update_one({"_id": ObjectId(paper_id)}, build_finish_progress_update(status))
+            return True
+        except Exception as e:
+            logger.error(f"논문 분석 진행 상태 저장 실패: {e}")
+            return False
+
+    async def save_user_library(self, user_id: str, paper_id: str) -> bool:
+        """
+        사용자 논문 라이브러리를 저장합니다.
+        """
+        try:
+            query, update = build_user_library_upsert(user_id, paper_id)
+            await self.user_library_collection.update_one(query, update, upsert=True)
+            return True
+        except Exception as e:
+            logger.error(f"사용자 논문 라이브러리 저장 실패: {e}")
+            return False
+
+    async def find_uploaded_image(self, object_name: str) -> Optional[str]:
+        """
+        이미 업로드된 이미지의 공개 URL을 조회합니다. (MongoService.find_uploaded_image 참고)
+        """
+        try:
+            image = await self.uploaded_image_collection.find_one({"_id": object_name}, {"url": 1})
+            return image["url"] if image else None
+        except Exception as e:
+            logger.error(f"업로드 이미지 조회 실패: {e}")
+            return None
+
+    async def save_uploaded_image(self, object_name: str, public_url: str, size: int) -> bool:
+        """
+        업로드된 이미지를 인덱스에 기록합니다.
+        """
+        query, update = build_uploaded_image_upsert(object_name, public_url, size)
+        try:
+            await self.uploaded_image_collection.update_one(query, update, upsert=True)
+            return True
+        except Exception as e:
+            logger.error(f"업로드 이미지 기록 실패: {e}")
+            return False
+
+    async def find_llm_response(self, key: str) -> Optional[str]:
+        """
+        캐시된 LLM 응답을 조회합니다. (MongoService.find_llm_response 참고)
+        """
+        try:
+            cached = await self.llm_cache_collection.find_one(build_llm_response_query(key), {"value": 1})
+            return cached["value"] if cached else None
+        except Exception as e:
+            logger.error(f"LLM 응답 캐시 조회 실패: {e}")
+            return None
+
+    async def save_llm_response(self, key: str, model: str, value: str, ttl_seconds: int) -> bool:
+        """
+        LLM 응답을 캐시에 저장합니다.
+        """
+        query, update = build_llm_response_upsert(key, model, value, ttl_seconds)
+        try:
+            await self.llm_cache_collection.update_one(query, update, upsert=True)
+            return True
+        except Exception as e:
+            logger.error(f"LLM 응답 캐시 저장 실패: {e}")
+            return False
+
+    async def claim_job(self, job_key: str, owner: str, lease_seconds: int) -> bool:
+        """
+        작업을 원자적으로 선점합니다. (MongoService.claim_job 참고)
+        """
+        query, update = build_claim_job_query(job_key, owner, lease_seconds)
+        try:
+            await self.job_collection.update_one(query, update, upsert=True)
+            return True
+        except DuplicateKeyError:
+            logger.info(f"작업이 이미 실행 중: {job_key}")
+            return False
+
+    async def renew_job_lease(self, job_key: str, owner: str, lease_seconds: int) -> Optional[bool]:
+        """
+        작업 lease를 연장합니다 (heartbeat). lease를 잃었으면 False, 오류로 확인하지 못했으면 None
+        """
+        query, update = build_renew_lease_update(job_key, owner, lease_seconds)
+        try:
+            result = await self.job_collection.update_one(query, update)
+            return result.matched_count == 1
+        except Exception as e:
+            logger.error(f"작업 lease 연장 실패: {e}")
+            return None
+
+    async def release_job(self, job_key: str, owner: str, status: str) -> Optional[Dict[str, Any]]:
+        """
+        작업을 종료 상태로 변경하고 대기자 목록을 포함한 작업 문서를 반환합니다.
+        """
+        query, update = build_release_job_update(job_key, owner, status)
+        try:
+            return await self.job_collection.find_one_and_update(query, update, return_document=ReturnDocument.AFTER)
+        except Exception as e:
+            logger.error(f"작업 종료 처리 실패: {e}")
+            return None
+
+    async def add_job_waiter(self, job_key: str, waiter: str) -> Optional[Dict[str, Any]]:
+        """
+        실행 중인 작업의 결과를 기다리는 요청자를 등록합니다.
+        """
+        query, update = build_add_job_waiter_update(job_key, waiter)
+        try:
+            return await self.job_collection.find_one_and_update(query, update, return_document=ReturnDocument.AFTER)
+        except Exception as e:
+            logger.error(f"작업 대기자 등록 실패: {e}")
+            return None
+
+    async def find_job(self, job_key: str) -> Optional[Dict[str, Any]]:
+        """
+        작업 문서를 조회합니다.
+        """
+        try:
+            return await self.job_collection.find_one({"_id": job_key}, JOB_STATUS_PROJECTION)
+        except Exception as e:
+            logger.error(f"작업 조회 실패: {e}")
+            return None
+
+    async def close(self):
+        """MongoDB 연결 종료"""
+        await self.client.close()
+        logger.info("MongoDB 연결 종료됨")
+
+
+class ThreadedImageIndex:
+    """
+    AsyncMongoService의 업로드 이미지 인덱스를 file_service 업로드 스레드에서 동기 호출할 수 있게 감쌉니다.
+    코루틴은 이벤트 루프에서 실행되므로 이벤트 루프 스레드에서 호출하면 안 됩니다.
+    """
+
+    def __init__(self, service: AsyncMongoService, loop: asyncio.AbstractEventLoop):
+        self.service = service
+        self.loop = loop
+
+    def find_uploaded_image(self, object_name: str) -> Optional[str]:
+        return asyncio.run_coroutine_threadsafe(self.service.find_uploaded_image(object_name), self.loop).result()
+
+    def save_uploaded_image(self, object_name: str, public_url: str, size: int) -> bool:
+        return asyncio.run_coroutine_threadsafe(
+            self.service.save_uploaded_image(object_name, public_url, size), self.loop
+        ).result()
@@ -0,0 +1,192 @@
+"""
+벤치마크용 로컬 대체 서비스
+
+하나의 HTTP 서버에서 다음 엔드포인트를 흉내 냅니다.
+- POST /v1/chat/completions : OpenAI 호환 LLM (지연 시간 설정 가능)
+- GET  /api/query           : arXiv API (Atom 응답)
+- GET  /pdf/<id>.pdf        : arXiv PDF 다운로드
+- PUT  /<bucket>/<key>      : S3 호환 오브젝트 스토리지 업로드
+
+Author: Minseok kim
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+_ATOM_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom" '
+    'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">\n'
+    '<title>ArXiv Query</title>\n'
+    '<opensearch:totalResults>{total}</opensearch:totalResults>\n'
+    '<opensearch:startIndex>0</opensearch:startIndex>\n'
+    '<opensearch:itemsPerPage>{total}</opensearch:itemsPerPage>\n'
+)
+
+_ATOM_ENTRY = (
+    '<entry>\n'
+    '<id>http://arxiv.org/abs/{arxiv_id}v1</id>\n'
+    '<updated>2024-01-02T00:00:00Z</updated>\n'
+    '<published>2024-01-01T00:00:00Z</published>\n'
+    '<title>{title}</title>\n'
+    '<summary>{summary}</summary>\n'
+    '<author><name>Benchmark Author</name></author>\n'
+    '<author><name>Second Author</name></author>\n'
+    '<link href="http://arxiv.org/abs/{arxiv_id}v1" rel="alternate" type="text/html"/>\n'
+    '<link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}v1" rel="related" type="application/pdf"/>\n'
+    '<arxiv:primary_category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>\n'
+    '<category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>\n'
+    '</entry>\n'
+)
+
+_ABSTRACT = (
+    "We study the problem of scaling background document processing pipelines. "
+    "Our method combines batching, caching and staged execution to reduce end-to-end latency. "
+) * 6
+
+
+class FakeServices:
+    """로컬 대체 서비스 HTTP 서버"""
+
+    def __init__(
+        self,
+        pdf_provider: Callable[[str], bytes],
+        llm_latency_seconds: float = 0.5,
+        llm_jitter_seconds: float = 0.1,
+        llm_response_words: int = 120,
+        port: int = 0
+    ):
+        """
+        Args:
+            pdf_provider: arXiv ID -> PDF 바이트
+            llm_latency_seconds: LLM 응답 평균 지연 시간
+            llm_jitter_seconds: LLM 응답 지연 시간 편차 (균등 분포)
+            llm_response_words: LLM 응답 단어 수
+            port: 포트 (0이면 임의 포트)
+        """
+        self.pdf_provider = pdf_provider
+        self.llm_latency_seconds = llm_latency_seconds
+        self.llm_jitter_seconds = llm_jitter_seconds
+        self.llm_response_words = llm_response_words
+
+        self.requests: Dict[str, int] = {"llm": 0, "arxiv": 0, "pdf": 0, "s3": 0}
+        self.uploaded_bytes = 0
+        self._lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeServices":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-services", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _count(self, kind: str, uploaded: int = 0):
+        with self._lock:
+            self.requests[kind] += 1
+            self.uploaded_bytes += uploaded
+
+    def _chat_completion(self, body: Dict) -> Dict:
+        delay = self.llm_latency_seconds + random.uniform(-self.llm_jitter_seconds, self.llm_jitter_seconds)
+        time.sleep(max(0.0, delay))
+
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in body.get("messages", []))
+        content = " ".join(["analysis"] * self.llm_response_words)
+        prompt_tokens = max(1, prompt_chars // 4)
+        completion_tokens = self.llm_response_words
+        return {
+            "id": f"chatcmpl-bench-{random.getrandbits(32):08x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "bench"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    @staticmethod
+    def _atom_feed(arxiv_ids) -> str:
+        entries = "".join(
+            _ATOM_ENTRY.format(
+                arxiv_id=escape(arxiv_id),
+                title=escape(f"Benchmark Paper {arxiv_id}"),
+                summary=escape(_ABSTRACT)
+            )
+            for arxiv_id in arxiv_ids
+        )
+        return _ATOM_HEADER.format(total=len(arxiv_ids)) + entries + "</feed>\n"
+
+    def _handler_class(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def do_POST(self):
+                body = self._read_body()
+                if self.path.rstrip("/").endswith("/chat/completions"):
+                    services._count("llm")
+                    response = services._chat_completion(json.loads(body or b"{}"))
+                    self._send(200, json.dumps(response).encode(), "application/json")
+                else:
+                    self._send(404, b"{}", "application/json")
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/api/query":
+                    services._count("arxiv")
+                    id_list = parse_qs(url.query).get("id_list", [""])[0]
+                    arxiv_ids = [arxiv_id for arxiv_id in id_list.split(",") if arxiv_id]
+                    self._send(200, services._atom_feed(arxiv_ids).encode(), "application/atom+xml")
+                elif url.path.startswith("/pdf/"):
+                    services._count("pdf")
+                    arxiv_id = url.path[len("/pdf/"):].removesuffix(".pdf")
+                    self._send(200, services.pdf_provider(arxiv_id), "application/pdf")
+                else:
+                    self._send(404, b"", "text/plain")
+
+            def do_PUT(self):
+                body = self._read_body()
+                services._count("s3", len(body))
+                self._send(200, b"", "application/xml", {"ETag": f'"{len(body):x}"'})
+
+        return Handler
@@ -0,0 +1,243 @@
+"""
+오프라인 벤치마크
+
+Redis/Mongo/LLM/arXiv/오브젝트 스토리지를 로컬 대체 서비스로 바꾼 뒤 main.py의 핸들러
+(스케줄러 -> 초록 요약 / 분석 파이프라인)를 그대로 실행하여 흐름별 처리량과 지연 시간,
+단계별 처리 시간(metrics 모듈)을 보고합니다. 네트워크 연결 없이 실행됩니다.
+
+- LLM, arXiv API, PDF 다운로드, S3 업로드: benchmark.fake_services
+- Mongo: mongomock (--mongodb-url 지정 시 로컬 mongod)
+- Redis: 메시지를 핸들러에 직접 전달 (구독은 시작하지 않음)
+- PDF: benchmark.sample_pdf로 생성 (--pdf-dir 지정 시 해당 디렉토리의 PDF 사용)
+
+실행: python -m benchmark.run --papers 20 --llm-latency-ms 500
+
+Author: Minseok kim
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import arxiv
+from bson import ObjectId
+
+from benchmark.fake_services import FakeServices
+from benchmark.sample_pdf import generate_paper_pdf
+
+logger = logging.getLogger("benchmark")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="curatify-background 오프라인 벤치마크")
+    parser.add_argument("--papers", type=int, default=20, help="논문 수")
+    parser.add_argument("--users", type=int, default=4, help="요청 사용자 수 (논문을 나누어 요청)")
+    parser.add_argument("--flow", choices=["abstract", "analysis", "both"], default="both")
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100)
+    parser.add_argument("--llm-response-words", type=int, default=120)
+    parser.add_argument("--sections", type=int, default=6, help="생성 PDF의 섹션 수")
+    parser.add_argument("--figures", type=int, default=2, help="생성 PDF의 그림 수")
+    parser.add_argument("--pdf-dir", help="생성 PDF 대신 사용할 PDF 디렉토리")
+    parser.add_argument("--mongodb-url", help="mongomock 대신 사용할 MongoDB URL")
+    parser.add_argument("--llm-cache", action="store_true", help="LLM 응답 캐시 사용 (기본값: 사용 안 함)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    return parser.parse_args()
+
+
+class _PdfProvider:
+    """arXiv ID -> PDF 바이트 (생성 PDF는 논문마다 한 번만 생성)"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.files = sorted(Path(args.pdf_dir).glob("*.pdf")) if args.pdf_dir else []
+        self._cache: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, arxiv_id: str) -> bytes:
+        with self._lock:
+            if arxiv_id not in self._cache:
+                if self.files:
+                    index = int(arxiv_id.split(".")[-1]) % len(self.files)
+                    self._cache[arxiv_id] = self.files[index].read_bytes()
+                else:
+                    self._cache[arxiv_id] = generate_paper_pdf(
+                        f"Benchmark Paper {arxiv_id}", sections=self.args.sections, figures=self.args.figures
+                    )
+            return self._cache[arxiv_id]
+
+
+def _configure_environment(args: argparse.Namespace, services: FakeServices, work_dir: str):
+    base_url = services.base_url
+    os.environ.update({
+        "OPENAI_BASE_URL": f"{base_url}/v1",
+        "OPENAI_API_KEY": "benchmark",
+        "OCI_ENDPOINT_URL": base_url,
+        "OCI_NAMESPACE": "benchmark",
+        "OCI_REGION": "local",
+        "OCI_ACCESS_KEY": "benchmark",
+        "OCI_SECRET_KEY": "benchmark",
+        "OCI_BUCKET": "benchmark",
+        "ARXIV_PDF_BASE_URL": f"{base_url}/pdf",
+        "MONGODB_URL": args.mongodb_url or "mongodb://localhost:27017",
+        "MONGODB_DATABASE": f"curatify_benchmark_{int(time.time())}",
+        # 구독을 시작하지 않으므로 Redis에 연결하지 않음
+        "INGESTION_MODE": "streams",
+        "REDIS_URL": "redis://127.0.0.1:6379/0",
+        "LLM_CACHE_ENABLED": "true" if args.llm_cache else "false",
+        "LLM_CACHE_PATH": os.path.join(work_dir, "llm_cache.sqlite3"),
+        "CHECKPOINT_DIR": os.path.join(work_dir, "checkpoints"),
+        "SCHEDULER_STATS_INTERVAL_SECONDS": "0",
+    })
+    arxiv.Client.query_url_format = f"{base_url}/api/query?{{}}"
+
+    if not args.mongodb_url:
+        import mongomock
+        import mongo_service
+        mongo_service.MongoClient = mongomock.MongoClient
+
+
+def _summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0.0
+
+    return {
+        "messages": len(latencies),
+        "elapsed_seconds": elapsed,
+        "throughput_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_mean_seconds": statistics.fmean(latencies) if latencies else 0.0,
+        "latency_p50_seconds": percentile(0.5),
+        "latency_p95_seconds": percentile(0.95),
+        "latency_max_seconds": ordered[-1] if ordered else 0.0,
+    }
+
+
+def _run_flow(submit, messages: List[Dict[str, str]]) -> Dict[str, float]:
+    """메시지를 한꺼번에 제출하고 메시지별 완료 시간을 측정합니다."""
+    latencies: List[float] = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def on_done(submitted_at: float):
+        def callback(_):
+            with lock:
+                latencies.append(time.perf_counter() - submitted_at)
+        return callback
+
+    futures = []
+    for message in messages:
+        submitted_at = time.perf_counter()
+        future = submit(json.dumps(message))
+        future.add_done_callback(on_done(submitted_at))
+        futures.append(future)
+    for future in futures:
+        future.exception()
+
+    return _summarize(latencies, time.perf_counter() - started)
+
+
+def _stage_metrics() -> Dict[str, Dict[str, float]]:
+    """metrics 모듈의 단계별 히스토그램을 count/sum/mean으로 정리합니다."""
+    from prometheus_client import REGISTRY
+
+    stages: Dict[str, Dict[str, float]] = {}
+    for family in REGISTRY.collect():
+        if family.name not in ("curatify_stage_duration_seconds", "curatify_mongo_operation_duration_seconds"):
+            continue
+        for sample in family.samples:
+            name = sample.labels.get("stage") or sample.labels.get("operation")
+            if sample.name.endswith("_count"):
+                stages.setdefault(name, {})["count"] = sample.value
+            elif sample.name.endswith("_sum"):
+                stages.setdefault(name, {})["total_seconds"] = sample.value
+    for values in stages.values():
+        count = values.get("count", 0)
+        values["mean_seconds"] = values.get("total_seconds", 0.0) / count if count else 0.0
+    return {name: values for name, values in sorted(stages.items()) if values.get("count")}
+
+
+def _print_report(report: Dict):
+    print("\n=== 흐름별 결과 ===")
+    for flow in ("startup", "abstract", "analysis"):
+        if flow not in report:
+            continue
+        if flow == "startup":
+            print(f"startup: {report[flow]['seconds']:.2f}s")
+            continue
+        r = report[flow]
+        print(
+            f"{flow}: {r['messages']} msgs in {r['elapsed_seconds']:.2f}s "
+            f"({r['throughput_per_second']:.2f}/s) "
+            f"mean {r['latency_mean_seconds']:.2f}s p50 {r['latency_p50_seconds']:.2f}s "
+            f"p95 {r['latency_p95_seconds']:.2f}s max {r['latency_max_seconds']:.2f}s"
+        )
+
+    print("\n=== 단계별 처리 시간 ===")
+    for stage, values in report["stages"].items():
+        print(f"{stage:40s} count {int(values['count']):6d}  mean {values['mean_seconds']:.4f}s  total {values['total_seconds']:.2f}s")
+
+    print("\n=== 대체 서비스 요청 수 ===")
+    print(json.dumps(report["fake_services"], ensure_ascii=False))
+
+
+def main(args: Optional[argparse.Namespace] = None):
+    args = args or _parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    work_dir = tempfile.mkdtemp(prefix="curatify-benchmark-")
+    services = FakeServices(
+        _PdfProvider(args),
+        llm_latency_seconds=args.llm_latency_ms / 1000,
+        llm_jitter_seconds=args.llm_jitter_ms / 1000,
+        llm_response_words=args.llm_response_words
+    ).start()
+    _configure_environment(args, services, work_dir)
+
+    # main 모듈 import 시 워커 구성 요소(Mongo, docling 워밍업, 파이프라인, 스케줄러)가 생성됨
+    started = time.perf_counter()
+    import main as worker
+    report: Dict = {"startup": {"seconds": time.perf_counter() - started}}
+
+    arxiv_ids = [f"2401.{i:05d}" for i in range(1, args.papers + 1)]
+    user_ids = [str(ObjectId()) for _ in range(max(1, args.users))]
+
+    if args.flow in ("abstract", "both"):
+        messages = [{"user_id": user_ids[i % len(user_ids)], "paper_id": arxiv_id} for i, arxiv_id in enumerate(arxiv_ids)]
+        report["abstract"] = _run_flow(worker.handle_abstract_queue, messages)
+
+    if args.flow in ("analysis", "both"):
+        messages = []
+        for i, arxiv_id in enumerate(arxiv_ids):
+            paper_object_id = worker.mongo_service.is_paper_exists(arxiv_id)
+            if paper_object_id is None:
+                # 초록 흐름을 건너뛴 경우 분석 대상 논문 문서를 직접 생성
+                paper_object_id = worker.mongo_service.save_paper({
+                    "title": f"Benchmark Paper {arxiv_id}",
+                    "url": f"https://arxiv.org/abs/{arxiv_id}",
+                    "contentBlocks": []
+                })
+            messages.append({"user_id": user_ids[i % len(user_ids)], "paper_id": str(paper_object_id)})
+        report["analysis"] = _run_flow(worker.handle_content_queue, messages)
+
+    report["stages"] = _stage_metrics()
+    report["fake_services"] = {**services.requests, "uploaded_bytes": services.uploaded_bytes}
+    services.stop()
+
+    _print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+벤치마크용 샘플 PDF 생성
+
+외부 파일 없이 섹션 제목, 본문 문단, 그림(RGB 이미지)으로 구성된 논문 형태의 PDF를 생성합니다.
+실제 논문으로 측정하려면 run.py의 --pdf-dir 옵션을 사용하세요.
+
+Author: Minseok kim
+"""
+
+import zlib
+from typing import List
+
+_PAGE_WIDTH = 612
+_PAGE_HEIGHT = 792
+_MARGIN = 72
+_LINE_HEIGHT = 14
+_CHARS_PER_LINE = 90
+
+_SENTENCES = [
+    "We propose a staged pipeline that overlaps network, CPU and model inference work.",
+    "Experiments show that batching requests reduces the number of upstream calls significantly.",
+    "The conversion step dominates the latency of long documents with many figures.",
+    "Caching intermediate results allows interrupted jobs to resume without repeating work.",
+    "We report throughput and tail latency under a range of concurrency settings.",
+    "Ablations confirm that each component contributes to the overall improvement.",
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str) -> List[str]:
+    lines, line = [], ""
+    for word in text.split():
+        if len(line) + len(word) + 1 > _CHARS_PER_LINE:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _figure(seed: int, width: int = 160, height: int = 120) -> bytes:
+    """단순한 그라데이션 RGB 이미지 (FlateDecode 압축)"""
+    rows = bytearray()
+    for y in range(height):
+        for x in range(width):
+            rows += bytes(((x * 255 // width + seed * 40) % 256, (y * 255 // height) % 256, (seed * 70) % 256))
+    return zlib.compress(bytes(rows))
+
+
+def generate_paper_pdf(title: str, sections: int = 6, paragraphs_per_section: int = 3, figures: int = 2) -> bytes:
+    """
+    논문 형태의 PDF를 생성합니다.
+
+    Args:
+        title: 논문 제목
+        sections: 섹션 수
+        paragraphs_per_section: 섹션당 문단 수
+        figures: 그림 수 (앞쪽 섹션부터 하나씩 배치)
+
+    Returns:
+        bytes: PDF 바이트
+    """
+    # 페이지별 (텍스트 연산, 그림 이름 목록)
+    pages: List[List[str]] = [[]]
+    page_figures: List[List[int]] = [[]]
+    y = _PAGE_HEIGHT - _MARGIN
+
+    def new_page():
+        nonlocal y
+        pages.append([])
+        page_figures.append([])
+        y = _PAGE_HEIGHT - _MARGIN
+
+    def text(line: str, size: int):
+        nonlocal y
+        if y < _MARGIN + size:
+            new_page()
+        pages[-1].append(f"BT /F1 {size} Tf {_MARGIN} {y} Td ({_escape(line)}) Tj ET")
+        y -= max(_LINE_HEIGHT, size + 4)
+
+    text(title, 18)
+    y -= _LINE_HEIGHT
+    for s in range(sections):
+        y -= _LINE_HEIGHT // 2
+        text(f"{s + 1} Section {s + 1}", 14)
+        for p in range(paragraphs_per_section):
+            sentences = " ".join(_SENTENCES[(s + p + i) % len(_SENTENCES)] for i in range(5))
+            for line in _wrap(sentences):
+                text(line, 10)
+            y -= _LINE_HEIGHT // 2
+        if s < figures:
+            if y < _MARGIN + 150:
+                new_page()
+            y -= 130
+            pages[-1].append(f"q 200 0 0 150 {_MARGIN} {y} cm /Im{s} Do Q")
+            page_figures[-1].append(s)
+            y -= _LINE_HEIGHT
+            text(f"Figure {s + 1}: Result of experiment {s + 1}.", 9)
+
+    # PDF 객체 구성: 1 catalog, 2 pages, 3 font, 4.. 이미지, 이후 페이지/콘텐츠
+    objects: List[bytes] = []
+
+    def add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    catalog = add(b"")
+    pages_obj = add(b"")
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    image_objs = {}
+    for f in range(min(figures, sections)):
+        data = _figure(f)
+        image_objs[f] = add(
+            b"<< /Type /XObject /Subtype /Image /Width 160 /Height 120 /ColorSpace /DeviceRGB "
+            b"/BitsPerComponent 8 /Filter /FlateDecode /Length " + str(len(data)).encode() + b" >>\nstream\n"
+            + data + b"\nendstream"
+        )
+
+    page_ids = []
+    for ops, figs in zip(pages, page_figures):
+        stream = "\n".join(ops).encode("latin-1")
+        content = add(b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream")
+        xobjects = " ".join(f"/Im{f} {image_objs[f]} 0 R" for f in figs)
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_obj} 0 R /MediaBox [0 0 {_PAGE_WIDTH} {_PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {font} 0 R >> /XObject << {xobjects} >> >> "
+            f"/Contents {content} 0 R >>".encode()
+        ))
+
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_obj} 0 R >>".encode()
+    objects[pages_obj - 1] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{p} 0 R' for p in page_ids)}] /Count {len(page_ids)} >>".encode()
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
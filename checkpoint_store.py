@@ -0,0 +1,121 @@
+"""
+논문 분석 체크포인트 모듈
+
+중단된 분석 작업을 다시 실행할 때 끝난 단계를 건너뛸 수 있도록 단계별 결과를 보관합니다.
+- 다운로드한 PDF: 로컬 디스크 (CHECKPOINT_DIR, 컨테이너 재시작 시 유지됨)
+- 파싱된 섹션 / 업로드된 이미지 URL: Mongo analysis_checkpoints 컬렉션
+- 완료된 섹션 분석: papers.contentBlocks (섹션 단위 저장)
+
+Author: Minseok kim
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from mongo_service import MongoService
+from type import ContentAnalysisResult, Section
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointStore:
+    """논문 분석 단계별 체크포인트 저장소"""
+
+    def __init__(self, mongo_service: MongoService, directory: Optional[str] = None, ttl_seconds: Optional[int] = None):
+        """
+        Args:
+            mongo_service: MongoService
+            directory: PDF 체크포인트 디렉토리 (기본값: CHECKPOINT_DIR 환경변수)
+            ttl_seconds: PDF 체크포인트 유효 시간 (기본값: CHECKPOINT_TTL_SECONDS 환경변수, 7일)
+        """
+        self.mongo_service = mongo_service
+        self.directory = directory or os.getenv("CHECKPOINT_DIR", ".cache/checkpoints")
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(os.getenv("CHECKPOINT_TTL_SECONDS", str(7 * 24 * 3600)))
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _pdf_path(self, paper_id: str) -> str:
+        return os.path.join(self.directory, f"{paper_id}.pdf")
+
+    def load_pdf(self, paper_id: str) -> Optional[bytes]:
+        """다운로드해 둔 PDF를 반환합니다. 없거나 만료되었으면 None"""
+        path = self._pdf_path(paper_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"PDF 체크포인트 읽기 실패: {paper_id} - {e}")
+            return None
+
+    def save_pdf(self, paper_id: str, pdf_bytes: bytes):
+        """PDF를 저장합니다. (임시 파일에 쓴 뒤 rename 하여 중간에 끊긴 파일이 남지 않도록 함)"""
+        path = self._pdf_path(paper_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(pdf_bytes)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"PDF 체크포인트 저장 실패: {paper_id} - {e}")
+
+    def load_parsed(self, paper_id: str) -> Tuple[Optional[List[Section]], Dict[str, str], List[str]]:
+        """
+        파싱 체크포인트를 조회합니다.
+
+        Returns:
+            Tuple: (섹션 목록 또는 None, 이미지 키 -> 공개 URL, 이미지 키 목록)
+        """
+        checkpoint = self.mongo_service.find_analysis_checkpoint(paper_id)
+        if not checkpoint or not checkpoint.get("sections"):
+            return None, {}, []
+
+        try:
+            sections = json.loads(checkpoint["sections"])
+        except (TypeError, ValueError) as e:
+            # 손상된 체크포인트는 무시하고 다시 파싱
+            logger.error(f"파싱 체크포인트 읽기 실패, 다시 파싱합니다: {paper_id} - {e}")
+            return None, {}, []
+
+        if not isinstance(sections, list) or not all(
+            isinstance(section, dict) and "title" in section and isinstance(section.get("chunks"), list)
+            for section in sections
+        ):
+            # 이전 형식([제목, 마크다운 본문])이거나 알 수 없는 형식의 체크포인트는 다시 파싱
+            return None, {}, []
+
+        image_urls = {item["key"]: item["url"] for item in checkpoint.get("imageUrls", [])}
+        return sections, image_urls, checkpoint.get("imageKeys", [])
+
+    def save_parsed(self, paper_id: str, sections: List[Section], image_keys: List[str]):
+        """파싱된 섹션을 저장합니다. (섹션 제목에 '.'/'$'가 올 수 있어 JSON 문자열로 저장)"""
+        self.mongo_service.save_analysis_checkpoint(paper_id, json.dumps(sections, ensure_ascii=False), image_keys)
+
+    def save_image_url(self, paper_id: str, image_key: str, public_url: str):
+        """업로드가 끝난 이미지의 공개 URL을 저장합니다."""
+        self.mongo_service.save_checkpoint_image_url(paper_id, image_key, public_url)
+
+    @staticmethod
+    def completed_blocks(paper_data: Dict[str, Any]) -> Dict[int, ContentAnalysisResult]:
+        """이미 저장된 (성공한) 섹션 분석 결과를 order 기준으로 반환합니다."""
+        return {
+            block["order"]: block
+            for block in paper_data.get("contentBlocks") or []
+            if block.get("content") is not None
+        }
+
+    def clear(self, paper_id: str):
+        """분석이 완료된 논문의 체크포인트를 삭제합니다."""
+        self.mongo_service.delete_analysis_checkpoint(paper_id)
+        try:
+            os.remove(self._pdf_path(paper_id))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"PDF 체크포인트 삭제 실패: {paper_id} - {e}")
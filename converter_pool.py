@@ -0,0 +1,193 @@
+"""
+docling DocumentConverter 풀 모듈
+
+파이프라인 프로필별로 DocumentConverter를 한 번만 생성/워밍업하여
+레이아웃/테이블 모델을 매 논문마다 다시 로드하지 않도록 합니다.
+
+Author: Minseok kim
+"""
+
+import gc
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from docling.datamodel.base_models import InputFormat
+from docling.datamodel.pipeline_options import PdfPipelineOptions
+from docling.document_converter import DocumentConverter, PdfFormatOption
+import pypdfium2
+
+logger = logging.getLogger(__name__)
+
+
+def _default_pipeline_options() -> PdfPipelineOptions:
+    """기본 프로필: 그림 이미지 생성 (페이지 이미지는 결과에 보관하지 않음)"""
+    pipe_opts = PdfPipelineOptions()
+    pipe_opts.images_scale = 2.0                  # 해상도(1 ~= 72 DPI)
+    pipe_opts.generate_page_images = False
+    pipe_opts.generate_picture_images = True
+    return pipe_opts
+
+
+# 프로필 이름 -> PdfPipelineOptions 생성 함수
+PIPELINE_PROFILES: Dict[str, Callable[[], PdfPipelineOptions]] = {
+    "default": _default_pipeline_options,
+}
+
+_converters: Dict[str, DocumentConverter] = {}
+_lock = threading.Lock()
+
+
+def get_converter(profile: str = "default") -> DocumentConverter:
+    """
+    프로필에 해당하는 DocumentConverter를 반환합니다. 없으면 생성 후 워밍업합니다.
+
+    Args:
+        profile: 파이프라인 프로필 이름
+
+    Returns:
+        DocumentConverter: 재사용 가능한 컨버터
+
+    Raises:
+        ValueError: 등록되지 않은 프로필인 경우
+    """
+    converter = _converters.get(profile)
+    if converter is not None:
+        return converter
+
+    with _lock:
+        if profile in _converters:
+            return _converters[profile]
+
+        if profile not in PIPELINE_PROFILES:
+            raise ValueError(f"등록되지 않은 파이프라인 프로필입니다: {profile}")
+
+        started = time.perf_counter()
+        converter = DocumentConverter(
+            format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=PIPELINE_PROFILES[profile]())}
+        )
+        # 파이프라인(레이아웃/테이블 모델) 미리 로드
+        converter.initialize_pipeline(InputFormat.PDF)
+        logger.info(f"docling 컨버터 워밍업 완료 ({profile}): {time.perf_counter() - started:.2f}s")
+
+        _converters[profile] = converter
+        return converter
+
+
+def warmup(profiles: Optional[Iterable[str]] = None, freeze: bool = True) -> None:
+    """
+    워커 시작 시 컨버터를 미리 생성합니다.
+    fork 전에 호출하면 자식 프로세스들이 로드된 모델 메모리를 copy-on-write로 공유합니다.
+
+    Args:
+        profiles: 워밍업할 프로필 목록 (기본값: DOCLING_WARMUP_PROFILES 환경변수 또는 "default")
+        freeze: 워밍업 후 gc.freeze() 호출 여부 (GC가 공유 페이지를 건드려 복사되는 것을 방지)
+    """
+    if profiles is None:
+        profiles = [p.strip() for p in os.getenv("DOCLING_WARMUP_PROFILES", "default").split(",") if p.strip()]
+
+    started = time.perf_counter()
+    for profile in profiles:
+        get_converter(profile)
+    logger.info(f"docling 컨버터 풀 워밍업 완료: {list(profiles)} ({time.perf_counter() - started:.2f}s)")
+
+    if freeze:
+        gc.freeze()
+
+
+def create_process_pool(max_workers: int, warmup_parent: bool = True) -> ProcessPoolExecutor:
+    """
+    docling 변환용 프로세스 풀을 생성하고 워커 프로세스를 바로 fork 합니다.
+
+    스케줄러/하트비트/업로드 등 다른 스레드가 시작되기 전에 호출해야 합니다.
+    스레드가 잡고 있던 락(logging, pymongo, boto3 등)은 fork된 자식에서 풀리지 않아 교착될 수 있기 때문입니다.
+    워커 프로세스는 이후 다시 fork되지 않으므로 (ProcessPoolExecutor는 fork 방식에서 워커를 한 번에 생성)
+    프로세스 시작 이후에 생긴 스레드의 영향을 받지 않습니다.
+
+    Args:
+        max_workers: 워커 프로세스 수
+        warmup_parent: fork 전에 부모에서 컨버터를 워밍업할지 여부
+            (True: 자식들이 모델 메모리를 copy-on-write로 공유, False: 각 자식이 시작 시 로드)
+
+    Returns:
+        ProcessPoolExecutor: 워커 프로세스가 시작된 프로세스 풀
+    """
+    if threading.active_count() > 1:
+        logger.warning(
+            f"다른 스레드가 실행 중인 상태에서 프로세스 풀을 fork 합니다: "
+            f"{[thread.name for thread in threading.enumerate() if thread is not threading.main_thread()]}"
+        )
+    if warmup_parent:
+        warmup()
+
+    pool = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=warmup,
+        initargs=(None, False)
+    )
+    # 첫 submit 시점에 워커 프로세스가 모두 fork 되므로 지금 fork 하도록 빈 작업을 보냄
+    pool.submit(os.getpid)
+    return pool
+
+
+def convert(source, profile: str = "default", **kwargs):
+    """
+    풀의 컨버터로 문서를 변환하고 소요 시간을 기록합니다.
+
+    Args:
+        source: DocumentStream 또는 파일 경로
+        profile: 파이프라인 프로필 이름
+
+    Returns:
+        ConversionResult: docling 변환 결과
+    """
+    converter = get_converter(profile)
+    started = time.perf_counter()
+    res = converter.convert(source, **kwargs)
+    logger.info(f"docling 변환 완료 ({profile}): {time.perf_counter() - started:.2f}s")
+    return res
+
+
+def page_count(pdf_bytes: bytes) -> int:
+    """
+    PDF의 페이지 수를 반환합니다. (docling이 사용하는 pypdfium2로 변환 없이 조회)
+
+    Args:
+        pdf_bytes: PDF 파일 바이트
+
+    Returns:
+        int: 페이지 수
+    """
+    pdf = pypdfium2.PdfDocument(pdf_bytes)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def plan_page_shards(pages: int, max_shards: int) -> List[Tuple[int, int]]:
+    """
+    페이지 수가 많은 PDF를 병렬 변환할 페이지 범위로 나눕니다.
+    PDF_SHARD_MIN_PAGES 미만이면 나누지 않고, 조각은 최소 PDF_SHARD_PAGES 페이지로 구성됩니다.
+
+    Args:
+        pages: PDF 페이지 수
+        max_shards: 최대 조각 수 (보통 변환 프로세스 수)
+
+    Returns:
+        List[Tuple[int, int]]: 1부터 시작하는 (시작, 끝) 페이지 범위 목록 (끝 포함). 나누지 않으면 빈 목록
+    """
+    min_pages = int(os.getenv("PDF_SHARD_MIN_PAGES", "40"))
+    shard_pages = max(1, int(os.getenv("PDF_SHARD_PAGES", "16")))
+    if max_shards < 2 or pages < max(min_pages, 2):
+        return []
+
+    shard_pages = max(shard_pages, math.ceil(pages / max_shards))
+    ranges = [(start, min(start + shard_pages - 1, pages)) for start in range(1, pages + 1, shard_pages)]
+    return ranges if len(ranges) > 1 else []
@@ -1,15 +1,22 @@
-import boto3
 import os
 import mimetypes
-import uuid
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Optional
 from dotenv import load_dotenv
 
+from metrics import UPLOAD_BYTES, timed
+from utils.image_utils import optimize_image
+from utils.ttl_cache import TTLCache
+
 load_dotenv()
 
 # OCI Object Storage configuration
 oci_namespace = os.getenv("OCI_NAMESPACE")  # OCI 네임스페이스
 oci_region = os.getenv("OCI_REGION")  # 리전
-oci_endpoint = f"https://{oci_namespace}.compat.objectstorage.{oci_region}.oraclecloud.com"
+# S3 호환 엔드포인트 (OCI_ENDPOINT_URL로 로컬 S3 호환 서버 등으로 변경 가능)
+oci_endpoint = os.getenv("OCI_ENDPOINT_URL") or f"https://{oci_namespace}.compat.objectstorage.{oci_region}.oraclecloud.com"
 oci_access_key_id = os.getenv("OCI_ACCESS_KEY") # Replace with your OCI Customer Secret Key Access Key ID
 oci_secret_access_key = os.getenv("OCI_SECRET_KEY") # Replace with your OCI Customer Secret Key Secret Access Key
 bucket_name = os.getenv("OCI_BUCKET") # Replace with your OCI bucket name
@@ -18,14 +25,94 @@ bucket_name = os.getenv("OCI_BUCKET") # Replace with your OCI bucket name
 if not all([oci_namespace, oci_access_key_id, oci_secret_access_key, bucket_name]):
     raise RuntimeError("OCI 환경변수가 설정되지 않았습니다. .env 파일을 확인하세요.")
 
-# Create an S3 client for OCI Object Storage
-s3_client = boto3.client(
-    's3',
-    endpoint_url=oci_endpoint,
-    aws_access_key_id=oci_access_key_id,
-    aws_secret_access_key=oci_secret_access_key
+# 동시 업로드 수 (S3 클라이언트 커넥션 풀 크기와 동일하게 맞춤)
+upload_max_concurrency = int(os.getenv("UPLOAD_MAX_CONCURRENCY", "16"))
+
+# S3 client for OCI Object Storage (boto3 클라이언트는 스레드 간 공유 가능, 첫 업로드 시 생성)
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+upload_executor = ThreadPoolExecutor(max_workers=upload_max_concurrency, thread_name_prefix="upload")
+
+# 지원되는 이미지 형식 및 기본 MIME 타입 매핑
+mime_mapping = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.svg': 'image/svg+xml'
+}
+
+# 콘텐츠 해시 기반 업로드 인덱스 (객체 이름 -> 공개 URL)
+# 장시간 실행되는 워커의 메모리가 계속 늘지 않도록 크기/유효 시간을 제한 (밀려난 항목은 영속 인덱스 image_index 에서 다시 조회)
+_uploaded_urls = TTLCache(
+    ttl_seconds=float(os.getenv("UPLOAD_INDEX_CACHE_TTL_SECONDS", "86400")),
+    max_size=int(os.getenv("UPLOAD_INDEX_CACHE_MAX_SIZE", "50000"))
 )
+# 업로드 진행 중인 객체 (같은 이미지의 중복 업로드 방지)
+_inflight_uploads: Dict[str, Future] = {}
+_index_lock = threading.Lock()
+
+# 영속 인덱스 (find_uploaded_image / save_uploaded_image 를 제공하는 객체, 예: MongoService)
+image_index = None
+
+
+def get_s3_client():
+    """
+    OCI Object Storage용 S3 클라이언트를 반환합니다.
+    boto3 import와 클라이언트 생성 비용이 커서 첫 업로드 시 한 번만 생성합니다.
+    """
+    global _s3_client
+    if _s3_client is None:
+        with _s3_client_lock:
+            if _s3_client is None:
+                import boto3
+                from botocore.config import Config
+
+                _s3_client = boto3.client(
+                    's3',
+                    endpoint_url=oci_endpoint,
+                    aws_access_key_id=oci_access_key_id,
+                    aws_secret_access_key=oci_secret_access_key,
+                    config=Config(max_pool_connections=upload_max_concurrency)
+                )
+    return _s3_client
+
+
+def set_image_index(index) -> None:
+    """
+    업로드된 이미지의 영속 인덱스를 설정합니다.
+    
+    Args:
+        index: find_uploaded_image(object_name), save_uploaded_image(object_name, public_url, size) 를 제공하는 객체
+    """
+    global image_index
+    image_index = index
+
+
+def _object_name_for(data: bytes, file_extension: str) -> str:
+    """이미지 바이트의 SHA-256 해시로 객체 이름을 생성합니다."""
+    return f"images/{hashlib.sha256(data).hexdigest()}{file_extension}"
 
+
+def _public_url_for(object_name: str) -> str:
+    """객체 이름으로 공개 URL을 생성합니다."""
+    return f"https://objectstorage.{oci_region}.oraclecloud.com/n/{oci_namespace}/b/{bucket_name}/o/{object_name}"
+
+
+def _find_uploaded(object_name: str) -> Optional[str]:
+    """로컬 인덱스, 영속 인덱스 순으로 이미 업로드된 이미지의 URL을 조회합니다."""
+    public_url = _uploaded_urls.get(object_name)
+    if public_url or image_index is None:
+        return public_url
+
+    public_url = image_index.find_uploaded_image(object_name)
+    if public_url:
+        _uploaded_urls.set(object_name, public_url)
+    return public_url
+
+@timed("upload.file")
 def upload_file_to_oci(local_file_path: str) -> str:
     """
     로컬 파일을 OCI Object Storage에 업로드하고 공개 URL을 반환합니다.
@@ -49,50 +136,115 @@ def upload_file_to_oci(local_file_path: str) -> str:
     file_name = os.path.basename(local_file_path)
     file_extension = os.path.splitext(file_name)[1].lower()
     
+    with open(local_file_path, 'rb') as f:
+        data = f.read()
+    
+    return _optimize_and_upload(data, file_extension)
+
+
+def _optimize_and_upload(data: bytes, file_extension: str) -> str:
+    """이미지를 후처리(크기 제한, 형식 선택)한 뒤 업로드합니다."""
+    data, file_extension = optimize_image(data, file_extension)
+    return upload_bytes_to_oci(data, file_extension)
+
+
+@timed("upload.bytes")
+def upload_bytes_to_oci(data: bytes, file_extension: str) -> str:
+    """
+    메모리상의 이미지 바이트를 OCI Object Storage에 업로드하고 공개 URL을 반환합니다.
+    
+    Args:
+        data (bytes): 업로드할 이미지 바이트
+        file_extension (str): 파일 확장자 (예: ".png")
+    
+    Returns:
+        str: 업로드된 파일의 공개 웹 엔드포인트 URL
+    
+    Raises:
+        ValueError: 지원되지 않는 파일 형식인 경우
+        RuntimeError: 업로드 실패 시
+    """
+    file_extension = file_extension.lower()
+    
     # 지원되는 이미지 형식 확인
-    supported_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg'}
-    if file_extension not in supported_extensions:
-        raise ValueError(f"지원되지 않는 파일 형식입니다: {file_extension}. 지원 형식: {', '.join(supported_extensions)}")
+    if file_extension not in mime_mapping:
+        raise ValueError(f"지원되지 않는 파일 형식입니다: {file_extension}. 지원 형식: {', '.join(mime_mapping)}")
     
     # MIME 타입 결정
-    content_type, _ = mimetypes.guess_type(local_file_path)
-    if not content_type:
-        # 기본 MIME 타입 매핑
-        mime_mapping = {
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.webp': 'image/webp',
-            '.svg': 'image/svg+xml'
-        }
-        content_type = mime_mapping.get(file_extension, 'application/octet-stream')
-    
-    # 객체 이름 생성 (UUID 기반으로 자동 생성)
-    unique_id = str(uuid.uuid4())
-    object_name = f"images/{unique_id}{file_extension}"
+    content_type = mimetypes.types_map.get(file_extension) or mime_mapping[file_extension]
+    
+    # 객체 이름 생성 (콘텐츠 해시 기반, 같은 이미지는 같은 키)
+    object_name = _object_name_for(data, file_extension)
+    
+    # 이미 업로드된 이미지는 기존 URL을 바로 반환
+    public_url = _find_uploaded(object_name)
+    if public_url:
+        return public_url
     
     try:
-        # 파일 크기 확인
-        file_size = os.path.getsize(local_file_path)
-        print(f"업로드 시작: {file_name} ({file_size} bytes)")
+        print(f"업로드 시작: {object_name} ({len(data)} bytes)")
         
         # 파일 업로드
-        with open(local_file_path, 'rb') as f:
-            s3_client.put_object(
-                Bucket=bucket_name,
-                Key=object_name,
-                Body=f,
-                ContentType=content_type
-            )
+        get_s3_client().put_object(
+            Bucket=bucket_name,
+            Key=object_name,
+            Body=data,
+            ContentType=content_type
+        )
+        UPLOAD_BYTES.inc(len(data))
         
         # 공개 URL 생성
-        public_url = f"https://objectstorage.{oci_region}.oraclecloud.com/n/{oci_namespace}/b/{bucket_name}/o/{object_name}"
+        public_url = _public_url_for(object_name)
         
         print(f"파일 업로드 성공: {public_url}")
-        return public_url
         
     except Exception as e:
         print(f"파일 업로드 실패: {e}")
         raise RuntimeError(e)
+    
+    # 업로드 인덱스 기록 (인덱스 저장 실패는 업로드 결과에 영향을 주지 않음)
+    _uploaded_urls.set(object_name, public_url)
+    if image_index is not None:
+        image_index.save_uploaded_image(object_name, public_url, len(data))
+    
+    return public_url
+
 
+def submit_upload(data: bytes, file_extension: str) -> Future:
+    """
+    이미지 업로드를 업로드 스레드 풀에 제출합니다.
+    업로드 스레드에서 이미지를 후처리한 뒤 업로드하며, 원본 해시로도 URL을 기록하여
+    같은 이미지를 다시 후처리하지 않습니다.
+    
+    Args:
+        data (bytes): 업로드할 이미지 바이트
+        file_extension (str): 파일 확장자 (예: ".png")
+    
+    Returns:
+        Future: 공개 URL이 설정되는 Future
+    """
+    object_name = _object_name_for(data, file_extension.lower())
+    
+    with _index_lock:
+        # 로컬 인덱스에 있으면 네트워크 I/O 없이 완료된 Future 반환
+        public_url = _uploaded_urls.get(object_name)
+        if public_url:
+            future = Future()
+            future.set_result(public_url)
+            return future
+        
+        # 같은 이미지가 업로드 중이면 해당 Future 공유
+        future = _inflight_uploads.get(object_name)
+        if future is not None:
+            return future
+        
+        future = upload_executor.submit(_optimize_and_upload, data, file_extension)
+        _inflight_uploads[object_name] = future
+    
+    def on_done(done: Future):
+        if not done.cancelled() and done.exception() is None:
+            _uploaded_urls.set(object_name, done.result())
+        _inflight_uploads.pop(object_name, None)
+    
+    future.add_done_callback(on_done)
+    return future
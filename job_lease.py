@@ -0,0 +1,164 @@
+"""
+분산 작업 lease 모듈
+
+MongoService의 claim/renew/release를 이용해 여러 워커/레플리카가
+같은 논문을 중복 처리하지 않도록 작업을 선점하고 heartbeat로 lease를 유지합니다.
+일시적인 Mongo 오류로 연장에 실패하면 lease가 실제로 만료될 때까지 재시도하고,
+다른 소유자에게 넘어갔거나 만료되면 lost를 설정합니다. 작업 코드는 결과를 쓰기 전에 lost를 확인해야 합니다.
+
+Author: Minseok kim
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from mongo_service import MongoService
+
+logger = logging.getLogger(__name__)
+
+# 프로세스 단위 소유자 식별자
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+
+class _LeaseClock:
+    """마지막으로 연장에 성공한 시점 기준의 lease 만료 시각과 다음 연장 간격"""
+
+    def __init__(self, lease_seconds: int):
+        self.lease_seconds = lease_seconds
+        self.expires_at = time.monotonic() + lease_seconds
+        self.interval = lease_seconds / 3
+
+    def renewed(self, requested_at: float):
+        # 요청을 보낸 시각 기준으로 계산 (Mongo에 기록된 만료 시각보다 늦지 않도록)
+        self.expires_at = requested_at + self.lease_seconds
+        self.interval = self.lease_seconds / 3
+
+    def failed(self) -> bool:
+        """연장 요청이 오류로 끝난 경우. 재시도할 수 있으면 True (만료 전까지 짧은 간격으로 재시도)"""
+        remaining = self.expires_at - time.monotonic()
+        self.interval = max(0.1, min(self.lease_seconds / 10, remaining))
+        return remaining > 0
+
+
+class JobLease:
+    """heartbeat로 유지되는 작업 lease"""
+
+    def __init__(self, mongo_service: MongoService, job_key: str, lease_seconds: Optional[int] = None):
+        """
+        Args:
+            mongo_service: MongoService
+            job_key: 작업 키 (예: "analysis:<paper_id>")
+            lease_seconds: lease 유효 시간 (기본값: JOB_LEASE_SECONDS 환경변수)
+        """
+        self.mongo_service = mongo_service
+        self.job_key = job_key
+        self.lease_seconds = lease_seconds or int(os.getenv("JOB_LEASE_SECONDS", "60"))
+        self.owner = f"{WORKER_ID}:{uuid4().hex[:8]}"
+        # lease를 잃었는지 여부 (True이면 결과를 쓰지 말고 중단)
+        self.lost = False
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def acquire(self) -> bool:
+        """
+        작업을 선점하고 heartbeat를 시작합니다.
+
+        Returns:
+            bool: 선점 성공 여부
+        """
+        if not self.mongo_service.claim_job(self.job_key, self.owner, self.lease_seconds):
+            return False
+
+        self._heartbeat = threading.Thread(target=self._run_heartbeat, name=f"lease-{self.job_key}", daemon=True)
+        self._heartbeat.start()
+        return True
+
+    def release(self, status: str) -> Optional[Dict[str, Any]]:
+        """
+        heartbeat를 멈추고 작업을 종료 상태로 변경합니다.
+
+        Args:
+            status: 종료 상태 ("completed", "partial" 또는 "failed")
+
+        Returns:
+            Dict: 대기자 목록(waiters)을 포함한 작업 문서 또는 None (lease를 잃은 경우 포함)
+        """
+        self._stop.set()
+        if self.lost:
+            logger.warning(f"lease를 잃은 작업은 종료 처리하지 않습니다: {self.job_key} ({status})")
+            return None
+        return self.mongo_service.release_job(self.job_key, self.owner, status)
+
+    def _run_heartbeat(self):
+        # lease 시간의 1/3 간격으로 연장, 오류 시 만료 전까지 재시도
+        clock = _LeaseClock(self.lease_seconds)
+        while not self._stop.wait(clock.interval):
+            requested_at = time.monotonic()
+            renewed = self.mongo_service.renew_job_lease(self.job_key, self.owner, self.lease_seconds)
+            if renewed:
+                clock.renewed(requested_at)
+            elif renewed is None and clock.failed():
+                logger.warning(f"작업 lease 연장 재시도 예정: {self.job_key} ({clock.interval:.1f}s 후)")
+            else:
+                self.lost = True
+                logger.warning(f"작업 lease를 잃었습니다: {self.job_key}")
+                return
+
+
+class AsyncJobLease:
+    """asyncio 실행 모드용 작업 lease (AsyncMongoService 사용)"""
+
+    def __init__(self, mongo_service, job_key: str, lease_seconds: Optional[int] = None):
+        """
+        Args:
+            mongo_service: AsyncMongoService
+            job_key: 작업 키 (예: "analysis:<paper_id>")
+            lease_seconds: lease 유효 시간 (기본값: JOB_LEASE_SECONDS 환경변수)
+        """
+        self.mongo_service = mongo_service
+        self.job_key = job_key
+        self.lease_seconds = lease_seconds or int(os.getenv("JOB_LEASE_SECONDS", "60"))
+        self.owner = f"{WORKER_ID}:{uuid4().hex[:8]}"
+        # lease를 잃었는지 여부 (lost_event로 진행 중인 작업을 중단)
+        self.lost = False
+        self.lost_event = asyncio.Event()
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    async def acquire(self) -> bool:
+        """작업을 선점하고 heartbeat 태스크를 시작합니다."""
+        if not await self.mongo_service.claim_job(self.job_key, self.owner, self.lease_seconds):
+            return False
+
+        self._heartbeat = asyncio.create_task(self._run_heartbeat())
+        return True
+
+    async def release(self, status: str) -> Optional[Dict[str, Any]]:
+        """heartbeat를 멈추고 작업을 종료 상태로 변경합니다. (lease를 잃었으면 None)"""
+        if self._heartbeat:
+            self._heartbeat.cancel()
+        if self.lost:
+            logger.warning(f"lease를 잃은 작업은 종료 처리하지 않습니다: {self.job_key} ({status})")
+            return None
+        return await self.mongo_service.release_job(self.job_key, self.owner, status)
+
+    async def _run_heartbeat(self):
+        clock = _LeaseClock(self.lease_seconds)
+        while True:
+            await asyncio.sleep(clock.interval)
+            requested_at = time.monotonic()
+            renewed = await self.mongo_service.renew_job_lease(self.job_key, self.owner, self.lease_seconds)
+            if renewed:
+                clock.renewed(requested_at)
+            elif renewed is None and clock.failed():
+                logger.warning(f"작업 lease 연장 재시도 예정: {self.job_key} ({clock.interval:.1f}s 후)")
+            else:
+                self.lost = True
+                self.lost_event.set()
+                logger.warning(f"작업 lease를 잃었습니다: {self.job_key}")
+                return
@@ -0,0 +1,219 @@
+"""
+LLM 응답 캐시 모듈
+
+모델 이름 + 프롬프트 해시를 키로 LLM 응답을 로컬 SQLite에 저장하고,
+선택적으로 Mongo 등 원격 저장소를 2차 캐시로 사용합니다.
+
+Author: Minseok kim
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from metrics import LLM_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """LLM 응답 캐시 (SQLite + 선택적 원격 tier)"""
+
+    # set 호출 N회마다 만료/용량 정리
+    EVICT_INTERVAL = 100
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        enabled: Optional[bool] = None
+    ):
+        """
+        캐시 초기화
+
+        Args:
+            path: SQLite 파일 경로 (기본값: LLM_CACHE_PATH 환경변수)
+            ttl_seconds: 항목 유효 시간 (기본값: LLM_CACHE_TTL_SECONDS 환경변수, 30일)
+            max_entries: 최대 항목 수 (기본값: LLM_CACHE_MAX_ENTRIES 환경변수)
+            enabled: 캐시 사용 여부 (기본값: LLM_CACHE_ENABLED 환경변수)
+        """
+        self.path = path or os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite3")
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))
+        self.enabled = enabled if enabled is not None else os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+
+        # 원격 tier (find_llm_response / save_llm_response 를 제공하는 객체, 예: MongoService)
+        self.remote_tier = None
+
+        self.hits = 0
+        self.misses = 0
+        self._sets = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if self.enabled:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed_at ON llm_cache (accessed_at)")
+            self._conn.commit()
+
+    def set_remote_tier(self, tier) -> None:
+        """
+        2차 캐시 저장소를 설정합니다.
+
+        Args:
+            tier: find_llm_response(key), save_llm_response(key, model, value, ttl_seconds) 를 제공하는 객체
+                  (asyncio 실행 모드에서는 두 메서드가 코루틴인 객체, 예: AsyncMongoService 를 설정하고 aget/aset 사용)
+        """
+        self.remote_tier = tier
+
+    @staticmethod
+    def make_key(model: str, prompt: Any) -> str:
+        """
+        모델 이름과 프롬프트로 캐시 키를 생성합니다.
+
+        Args:
+            model: 모델 이름
+            prompt: 프롬프트 문자열 또는 메시지 리스트
+
+        Returns:
+            str: SHA-256 해시 키
+        """
+        payload = json.dumps({"model": model, "prompt": prompt}, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        캐시된 응답을 조회합니다.
+
+        Args:
+            key: 캐시 키
+
+        Returns:
+            str: 캐시된 응답 또는 None
+        """
+        if not self.enabled:
+            return None
+
+        value = self._get_local(key)
+        if value is None and self.remote_tier is not None:
+            value = self._remote_hit(key, self.remote_tier.find_llm_response(key))
+        return value if value is not None else self._miss()
+
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        get의 비동기 버전입니다. 원격 tier의 find_llm_response를 await 합니다.
+        """
+        if not self.enabled:
+            return None
+
+        value = self._get_local(key)
+        if value is None and self.remote_tier is not None:
+            value = self._remote_hit(key, await self.remote_tier.find_llm_response(key))
+        return value if value is not None else self._miss()
+
+    def set(self, key: str, value: str, model: str = "") -> None:
+        """
+        응답을 캐시에 저장합니다.
+
+        Args:
+            key: 캐시 키
+            value: LLM 응답
+            model: 모델 이름 (원격 tier 기록용)
+        """
+        if not self.enabled:
+            return
+
+        self._put_local(key, value)
+        if self.remote_tier is not None:
+            self.remote_tier.save_llm_response(key, model, value, self.ttl_seconds)
+
+    async def aset(self, key: str, value: str, model: str = "") -> None:
+        """
+        set의 비동기 버전입니다. 원격 tier의 save_llm_response를 await 합니다.
+        """
+        if not self.enabled:
+            return
+
+        self._put_local(key, value)
+        if self.remote_tier is not None:
+            await self.remote_tier.save_llm_response(key, model, value, self.ttl_seconds)
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 hit/miss 통계를 반환합니다."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def _get_local(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.ttl_seconds:
+                self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.hits += 1
+                LLM_CACHE_REQUESTS.labels("hit").inc()
+                return row[0]
+        return None
+
+    def _remote_hit(self, key: str, value: Optional[str]) -> Optional[str]:
+        """원격 tier에서 찾은 응답을 로컬 캐시에 채웁니다."""
+        if value is None:
+            return None
+        self._put_local(key, value)
+        with self._lock:
+            self.hits += 1
+        LLM_CACHE_REQUESTS.labels("remote_hit").inc()
+        return value
+
+    def _miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+        LLM_CACHE_REQUESTS.labels("miss").inc()
+        return None
+
+    def _put_local(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._conn.commit()
+            self._sets += 1
+            if self._sets % self.EVICT_INTERVAL == 0:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """만료된 항목 삭제 후, 최대 항목 수를 초과하면 오래 사용되지 않은 항목부터 삭제합니다. (lock 보유 상태에서 호출)"""
+        try:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+            logger.info(f"LLM 캐시 정리 완료: {self.stats()}")
+        except Exception as e:
+            logger.error(f"LLM 캐시 정리 실패: {e}")
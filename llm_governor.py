@@ -0,0 +1,419 @@
+"""
+LLM 호출 동시성/속도 제어 모듈
+
+모든 LLM 호출(초록 요약, 청크 분석, 스레드/asyncio 모드)이 하나의 예산을 공유하도록
+호출 전에 허가를 받습니다.
+- 분당 요청 수(LLM_RPM) / 분당 토큰 수(LLM_TPM) 토큰 버킷 (0이면 제한 없음)
+- 동시 호출 한도를 AIMD로 조정: 성공 시 조금씩 늘리고, 429 또는 지연 시간 목표 초과 시 절반으로 줄임
+- LLM_GOVERNOR_REDIS=true 이면 RPM/TPM 버킷을 Redis에 두어 여러 워커가 함께 사용
+
+Author: Minseok kim
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+from metrics import LLM_CONCURRENCY_LIMIT, LLM_GOVERNOR_WAIT, LLM_RATE_LIMITED
+from utils.chunk_packer import count_prompt_tokens
+
+logger = logging.getLogger(__name__)
+
+# 여러 버킷(RPM, TPM)을 한 번에 확인하고 모두 가능할 때만 차감하는 Redis 스크립트
+# KEYS: 버킷 키, ARGV: 강제 차감 여부, (분당 용량, 비용) 쌍
+# 반환값: 대기해야 하는 시간(초), 0이면 차감 완료
+_REDIS_TAKE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local force = ARGV[1] == '1'
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local cost = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - ts) * capacity / 60)
+    levels[i] = tokens
+    local need = math.min(cost, capacity)
+    if not force and need > 0 and tokens < need then
+        wait = math.max(wait, (need - tokens) * 60 / capacity)
+    end
+end
+for i, key in ipairs(KEYS) do
+    local tokens = levels[i]
+    if wait == 0 then
+        tokens = tokens - tonumber(ARGV[i * 2 + 1])
+    end
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', key, 120)
+end
+return tostring(wait)
+"""
+
+
+def _is_rate_limited(error: BaseException) -> bool:
+    """공급자의 속도 제한(429) 응답인지 확인합니다."""
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+class _LocalBuckets:
+    """프로세스 내 토큰 버킷"""
+
+    def __init__(self):
+        # 키 -> [남은 토큰, 마지막 갱신 시각]
+        self._state: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, buckets: List[tuple], force: bool = False) -> float:
+        """
+        버킷들에서 비용을 차감합니다.
+
+        Args:
+            buckets: (키, 분당 용량, 비용) 목록
+            force: 잔량과 관계없이 차감 (실제 사용량 정산용, 음수 비용은 환급)
+
+        Returns:
+            float: 대기해야 하는 시간(초), 0이면 차감 완료
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            for key, capacity, cost in buckets:
+                state = self._state.setdefault(key, [capacity, now])
+                state[0] = min(capacity, state[0] + (now - state[1]) * capacity / 60)
+                state[1] = now
+                need = min(cost, capacity)
+                if not force and need > 0 and state[0] < need:
+                    wait = max(wait, (need - state[0]) * 60 / capacity)
+            if wait == 0:
+                for key, _, cost in buckets:
+                    self._state[key][0] -= cost
+            return wait
+
+
+class _RedisBuckets:
+    """여러 워커가 공유하는 Redis 토큰 버킷"""
+
+    def __init__(self, client):
+        self.client = client
+        self.script = client.register_script(_REDIS_TAKE_SCRIPT)
+
+    def take(self, buckets: List[tuple], force: bool = False) -> float:
+        args: List[Any] = ["1" if force else "0"]
+        for _, capacity, cost in buckets:
+            args.extend([capacity, cost])
+        return float(self.script(keys=[f"curatify:llm_governor:{key}" for key, _, _ in buckets], args=args))
+
+
+class LLMPermit:
+    """LLM 호출 허가 (호출이 끝나면 실제 사용량/결과를 governor에 반영)"""
+
+    def __init__(self, model: str, tokens: int, tracked: bool = True):
+        self.model = model
+        self.tokens = tokens
+        self.started = time.monotonic()
+        self.used_tokens: Optional[int] = None
+        # governor가 꺼져 있으면 동시 호출 수에 포함되지 않음
+        self.tracked = tracked
+        self.released = False
+
+    def record(self, response: Any):
+        """langchain 응답의 실제 토큰 사용량을 기록합니다."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage.get("total_tokens"):
+            self.used_tokens = usage["total_tokens"]
+
+
+class LLMGovernor:
+    """RPM/TPM 버킷 + AIMD 동시 호출 한도로 LLM 호출을 제어하는 클래스"""
+
+    # 허가를 기다릴 때 다시 확인하는 최대 간격 (초)
+    POLL_SECONDS = 0.05
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        redis_client=None
+    ):
+        """
+        Args:
+            max_concurrency: 동시 호출 한도의 상한 (기본값: LLM_MAX_CONCURRENCY 환경변수)
+            rpm: 분당 요청 수 (기본값: LLM_RPM 환경변수, 0이면 제한 없음)
+            tpm: 분당 토큰 수 (기본값: LLM_TPM 환경변수, 0이면 제한 없음)
+            redis_client: 버킷을 공유할 Redis 클라이언트 (기본값: LLM_GOVERNOR_REDIS=true 이면 REDIS_URL로 생성)
+        """
+        self.enabled = os.getenv("LLM_GOVERNOR_ENABLED", "true").lower() == "true"
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        self.min_concurrency = max(1, min(self.max_concurrency, int(os.getenv("LLM_MIN_CONCURRENCY", "1"))))
+        self.rpm = rpm if rpm is not None else int(os.getenv("LLM_RPM", "0"))
+        self.tpm = tpm if tpm is not None else int(os.getenv("LLM_TPM", "0"))
+        # 응답 토큰 수 추정치 (실제 사용량은 응답 후 정산)
+        self.expected_output_tokens = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "500"))
+        # 이 지연 시간을 넘으면 한도를 줄임 (0이면 429에만 반응)
+        self.latency_target = float(os.getenv("LLM_LATENCY_TARGET_SECONDS", "0"))
+        self.decrease_factor = float(os.getenv("LLM_AIMD_DECREASE_FACTOR", "0.5"))
+        # 동시에 실패한 호출들로 한도가 연달아 줄어들지 않도록 감소 사이 최소 간격
+        self.decrease_cooldown = float(os.getenv("LLM_AIMD_COOLDOWN_SECONDS", "5"))
+
+        self.limit = float(os.getenv("LLM_INITIAL_CONCURRENCY", str(self.max_concurrency)))
+        self.limit = min(self.max_concurrency, max(self.min_concurrency, self.limit))
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._local_buckets = _LocalBuckets()
+        self._redis_buckets: Optional[_RedisBuckets] = None
+
+        if redis_client is None and os.getenv("LLM_GOVERNOR_REDIS", "false").lower() == "true":
+            import redis
+
+            redis_kwargs = {"decode_responses": True}
+            if os.getenv("REDIS_USERNAME") and os.getenv("REDIS_PASSWORD"):
+                redis_kwargs["username"] = os.getenv("REDIS_USERNAME")
+                redis_kwargs["password"] = os.getenv("REDIS_PASSWORD")
+            redis_client = redis.Redis.from_url(os.getenv("REDIS_URL"), **redis_kwargs)
+        if redis_client is not None:
+            self._redis_buckets = _RedisBuckets(redis_client)
+
+        LLM_CONCURRENCY_LIMIT.set(self.limit)
+
+    def _buckets(self, model: str, tokens: int) -> List[tuple]:
+        buckets = []
+        if self.rpm > 0:
+            buckets.append((f"{model}:rpm", self.rpm, 1))
+        if self.tpm > 0:
+            buckets.append((f"{model}:tpm", self.tpm, tokens))
+        return buckets
+
+    def _take(self, buckets: List[tuple], force: bool = False) -> float:
+        """버킷에서 차감합니다. Redis 오류 시 로컬 버킷을 사용합니다. (Redis 왕복 동안 다른 호출이 막히지 않도록 잠금 밖에서 호출)"""
+        if not buckets:
+            return 0.0
+        if self._redis_buckets is not None:
+            try:
+                return self._redis_buckets.take(buckets, force)
+            except Exception as e:
+                logger.error(f"Redis LLM 예산 조회 실패, 로컬 예산을 사용합니다: {e}")
+        return self._local_buckets.take(buckets, force)
+
+    def _try_acquire(self, permit: LLMPermit) -> float:
+        """
+        허가를 시도합니다.
+
+        Returns:
+            float: 0이면 허가됨, 아니면 다시 시도하기까지 대기할 시간(초)
+        """
+        # 동시 호출 자리를 먼저 잡고, 버킷 차감은 잠금 밖에서 수행
+        with self._cond:
+            if self.in_flight >= int(self.limit):
+                return self.POLL_SECONDS
+            self.in_flight += 1
+
+        wait = None
+        try:
+            wait = self._take(self._buckets(permit.model, permit.tokens))
+        finally:
+            if wait != 0:
+                # 버킷이 부족하면 잡아 둔 자리를 돌려줌
+                with self._cond:
+                    self.in_flight -= 1
+                    self._cond.notify_all()
+        return wait
+
+    def _release(self, permit: LLMPermit, error: Optional[BaseException]):
+        """호출 결과를 반영하여 동시 호출 한도를 조정하고 토큰 사용량을 정산합니다."""
+        latency = time.monotonic() - permit.started
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+
+            if error is not None and _is_rate_limited(error):
+                LLM_RATE_LIMITED.inc()
+                self._decrease(now, "429 응답")
+            elif error is None:
+                if self.latency_target > 0 and latency > self.latency_target:
+                    self._decrease(now, f"지연 시간 {latency:.1f}s")
+                else:
+                    # 한도만큼의 호출이 성공하면 한도를 1 늘림
+                    self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+            LLM_CONCURRENCY_LIMIT.set(self.limit)
+            self._cond.notify_all()
+
+        if permit.used_tokens is not None and self.tpm > 0:
+            # 추정 토큰 수와 실제 사용량의 차이를 정산 (음수면 환급)
+            self._take([(f"{permit.model}:tpm", self.tpm, permit.used_tokens - permit.tokens)], force=True)
+
+    def _decrease(self, now: float, reason: str):
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_concurrency, self.limit * self.decrease_factor)
+        logger.warning(f"LLM 동시 호출 한도 감소 ({reason}): {self.limit:.1f}")
+
+    def _new_permit(self, prompt: Union[str, List[Dict[str, str]]], model: str) -> LLMPermit:
+        tokens = count_prompt_tokens(prompt) + self.expected_output_tokens if self.tpm > 0 else 0
+        return LLMPermit(model, tokens, tracked=self.enabled)
+
+    def _mark_released(self, permit: LLMPermit) -> bool:
+        """허가를 반납 처리합니다. 이미 반납되었으면 False"""
+        with self._cond:
+            if permit.released:
+                return False
+            permit.released = True
+            return permit.tracked
+
+    def acquire(self, prompt: Union[str, List[Dict[str, str]]], model: str, blocking: bool = True) -> Optional[LLMPermit]:
+        """
+        LLM 호출 허가를 받습니다.
+
+        Args:
+            prompt: 프롬프트 (토큰 수 추정용)
+            model: 모델 이름 (버킷 구분)
+            blocking: False이면 바로 허가되지 않을 때 기다리지 않고 None 반환 (헤징 요청용)
+
+        Returns:
+            LLMPermit: 요청이 끝나면 release, 결과를 기다리지 않고 버리면 abandon 으로 반납
+        """
+        permit = self._new_permit(prompt, model)
+        if not self.enabled:
+            return permit
+
+        started = time.monotonic()
+        while True:
+            wait = self._try_acquire(permit)
+            if wait == 0:
+                break
+            if not blocking:
+                return None
+            with self._cond:
+                self._cond.wait(min(wait, 1.0))
+        LLM_GOVERNOR_WAIT.observe(time.monotonic() - started)
+        permit.started = time.monotonic()
+        return permit
+
+    async def aacquire(self, prompt: Union[str, List[Dict[str, str]]], model: str, blocking: bool = True) -> Optional[LLMPermit]:
+        """
+        acquire의 비동기 버전입니다. 대기 중에 이벤트 루프를 막지 않습니다.
+        """
+        permit = self._new_permit(prompt, model)
+        if not self.enabled:
+            return permit
+
+        started = time.monotonic()
+        while True:
+            if self._redis_buckets is not None:
+                wait = await asyncio.to_thread(self._try_acquire, permit)
+            else:
+                wait = self._try_acquire(permit)
+            if wait == 0:
+                break
+            if not blocking:
+                return None
+            await asyncio.sleep(min(wait, 1.0))
+        LLM_GOVERNOR_WAIT.observe(time.monotonic() - started)
+        permit.started = time.monotonic()
+        return permit
+
+    def release(self, permit: LLMPermit, error: Optional[BaseException] = None, response: Any = None):
+        """
+        요청 결과를 반영하여 허가를 반납합니다. (이미 반납된 허가는 무시)
+
+        Args:
+            permit: acquire로 받은 허가
+            error: 요청 오류 (429면 동시 호출 한도를 줄임)
+            response: langchain 응답 (실제 토큰 사용량 정산용)
+        """
+        if response is not None:
+            permit.record(response)
+        if self._mark_released(permit):
+            self._release(permit, error)
+
+    async def arelease(self, permit: LLMPermit, error: Optional[BaseException] = None, response: Any = None):
+        """
+        release의 비동기 버전입니다.
+        """
+        if self._redis_buckets is not None:
+            await asyncio.to_thread(self.release, permit, error, response)
+        else:
+            self.release(permit, error, response)
+
+    def abandon(self, permit: LLMPermit):
+        """
+        결과를 기다리지 않기로 한 요청(타임아웃, 헤징에서 진 요청)의 동시 호출 자리를 바로 돌려줍니다.
+        요청이 아직 끝나지 않았어도 한도를 계속 차지하지 않으며, 한도 조정/토큰 정산은 하지 않습니다.
+        """
+        if self._mark_released(permit):
+            with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def limiter(self, prompt: Union[str, List[Dict[str, str]]], model: str) -> "LLMCallLimiter":
+        """프롬프트/모델이 정해진 호출의 허가 함수 묶음을 반환합니다. (LLMCallRunner에 전달)"""
+        return LLMCallLimiter(self, prompt, model)
+
+    @contextmanager
+    def limit_call(self, prompt: Union[str, List[Dict[str, str]]], model: str) -> Iterator[LLMPermit]:
+        """
+        LLM 호출 허가를 받을 때까지 대기하는 컨텍스트 매니저입니다.
+
+        Args:
+            prompt: 프롬프트 (토큰 수 추정용)
+            model: 모델 이름 (버킷 구분)
+
+        Yields:
+            LLMPermit: 응답을 받으면 permit.record(response)로 실제 사용량을 기록
+        """
+        permit = self.acquire(prompt, model)
+        try:
+            yield permit
+        except BaseException as e:
+            self.release(permit, e)
+            raise
+        self.release(permit)
+
+    @asynccontextmanager
+    async def alimit_call(self, prompt: Union[str, List[Dict[str, str]]], model: str) -> AsyncIterator[LLMPermit]:
+        """
+        limit_call의 비동기 버전입니다. 대기 중에 이벤트 루프를 막지 않습니다.
+        """
+        permit = await self.aacquire(prompt, model)
+        error: Optional[BaseException] = None
+        try:
+            yield permit
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            await self.arelease(permit, error)
+
+
+class LLMCallLimiter:
+    """호출 하나(헤징 요청 포함)의 허가를 받고 반납하는 함수 묶음 (LLMGovernor.limiter 참고)"""
+
+    def __init__(self, governor: LLMGovernor, prompt: Union[str, List[Dict[str, str]]], model: str):
+        self.governor = governor
+        self.prompt = prompt
+        self.model = model
+
+    def acquire(self, blocking: bool = True) -> Optional[LLMPermit]:
+        return self.governor.acquire(self.prompt, self.model, blocking)
+
+    async def aacquire(self, blocking: bool = True) -> Optional[LLMPermit]:
+        return await self.governor.aacquire(self.prompt, self.model, blocking)
+
+    def release(self, permit: LLMPermit, error: Optional[BaseException] = None, response: Any = None):
+        self.governor.release(permit, error, response)
+
+    async def arelease(self, permit: LLMPermit, error: Optional[BaseException] = None, response: Any = None):
+        await self.governor.arelease(permit, error, response)
+
+    def abandon(self, permit: LLMPermit):
+        self.governor.abandon(permit)
@@ -0,0 +1,362 @@
+"""
+LLM 호출 마감 시간/재시도/헤징 모듈
+
+느린 응답 하나가 논문 전체 분석을 붙잡지 않도록 프롬프트 종류(abstract, chunk)별로
+- 호출당 마감 시간 (재시도 포함)과 시도당 요청 타임아웃
+- 지터를 둔 지수 백오프 재시도 (408/429/5xx, 타임아웃/연결 오류만)
+- 헤징: 최근 응답 시간의 분위수(p95)만큼 지나도 응답이 없으면 같은 요청을 한 번 더 보내고 먼저 온 응답을 사용
+를 적용합니다.
+
+llm_governor의 허가는 요청마다(헤징 요청 포함) 요청을 보내기 직전에 받으므로, 허가 대기 시간은
+요청 타임아웃과 응답 시간(헤징 지연 시간 계산용)에 포함되지 않습니다. 타임아웃/헤징으로 결과를 버린 요청은
+끝날 때까지 기다리지 않고 허가를 바로 반납합니다.
+
+설정은 LLM_<TYPE>_<NAME> 환경변수 (없으면 LLM_<NAME>, 예: LLM_CHUNK_HEDGE=true, LLM_TIMEOUT_SECONDS=60)
+
+Author: Minseok kim
+"""
+
+import asyncio
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from metrics import LLM_HEDGES, LLM_RETRIES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+# 상태 코드와 관계없이 재시도하는 타임아웃/연결 오류
+# (openai/httpx는 무거워서 시작 시 import하지 않고 예외 클래스의 모듈/이름으로 판별, 하위 클래스 포함)
+_RETRYABLE_ERRORS = (TimeoutError, asyncio.TimeoutError)
+_RETRYABLE_SDK_ERRORS = {
+    "httpx": {"TimeoutException", "NetworkError"},
+    "openai": {"APITimeoutError", "APIConnectionError"},
+}
+# 상태 코드로 재시도 여부를 판단하는 HTTP 오류
+_STATUS_SDK_ERRORS = {
+    "httpx": {"HTTPStatusError"},
+    "openai": {"APIStatusError"},
+}
+
+
+def _sdk_error_names(error: BaseException) -> Dict[str, set]:
+    """예외 클래스(상위 클래스 포함)의 이름을 최상위 모듈(openai, httpx 등)별로 모아 반환합니다."""
+    names: Dict[str, set] = {}
+    for cls in type(error).__mro__:
+        names.setdefault(cls.__module__.split(".", 1)[0], set()).add(cls.__name__)
+    return names
+
+
+def _matches(names: Dict[str, set], errors: Dict[str, set]) -> bool:
+    return any(names.get(module, set()) & error_names for module, error_names in errors.items())
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """
+    재시도할 오류인지 확인합니다.
+    타임아웃/연결 오류와 HTTP 408/429/5xx 응답만 재시도하고, 그 외 오류(잘못된 요청, 응답 파싱 실패 등)는 바로 다시 발생시킵니다.
+    """
+    if isinstance(error, _RETRYABLE_ERRORS):
+        return True
+    names = _sdk_error_names(error)
+    if _matches(names, _RETRYABLE_SDK_ERRORS):
+        return True
+    if not _matches(names, _STATUS_SDK_ERRORS):
+        return False
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if not isinstance(status_code, int):
+        return False
+    return status_code in (408, 429) or status_code >= 500
+
+
+class LLMCallPolicy:
+    """프롬프트 종류별 LLM 호출 정책"""
+
+    def __init__(self, prompt_type: str):
+        """
+        Args:
+            prompt_type: 프롬프트 종류 (예: "abstract", "chunk")
+        """
+        def env(name: str, default: str) -> str:
+            return os.getenv(f"LLM_{prompt_type.upper()}_{name}", os.getenv(f"LLM_{name}", default))
+
+        self.prompt_type = prompt_type
+        # 시도당 요청 타임아웃 / 재시도를 포함한 호출 전체 마감 시간 (0이면 제한 없음)
+        self.timeout_seconds = float(env("TIMEOUT_SECONDS", "60"))
+        self.deadline_seconds = float(env("DEADLINE_SECONDS", "180"))
+        self.max_retries = int(env("MAX_RETRIES", "2"))
+        self.backoff_base_seconds = float(env("BACKOFF_BASE_SECONDS", "1"))
+        self.backoff_max_seconds = float(env("BACKOFF_MAX_SECONDS", "20"))
+        self.hedge = env("HEDGE", "false").lower() == "true"
+        self.hedge_quantile = float(env("HEDGE_QUANTILE", "0.95"))
+        self.hedge_min_delay_seconds = float(env("HEDGE_MIN_DELAY_SECONDS", "1"))
+        # 응답 시간 표본이 충분히 쌓이기 전에 사용하는 헤징 지연 시간
+        self.hedge_initial_delay_seconds = float(env("HEDGE_INITIAL_DELAY_SECONDS", "20"))
+        self.hedge_min_samples = int(env("HEDGE_MIN_SAMPLES", "20"))
+
+    def backoff(self, attempt: int) -> float:
+        """attempt번째 재시도 전 대기 시간 (full jitter)"""
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt)))
+
+
+class _LatencyWindow:
+    """최근 응답 시간 (분위수 계산용)"""
+
+    def __init__(self, size: int):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+class LLMCallRunner:
+    """프롬프트 종류별 정책으로 LLM 호출을 실행하는 클래스"""
+
+    def __init__(self, hedge_workers: Optional[int] = None):
+        """
+        Args:
+            hedge_workers: 동기 요청(헤징 요청 포함)을 보내는 스레드 수
+                           (기본값: LLM_HEDGE_WORKERS 환경변수, LLM_MAX_CONCURRENCY의 2배)
+        """
+        self.policies: Dict[str, LLMCallPolicy] = {}
+        self.latencies: Dict[str, _LatencyWindow] = {}
+        self._lock = threading.Lock()
+        self._window_size = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+        self._hedge_workers = hedge_workers or int(
+            os.getenv("LLM_HEDGE_WORKERS", str(2 * int(os.getenv("LLM_MAX_CONCURRENCY", "8"))))
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def policy(self, prompt_type: str) -> LLMCallPolicy:
+        """프롬프트 종류의 정책을 반환합니다. (처음 사용할 때 환경변수에서 읽음)"""
+        with self._lock:
+            if prompt_type not in self.policies:
+                self.policies[prompt_type] = LLMCallPolicy(prompt_type)
+                self.latencies[prompt_type] = _LatencyWindow(self._window_size)
+            return self.policies[prompt_type]
+
+    def _hedge_delay(self, policy: LLMCallPolicy) -> float:
+        observed = self.latencies[policy.prompt_type].quantile(policy.hedge_quantile, policy.hedge_min_samples)
+        if observed is None:
+            return policy.hedge_initial_delay_seconds
+        return max(policy.hedge_min_delay_seconds, observed)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._hedge_workers, thread_name_prefix="llm-request")
+            return self._executor
+
+    def call(self, prompt_type: str, attempt_fn: Callable[[float], T], limiter: Any = None) -> T:
+        """
+        정책에 따라 LLM 호출을 실행합니다.
+
+        Args:
+            prompt_type: 프롬프트 종류
+            attempt_fn: 요청 타임아웃(초)을 받아 요청을 한 번 보내는 함수
+            limiter: 요청마다 허가를 받고 반납하는 객체 (LLMGovernor.limiter, 없으면 제한 없음)
+
+        Returns:
+            attempt_fn의 결과
+
+        Raises:
+            TimeoutError: 마감 시간 초과
+            Exception: 재시도할 수 없는 오류 또는 마지막 시도의 오류
+        """
+        policy = self.policy(prompt_type)
+        deadline = time.monotonic() + policy.deadline_seconds if policy.deadline_seconds > 0 else math.inf
+
+        for attempt in range(policy.max_retries + 1):
+            if deadline - time.monotonic() <= 0:
+                raise TimeoutError(f"LLM 호출 마감 시간 초과 ({prompt_type})")
+            try:
+                return self._attempt(policy, attempt_fn, deadline, limiter)
+            except Exception as e:
+                delay = policy.backoff(attempt)
+                if attempt >= policy.max_retries or not _is_retryable(e) or time.monotonic() + delay >= deadline:
+                    raise
+                LLM_RETRIES.labels(prompt_type).inc()
+                logger.warning(f"LLM 호출 재시도 ({prompt_type}, {attempt + 1}/{policy.max_retries}, {delay:.1f}s 후): {e}")
+                time.sleep(delay)
+
+    @staticmethod
+    def _attempt_timeout(policy: LLMCallPolicy, deadline: float) -> float:
+        """허가를 받은 뒤의 시도 타임아웃 (마감 시간을 넘기면 TimeoutError)"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"LLM 호출 마감 시간 초과 ({policy.prompt_type})")
+        return min(policy.timeout_seconds, remaining)
+
+    @staticmethod
+    def _send(attempt_fn: Callable[[float], T], timeout: float) -> Tuple[T, float]:
+        """요청을 보내고 (결과, 보낸 시점부터의 응답 시간)을 반환합니다."""
+        sent = time.monotonic()
+        result = attempt_fn(timeout)
+        return result, time.monotonic() - sent
+
+    def _submit(self, attempt_fn: Callable[[float], T], timeout: float, limiter: Any, permit: Any) -> Future:
+        """요청 스레드에서 요청을 보내고, 끝나면 결과와 함께 허가를 반납합니다."""
+        future = self._get_executor().submit(self._send, attempt_fn, timeout)
+        if limiter is not None:
+            def release(done: Future):
+                if done.cancelled():
+                    limiter.abandon(permit)
+                elif done.exception() is not None:
+                    limiter.release(permit, done.exception())
+                else:
+                    limiter.release(permit, None, done.result()[0])
+            future.add_done_callback(release)
+        return future
+
+    def _attempt(self, policy: LLMCallPolicy, attempt_fn: Callable[[float], T], deadline: float, limiter: Any) -> T:
+        # 허가 대기는 시도 타임아웃에 포함하지 않음
+        permit = limiter.acquire() if limiter is not None else None
+        try:
+            timeout = self._attempt_timeout(policy, deadline)
+        except TimeoutError:
+            if limiter is not None:
+                limiter.abandon(permit)
+            raise
+
+        started = time.monotonic()
+        primary = self._submit(attempt_fn, timeout, limiter, permit)
+        requests = {primary: permit}
+        pending = {primary}
+        try:
+            hedge_delay = self._hedge_delay(policy) if policy.hedge else math.inf
+            if hedge_delay < timeout:
+                done, _ = wait([primary], timeout=hedge_delay)
+                if not done:
+                    hedge_permit = limiter.acquire(blocking=False) if limiter is not None else None
+                    if self._should_hedge(policy, limiter, hedge_permit):
+                        hedge = self._submit(attempt_fn, timeout - (time.monotonic() - started), limiter, hedge_permit)
+                        requests[hedge] = hedge_permit
+                        pending.add(hedge)
+
+            last_error: Optional[BaseException] = None
+            while pending:
+                remaining = timeout - (time.monotonic() - started)
+                done, pending = wait(pending, timeout=max(0.0, remaining), return_when=FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError(f"LLM 요청 타임아웃 ({policy.prompt_type}, {timeout:.1f}s)")
+                winner = next((future for future in done if future.exception() is None), None)
+                if winner is not None:
+                    return self._accept(policy, winner is primary, *winner.result())
+                last_error = next(iter(done)).exception()
+            raise last_error
+        finally:
+            # 타임아웃/헤징에서 진 요청은 요청 타임아웃으로 끝나며 결과는 사용하지 않음 (허가는 바로 반납)
+            for future in pending:
+                future.cancel()
+                if limiter is not None:
+                    limiter.abandon(requests[future])
+
+    @staticmethod
+    def _should_hedge(policy: LLMCallPolicy, limiter: Any, hedge_permit: Any) -> bool:
+        """
+        느린 요청에 헤징 요청을 보낼지 결정합니다.
+        허가를 바로 받지 못하면 (예산 부족) 헤징하지 않고 기존 요청을 계속 기다립니다.
+        """
+        if limiter is not None and hedge_permit is None:
+            LLM_HEDGES.labels(policy.prompt_type, "skipped").inc()
+            return False
+        LLM_HEDGES.labels(policy.prompt_type, "sent").inc()
+        return True
+
+    def _accept(self, policy: LLMCallPolicy, is_primary: bool, result: T, latency: float) -> T:
+        if not is_primary:
+            LLM_HEDGES.labels(policy.prompt_type, "won").inc()
+        self.latencies[policy.prompt_type].add(latency)
+        return result
+
+    async def acall(self, prompt_type: str, attempt_fn: Callable[[float], Awaitable[T]], limiter: Any = None) -> T:
+        """
+        call의 비동기 버전입니다. 마감 시간을 넘긴 요청과 헤징에서 진 요청은 취소됩니다.
+        """
+        policy = self.policy(prompt_type)
+        deadline = time.monotonic() + policy.deadline_seconds if policy.deadline_seconds > 0 else math.inf
+
+        for attempt in range(policy.max_retries + 1):
+            if deadline - time.monotonic() <= 0:
+                raise TimeoutError(f"LLM 호출 마감 시간 초과 ({prompt_type})")
+            try:
+                return await self._aattempt(policy, attempt_fn, deadline, limiter)
+            except Exception as e:
+                delay = policy.backoff(attempt)
+                if attempt >= policy.max_retries or not _is_retryable(e) or time.monotonic() + delay >= deadline:
+                    raise
+                LLM_RETRIES.labels(prompt_type).inc()
+                logger.warning(f"LLM 호출 재시도 ({prompt_type}, {attempt + 1}/{policy.max_retries}, {delay:.1f}s 후): {e}")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _asend(attempt_fn: Callable[[float], Awaitable[T]], timeout: float) -> Tuple[T, float]:
+        sent = time.monotonic()
+        result = await attempt_fn(timeout)
+        return result, time.monotonic() - sent
+
+    async def _aattempt(self, policy: LLMCallPolicy, attempt_fn: Callable[[float], Awaitable[T]], deadline: float, limiter: Any) -> T:
+        permit = await limiter.aacquire() if limiter is not None else None
+        try:
+            timeout = self._attempt_timeout(policy, deadline)
+        except TimeoutError:
+            if limiter is not None:
+                limiter.abandon(permit)
+            raise
+
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self._asend(attempt_fn, timeout))
+        requests = {primary: permit}
+        pending = {primary}
+        try:
+            hedge_delay = self._hedge_delay(policy) if policy.hedge else math.inf
+            if hedge_delay < timeout:
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+                if not done:
+                    hedge_permit = await limiter.aacquire(blocking=False) if limiter is not None else None
+                    if self._should_hedge(policy, limiter, hedge_permit):
+                        hedge = asyncio.ensure_future(self._asend(attempt_fn, timeout - (time.monotonic() - started)))
+                        requests[hedge] = hedge_permit
+                        pending.add(hedge)
+
+            last_error: Optional[BaseException] = None
+            while pending:
+                remaining = timeout - (time.monotonic() - started)
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, remaining), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError(f"LLM 요청 타임아웃 ({policy.prompt_type}, {timeout:.1f}s)")
+                if limiter is not None:
+                    for task in done:
+                        error = task.exception()
+                        await limiter.arelease(requests[task], error, None if error else task.result()[0])
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is not None:
+                    return self._accept(policy, winner is primary, *winner.result())
+                last_error = next(iter(done)).exception()
+            raise last_error
+        finally:
+            # 헤징에서 진 요청/타임아웃된 요청 취소 (허가는 바로 반납)
+            for task in pending:
+                task.cancel()
+                if limiter is not None:
+                    limiter.abandon(requests[task])
@@ -0,0 +1,200 @@
+"""
+LLM 모델 라우팅 모듈
+
+프롬프트 종류(abstract, chunk)와 토큰 수에 따라 호출할 모델을 고릅니다.
+청크 분석(chunk)은 프롬프트 템플릿(약 1000 토큰)을 제외한 청크 본문의 토큰 수로, 그 외 프롬프트는 전체 프롬프트의 토큰 수로 비교합니다.
+짧은 청크는 빠르고 저렴한 모델로, 긴 본문은 큰 모델로 보내는 식의 정책을 설정할 수 있고,
+라우트별 요청 수/지연 시간/비용을 메트릭으로 기록합니다.
+
+정책은 LLM_ROUTES (JSON) 또는 LLM_ROUTES_FILE (JSON 파일 경로)로 설정하며, 위에서부터 처음 일치하는 라우트를 사용합니다.
+일치하는 라우트가 없으면 OPENAI_MODEL을 사용하는 default 라우트로 보냅니다.
+
+    [
+        {"name": "short-chunk", "prompt_types": ["chunk"], "max_tokens": 800, "model": "gpt-4o-mini",
+         "input_cost_per_1k": 0.00015, "output_cost_per_1k": 0.0006},
+        {"name": "long-chunk", "prompt_types": ["chunk"], "min_tokens": 800, "model": "gpt-4o"}
+    ]
+
+Author: Minseok kim
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+from metrics import LLM_ROUTE_COST, LLM_ROUTE_LATENCY, LLM_ROUTE_REQUESTS
+from utils.chunk_packer import count_prompt_tokens
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+logger = logging.getLogger(__name__)
+
+
+class LLMRoute:
+    """모델 라우트 하나 (조건 + 모델 설정)"""
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        prompt_types: Optional[List[str]] = None,
+        min_tokens: int = 0,
+        max_tokens: Optional[int] = None,
+        temperature: float = 0.1,
+        base_url: Optional[str] = None,
+        input_cost_per_1k: float = 0.0,
+        output_cost_per_1k: float = 0.0
+    ):
+        """
+        Args:
+            name: 라우트 이름 (메트릭 라벨)
+            model: 모델 이름
+            prompt_types: 적용할 프롬프트 종류 (None이면 전체)
+            min_tokens: 최소 토큰 수 (포함, 청크 분석은 청크 본문 기준)
+            max_tokens: 최대 토큰 수 (미포함, None이면 제한 없음, 청크 분석은 청크 본문 기준)
+            temperature: 샘플링 온도
+            base_url: OpenAI 호환 API 주소 (기본값: OPENAI_BASE_URL 환경변수)
+            input_cost_per_1k: 입력 토큰 1000개당 비용 (USD)
+            output_cost_per_1k: 출력 토큰 1000개당 비용 (USD)
+        """
+        self.name = name
+        self.model = model
+        self.prompt_types = set(prompt_types) if prompt_types else None
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.base_url = base_url
+        self.input_cost_per_1k = input_cost_per_1k
+        self.output_cost_per_1k = output_cost_per_1k
+
+    def matches(self, prompt_type: str, tokens: int) -> bool:
+        if self.prompt_types is not None and prompt_type not in self.prompt_types:
+            return False
+        return tokens >= self.min_tokens and (self.max_tokens is None or tokens < self.max_tokens)
+
+    def cost(self, response: Any) -> float:
+        """응답의 토큰 사용량으로 비용(USD)을 계산합니다."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        return (
+            usage.get("input_tokens", 0) * self.input_cost_per_1k
+            + usage.get("output_tokens", 0) * self.output_cost_per_1k
+        ) / 1000
+
+
+def _load_routes() -> List[LLMRoute]:
+    """LLM_ROUTES / LLM_ROUTES_FILE 환경변수에서 라우트 목록을 읽습니다."""
+    raw = os.getenv("LLM_ROUTES")
+    path = os.getenv("LLM_ROUTES_FILE")
+    if not raw and path:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = f.read()
+    if not raw:
+        return []
+
+    try:
+        return [LLMRoute(**spec) for spec in json.loads(raw)]
+    except Exception as e:
+        raise RuntimeError(f"LLM 라우팅 정책이 올바르지 않습니다 (LLM_ROUTES/LLM_ROUTES_FILE): {e}")
+
+
+class LLMRouter:
+    """프롬프트 종류/토큰 수로 모델을 고르고 라우트별 클라이언트를 관리하는 클래스"""
+
+    def __init__(self, routes: Optional[List[LLMRoute]] = None):
+        """
+        Args:
+            routes: 라우트 목록 (기본값: LLM_ROUTES / LLM_ROUTES_FILE 환경변수)
+        """
+        self.routes = routes if routes is not None else _load_routes()
+        self.default_route = LLMRoute(
+            name="default",
+            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+            input_cost_per_1k=float(os.getenv("OPENAI_INPUT_COST_PER_1K", "0")),
+            output_cost_per_1k=float(os.getenv("OPENAI_OUTPUT_COST_PER_1K", "0"))
+        )
+        self._clients: Dict[str, "ChatOpenAI"] = {}
+        self._lock = threading.Lock()
+        if self.routes:
+            logger.info(f"LLM 라우팅 정책: {[(route.name, route.model) for route in self.routes]}")
+
+    def route(
+        self,
+        prompt: Union[str, List[Dict[str, str]]],
+        prompt_type: str,
+        tokens: Optional[int] = None
+    ) -> LLMRoute:
+        """
+        프롬프트에 맞는 라우트를 반환합니다.
+
+        Args:
+            prompt: 프롬프트 문자열 또는 메시지 리스트
+            prompt_type: 프롬프트 종류
+            tokens: 라우트 조건과 비교할 토큰 수 (예: 템플릿을 제외한 청크 본문의 토큰 수, 기본값: 전체 프롬프트의 토큰 수)
+
+        Returns:
+            LLMRoute: 처음 일치하는 라우트 (없으면 default)
+        """
+        if not self.routes:
+            return self.default_route
+        if tokens is None:
+            tokens = count_prompt_tokens(prompt)
+        for route in self.routes:
+            if route.matches(prompt_type, tokens):
+                return route
+        return self.default_route
+
+    def candidate_models(self, prompt_type: str) -> List[str]:
+        """
+        프롬프트 종류에 대해 (토큰 수와 관계없이) 선택될 수 있는 모델 목록을 반환합니다. (캐시 조회용, 정책 순서)
+
+        Args:
+            prompt_type: 프롬프트 종류
+
+        Returns:
+            List[str]: 중복 없는 모델 이름 목록 (default 라우트 모델 포함)
+        """
+        models = [
+            route.model for route in self.routes
+            if route.prompt_types is None or prompt_type in route.prompt_types
+        ]
+        models.append(self.default_route.model)
+        return list(dict.fromkeys(models))
+
+    def client(self, route: LLMRoute) -> "ChatOpenAI":
+        """라우트의 OpenAI API 클라이언트를 반환합니다. (langchain_openai는 첫 사용 시 import)"""
+        client = self._clients.get(route.name)
+        if client is not None:
+            return client
+
+        with self._lock:
+            if route.name not in self._clients:
+                from langchain_openai import ChatOpenAI
+
+                self._clients[route.name] = ChatOpenAI(
+                    model=route.model,
+                    temperature=route.temperature,
+                    api_key=os.getenv("OPENAI_API_KEY", "not-used"),
+                    base_url=route.base_url or os.getenv("OPENAI_BASE_URL"),
+                    # 재시도는 LLMCallRunner에서 프롬프트 종류별 정책으로 수행
+                    max_retries=0
+                )
+            return self._clients[route.name]
+
+    def record(self, route: LLMRoute, prompt_type: str, latency: float, response: Any):
+        """
+        라우트별 요청 수, 지연 시간, 비용을 기록합니다.
+
+        Args:
+            route: 사용한 라우트
+            prompt_type: 프롬프트 종류
+            latency: 응답 시간 (초)
+            response: langchain 응답 (usage_metadata로 비용 계산)
+        """
+        LLM_ROUTE_REQUESTS.labels(route.name, route.model, prompt_type).inc()
+        LLM_ROUTE_LATENCY.labels(route.name).observe(latency)
+        cost = route.cost(response)
+        if cost:
+            LLM_ROUTE_COST.labels(route.name, route.model).inc(cost)
@@ -1,19 +1,45 @@
-from redis_subscriber import RedisSubscriber
+from utils.startup_profile import StartupProfile
+
+# 시작 시간 보고서 (import/초기화 단계별 소요 시간)
+startup = StartupProfile()
+
+with startup.step("import redis_subscriber"):
+    from redis_subscriber import RedisSubscriber
+    from stream_consumer import RedisStreamConsumer
 import os
+import threading
 from dotenv import load_dotenv
 from type import PaperMessage, PaperData
 import logging
 import json
-from arxiv_runner import ArXivRunner
-from mongo_service import MongoService
+with startup.step("import arxiv_runner"):
+    from arxiv_runner import ArXivRunner
+with startup.step("import file_service"):
+    import file_service
+with startup.step("import mongo_service"):
+    from mongo_service import MongoService
 from typing import Optional
 from bson import ObjectId
-from utils.str_utils import convert_arxiv_url_to_pdf
+import time
+from scheduler import JobScheduler
+from job_lease import JobLease
+with startup.step("import pipeline"):
+    from pipeline import AnalysisPipeline
+with startup.step("import metrics"):
+    from metrics import record_message, start_metrics_server
 
 logging.basicConfig(level=logging.INFO)  # DEBUG 로그도 보이도록 설정
 
 
 load_dotenv()
+
+# 워커 역할: all(기본값) | abstract | analysis (역할에 해당하는 채널만 구독)
+worker_role = os.getenv("WORKER_ROLE", "all").lower()
+if worker_role not in ("all", "abstract", "analysis"):
+    raise RuntimeError(f"WORKER_ROLE 값이 올바르지 않습니다: {worker_role} (all, abstract, analysis)")
+serve_abstract = worker_role in ("all", "abstract")
+serve_analysis = worker_role in ("all", "analysis")
+
 redis_url = os.getenv("REDIS_URL")
 redis_username = os.getenv("REDIS_USERNAME")
 redis_password = os.getenv("REDIS_PASSWORD")
@@ -25,10 +51,80 @@ if redis_username and redis_password:
     subscriber_kwargs["username"] = redis_username
     subscriber_kwargs["password"] = redis_password
 
-subscriber = RedisSubscriber(**subscriber_kwargs)
+# pubsub: Redis pub/sub 구독 (기본값), streams: Redis Streams 컨슈머 그룹
+ingestion_mode = os.getenv("INGESTION_MODE", "pubsub")
+if ingestion_mode == "streams":
+    subscriber = RedisStreamConsumer(**subscriber_kwargs)
+else:
+    subscriber = RedisSubscriber(**subscriber_kwargs)
+
+# docling 변환용 프로세스 풀은 다른 스레드(배치/스케줄러/업로드 등)가 시작되기 전에 fork
+# DOCLING_WARMUP=true(기본값)이면 fork 전에 docling 모델을 로드하여 자식들이 메모리를 공유하고,
+# 아니면 각 자식 프로세스가 백그라운드에서 로드 (워커 시작을 막지 않음)
+docling_warmup = os.getenv("DOCLING_WARMUP", "true").lower() == "true"
+parse_pool = None
+if serve_analysis:
+    with startup.step("docling process pool"):
+        import converter_pool
+        from pipeline import parse_worker_count
+
+        parse_pool = converter_pool.create_process_pool(parse_worker_count(), warmup_parent=docling_warmup)
+
+with startup.step("init ArXivRunner"):
+    arxiv_runner = ArXivRunner()
+with startup.step("init MongoService"):
+    mongo_service = MongoService()
+
+# 업로드된 이미지 해시 인덱스를 Mongo에 영속화
+file_service.set_image_index(mongo_service)
 
-arxiv_runner = ArXivRunner()
-mongo_service = MongoService()
+# LLM 응답 캐시의 2차 저장소로 Mongo 사용 (선택)
+if os.getenv("LLM_CACHE_MONGO", "false").lower() == "true":
+    arxiv_runner.llm_cache.set_remote_tier(mongo_service)
+
+# 다운로드/파싱/분석 스테이지 파이프라인 (구독 스레드와 분리, docling과 함께 필요할 때 생성)
+_analysis_pipeline: Optional[AnalysisPipeline] = None
+_analysis_pipeline_lock = threading.Lock()
+
+
+def get_analysis_pipeline() -> AnalysisPipeline:
+    """
+    분석 파이프라인을 반환합니다. 처음 호출될 때 파이프라인을 생성합니다.
+    
+    Returns:
+        AnalysisPipeline: 분석 파이프라인
+    """
+    global _analysis_pipeline
+    if _analysis_pipeline is None:
+        with _analysis_pipeline_lock:
+            if _analysis_pipeline is None:
+                started = time.perf_counter()
+                _analysis_pipeline = AnalysisPipeline(arxiv_runner, mongo_service, parse_pool)
+                logging.info(f"분석 파이프라인 준비 완료: {time.perf_counter() - started:.2f}s")
+    return _analysis_pipeline
+
+
+if serve_analysis and docling_warmup:
+    with startup.step("init AnalysisPipeline"):
+        get_analysis_pipeline()
+
+# 큐별 워커 예산 + 우선순위 스케줄러 (딕셔너리 순서가 우선순위)
+# 초록 요약 요청들은 동시에 처리되어 메타데이터 조회가 배치로 묶임
+scheduler = JobScheduler(
+    budgets={
+        "paper:abstract": int(os.getenv("SCHEDULER_ABSTRACT_WORKERS", "16")),
+        "paper:analysis": int(os.getenv("SCHEDULER_ANALYSIS_WORKERS", "4")),
+    },
+    shared_workers=int(os.getenv("SCHEDULER_SHARED_WORKERS", "2")),
+    policy=os.getenv("SCHEDULER_POLICY", "strict"),
+    weights={
+        "paper:abstract": int(os.getenv("SCHEDULER_ABSTRACT_WEIGHT", "4")),
+        "paper:analysis": int(os.getenv("SCHEDULER_ANALYSIS_WEIGHT", "1")),
+    }
+)
+# 큐 깊이/대기 시간은 메트릭(curatify_scheduler_*)으로 노출되고, 주기적으로 로그에도 남김
+if int(os.getenv("SCHEDULER_STATS_INTERVAL_SECONDS", "60")) > 0:
+    scheduler.start_stats_logger(int(os.getenv("SCHEDULER_STATS_INTERVAL_SECONDS", "60")))
 
 
 
@@ -48,6 +144,56 @@ def confirm_paper_abstract(message: PaperMessage) -> Optional[str]:
         logging.info(f"논문이 이미 존재함 - 논문 파싱 진행하지 않음.: {message['paper_id']}")
         return paper_object_id
 
+    # 같은 논문을 다른 워커가 처리 중이면 저장될 때까지 대기
+    lease = JobLease(mongo_service, f"abstract:{message['paper_id']}")
+    if not lease.acquire():
+        return wait_for_paper_abstract(message["paper_id"], lease.lease_seconds)
+
+    try:
+        paper_object_id = create_paper_abstract(message)
+    finally:
+        lease.release("completed" if paper_object_id else "failed")
+    return paper_object_id
+
+
+def wait_for_paper_abstract(arxiv_id: str, timeout_seconds: float) -> Optional[str]:
+    """
+    다른 워커가 실행 중인 초록 요약 작업이 끝날 때까지 대기합니다.
+    
+    Args:
+        arxiv_id: ArXiv 논문 ID
+        timeout_seconds: 최대 대기 시간 (초)
+    Returns:
+        paper_object_id: 저장된 논문 ID 또는 None (작업 실패/시간 초과)
+    """
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        time.sleep(float(os.getenv("JOB_WAIT_INTERVAL_SECONDS", "0.5")))
+        paper_object_id = mongo_service.is_paper_exists(arxiv_id)
+        if paper_object_id:
+            return paper_object_id
+        job = mongo_service.find_job(f"abstract:{arxiv_id}")
+        if not job or job.get("status") != "running":
+            break
+
+    logging.error(f"다른 워커의 논문 초록 요약 대기 실패: {arxiv_id}")
+    return None
+
+
+def create_paper_abstract(message: PaperMessage) -> Optional[str]:
+    """
+    논문 메타데이터를 조회하고 초록을 요약하여 저장합니다. (작업 선점 후 호출)
+    
+    Args:
+        message: 논문 초록 요약 요청 메시지
+    Returns:
+        doc_id: 저장된 논문 초록 요약 정보의 ID 또는 None
+    """
+    # 선점 전에 다른 워커가 저장했을 수 있으므로 다시 확인
+    paper_object_id = mongo_service.is_paper_exists(message["paper_id"])
+    if paper_object_id:
+        return paper_object_id
+
     # ArXiv에서 논문 메타데이터 조회
     paper_metadata = arxiv_runner.get_metadata(message["paper_id"])
     if not paper_metadata:
@@ -55,7 +201,9 @@ def confirm_paper_abstract(message: PaperMessage) -> Optional[str]:
         return None
     
     # 논문 초록 요약
-    summary = arxiv_runner._summary_abstract(paper_metadata["abstract"], paper_metadata["title"])
+    summary = arxiv_runner._summary_abstract(
+        paper_metadata["abstract"], paper_metadata["title"], paper_metadata["arxiv_id"]
+    )
     if not summary:
         logging.error(f"논문 요약 실패: {message['paper_id']}")
         return None
@@ -76,49 +224,67 @@ def confirm_paper_abstract(message: PaperMessage) -> Optional[str]:
     doc_id = mongo_service.save_paper(paper_data)
     return doc_id
 
-@subscriber.subscribe("paper:abstract")
-def handle_abstract_queue(msg: str):
+def process_abstract_message(message: PaperMessage) -> bool:
+    """
+    논문 초록 요약 요청을 처리합니다.
+
+    Returns:
+        bool: 처리 성공 여부 (Streams 모드에서는 성공한 메시지만 ACK)
+    """
     try:
-        data = json.loads(msg)
-        message: PaperMessage = {**data}
-        
         paper_object_id = confirm_paper_abstract(message)
         
         if paper_object_id:
             mongo_service.save_user_paper_abstract(ObjectId(message["user_id"]), paper_object_id)
 
+        record_message("paper:abstract", paper_object_id is not None)
         logging.info(f"논문 초록 요약 정보 저장 완료: {message['paper_id']}")
+        return paper_object_id is not None
 
     except Exception as e:
+        record_message("paper:abstract", False)
         logging.error(f"논문 처리 중 오류 발생: {e}")
+        return False
 
-@subscriber.subscribe("paper:analysis")
-def handle_content_queue(msg: str):
+def handle_abstract_queue(msg: str):
     try:
         data = json.loads(msg)
         message: PaperMessage = {**data}
-        paper_data = mongo_service.find_by_id(message["paper_id"])
         
-        if not paper_data:
-            logging.info(f"논문 데이터 조회 실패: {message['paper_id']}")
-            return
+        return scheduler.submit("paper:abstract", message["user_id"], process_abstract_message, message)
 
-        if paper_data["contentBlocks"]:
-            logging.info(f"논문 콘텐츠 이미 존재함: {message['paper_id']}")
-            mongo_service.save_user_library(message["user_id"], message["paper_id"])
-            return
+    except Exception as e:
+        logging.error(f"논문 처리 중 오류 발생: {e}")
+        return False
 
-        paper_content = arxiv_runner.analyze_paper_content(convert_arxiv_url_to_pdf(paper_data["url"]))
-        
-        if not paper_content:
-            logging.error(f"논문 콘텐츠 요약 실패: {message['paper_id']}")
-            return
+def run_analysis(message: PaperMessage) -> bool:
+    # 파이프라인 완료까지 분석 워커 예산 하나를 점유
+    success = get_analysis_pipeline().submit(message).result()
+    record_message("paper:analysis", success)
+    return success
 
-        mongo_service.update_paper_content(message["paper_id"], paper_content)
-        mongo_service.save_user_library(message["user_id"], message["paper_id"])
-        logging.info(f"논문 콘텐츠 요약 정보 저장 완료: {message['paper_id']}")
+def handle_content_queue(msg: str):
+    try:
+        data = json.loads(msg)
+        message: PaperMessage = {**data}
+
+        # 무거운 작업은 파이프라인에서 처리하고 구독 스레드는 바로 반환
+        return scheduler.submit("paper:analysis", message["user_id"], run_analysis, message)
     except Exception as e:
         logging.error(f"논문 처리 중 오류 발생: {e}")
+        return False
+
+
+if serve_abstract:
+    subscriber.subscribe("paper:abstract")(handle_abstract_queue)
+if serve_analysis:
+    subscriber.subscribe("paper:analysis")(handle_content_queue)
+logging.info(f"워커 역할: {worker_role}")
+startup.report()
+
 
+if __name__ == "__main__":
+    # Prometheus 메트릭 엔드포인트
+    start_metrics_server()
 
-subscriber.start()
\ No newline at end of file
+    subscriber.start()
\ No newline at end of file
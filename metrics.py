@@ -0,0 +1,169 @@
+"""
+Prometheus 메트릭 모듈
+
+단계별 처리 시간/처리 중 개수/실패 수, 메시지 처리 수, 스케줄러 큐 깊이/대기 시간, LLM 토큰 수, 업로드/이미지 후처리 바이트 수를 기록하고
+Prometheus 형식 HTTP 엔드포인트(METRICS_PORT)로 노출합니다.
+
+Author: Minseok kim
+"""
+
+import functools
+import inspect
+import logging
+import os
+import time
+from typing import Any, Callable, Optional
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+logger = logging.getLogger(__name__)
+
+# LLM 호출/PDF 변환처럼 수십 초 걸리는 단계까지 포함하는 구간
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+STAGE_LATENCY = Histogram(
+    "curatify_stage_duration_seconds", "단계별 처리 시간", ["stage"], buckets=_LATENCY_BUCKETS
+)
+STAGE_IN_FLIGHT = Gauge("curatify_stage_in_flight", "단계별 처리 중인 작업 수", ["stage"])
+STAGE_FAILURES = Counter("curatify_stage_failures_total", "단계별 실패 수", ["stage"])
+
+MONGO_LATENCY = Histogram(
+    "curatify_mongo_operation_duration_seconds", "MongoService 메서드 처리 시간", ["operation"], buckets=_LATENCY_BUCKETS
+)
+MONGO_FAILURES = Counter("curatify_mongo_operation_failures_total", "MongoService 메서드 실패 수", ["operation"])
+
+MESSAGES = Counter("curatify_messages_total", "처리한 메시지 수", ["channel", "outcome"])
+LLM_TOKENS = Counter("curatify_llm_tokens_total", "LLM 토큰 사용량", ["model", "kind"])
+LLM_CACHE_REQUESTS = Counter("curatify_llm_cache_requests_total", "LLM 응답 캐시 조회 수", ["result"])
+UPLOAD_BYTES = Counter("curatify_upload_bytes_total", "오브젝트 스토리지에 업로드한 바이트 수")
+LLM_CONCURRENCY_LIMIT = Gauge("curatify_llm_concurrency_limit", "LLM 동시 호출 한도 (AIMD 조정값)")
+LLM_RATE_LIMITED = Counter("curatify_llm_rate_limited_total", "LLM 공급자 속도 제한(429) 응답 수")
+LLM_GOVERNOR_WAIT = Histogram(
+    "curatify_llm_governor_wait_seconds", "LLM 호출 허가 대기 시간", buckets=_LATENCY_BUCKETS
+)
+LLM_RETRIES = Counter("curatify_llm_retries_total", "LLM 호출 재시도 수", ["prompt_type"])
+LLM_HEDGES = Counter("curatify_llm_hedges_total", "LLM 헤징 요청 수 (sent: 보냄, won: 헤징 요청이 먼저 응답, skipped: 허가를 바로 받지 못해 보내지 않음)", ["prompt_type", "outcome"])
+LLM_ROUTE_REQUESTS = Counter("curatify_llm_route_requests_total", "LLM 라우트별 성공한 요청 수", ["route", "model", "prompt_type"])
+LLM_ROUTE_LATENCY = Histogram(
+    "curatify_llm_route_duration_seconds", "LLM 라우트별 응답 시간", ["route"], buckets=_LATENCY_BUCKETS
+)
+LLM_ROUTE_COST = Counter("curatify_llm_route_cost_usd_total", "LLM 라우트별 비용 (USD, 라우트 단가 기준)", ["route", "model"])
+ABSTRACT_BATCH_RESULTS = Counter(
+    "curatify_llm_abstract_batch_results_total", "초록 배치 요약 결과 수 (batched: 배치 응답 사용, fallback: 단독 호출)", ["outcome"]
+)
+SCHEDULER_QUEUE_DEPTH = Gauge("curatify_scheduler_queue_depth", "스케줄러 큐별 대기 중인 작업 수", ["queue"])
+SCHEDULER_RUNNING = Gauge("curatify_scheduler_running", "스케줄러 큐별 실행 중인 작업 수", ["queue"])
+SCHEDULER_OLDEST_WAIT = Gauge("curatify_scheduler_oldest_wait_seconds", "스케줄러 큐별 가장 오래 대기 중인 작업의 대기 시간", ["queue"])
+SCHEDULER_WAIT = Histogram(
+    "curatify_scheduler_wait_seconds", "스케줄러 큐 대기 시간 (제출부터 실행 시작까지)", ["queue"], buckets=_LATENCY_BUCKETS
+)
+STARTUP_SECONDS = Gauge("curatify_startup_seconds", "워커 시작 단계별 소요 시간", ["step"])
+IMAGE_BYTES = Counter("curatify_image_bytes_total", "업로드 전 이미지 후처리 전/후 바이트 수", ["stage"])
+
+
+def timed(stage: str, none_is_failure: bool = False):
+    """
+    함수의 처리 시간, 처리 중 개수, 실패 수를 기록하는 데코레이터입니다. (코루틴 함수 지원)
+
+    Args:
+        stage: 단계 이름 (메트릭 label)
+        none_is_failure: 예외 대신 None을 반환하여 실패를 알리는 함수이면 True
+    """
+    latency = STAGE_LATENCY.labels(stage)
+    in_flight = STAGE_IN_FLIGHT.labels(stage)
+    failures = STAGE_FAILURES.labels(stage)
+    return _instrument(latency, in_flight, failures, none_is_failure)
+
+
+def instrument_methods(prefix: str):
+    """
+    클래스의 public 메서드 전체에 처리 시간/실패 수를 기록하는 클래스 데코레이터입니다. (MongoService 용)
+
+    Args:
+        prefix: operation label 접두어 (예: "mongo")
+    """
+    def decorator(cls):
+        for name, fn in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(fn):
+                continue
+            operation = f"{prefix}.{name}"
+            setattr(cls, name, _instrument(MONGO_LATENCY.labels(operation), None, MONGO_FAILURES.labels(operation), False)(fn))
+        return cls
+    return decorator
+
+
+def _instrument(latency, in_flight, failures, none_is_failure: bool):
+    def decorator(fn: Callable[..., Any]):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if in_flight is not None:
+                    in_flight.inc()
+                started = time.perf_counter()
+                try:
+                    result = await fn(*args, **kwargs)
+                    if none_is_failure and result is None:
+                        failures.inc()
+                    return result
+                except Exception:
+                    failures.inc()
+                    raise
+                finally:
+                    latency.observe(time.perf_counter() - started)
+                    if in_flight is not None:
+                        in_flight.dec()
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if in_flight is not None:
+                in_flight.inc()
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                if none_is_failure and result is None:
+                    failures.inc()
+                return result
+            except Exception:
+                failures.inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - started)
+                if in_flight is not None:
+                    in_flight.dec()
+        return wrapper
+    return decorator
+
+
+def record_message(channel: str, success: bool):
+    """메시지 처리 결과를 기록합니다."""
+    MESSAGES.labels(channel, "success" if success else "failure").inc()
+
+
+def record_llm_usage(model: str, response: Any):
+    """
+    LLM 응답의 토큰 사용량을 기록합니다.
+
+    Args:
+        model: 모델 이름
+        response: langchain AIMessage (usage_metadata가 없으면 기록하지 않음)
+    """
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage.get("input_tokens"):
+        LLM_TOKENS.labels(model, "input").inc(usage["input_tokens"])
+    if usage.get("output_tokens"):
+        LLM_TOKENS.labels(model, "output").inc(usage["output_tokens"])
+
+
+def start_metrics_server(port: Optional[int] = None):
+    """
+    Prometheus 메트릭 HTTP 엔드포인트를 시작합니다. (METRICS_PORT=0 이면 비활성화)
+
+    Args:
+        port: 포트 (기본값: METRICS_PORT 환경변수, 9100)
+    """
+    port = port if port is not None else int(os.getenv("METRICS_PORT", "9100"))
+    if port <= 0:
+        return
+    start_http_server(port)
+    logger.info(f"메트릭 엔드포인트 시작: :{port}/metrics")
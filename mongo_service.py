@@ -5,17 +5,190 @@ Author: Minseok kim
 """
 
 import os
-from typing import Optional, List
-from pymongo import MongoClient
+from typing import Optional, List, Dict, Any
+from pymongo import MongoClient, ReturnDocument, ASCENDING
+from pymongo.errors import DuplicateKeyError
 import logging
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from type import PaperData, ContentAnalysisResult
 from bson import ObjectId
 
+from metrics import instrument_methods
+
 
 logger = logging.getLogger(__name__)
 
+# 서비스가 사용하는 인덱스 (컬렉션 이름, 키, 옵션)
+INDEX_SPECS = [
+    ("papers", [("url", ASCENDING)], {"unique": True, "name": "url_unique"}),
+    ("user_paper_abstracts", [("user_id", ASCENDING), ("paper_id", ASCENDING)], {"unique": True, "name": "user_paper_unique"}),
+    ("user_libraries", [("userId", ASCENDING), ("paperId", ASCENDING)], {"unique": True, "name": "user_paper_unique"}),
+    ("llm_cache", [("expiresAt", ASCENDING)], {"expireAfterSeconds": 0, "name": "expires_at_ttl"}),
+    ("analysis_checkpoints", [("updatedAt", ASCENDING)],
+     {"expireAfterSeconds": int(os.getenv("CHECKPOINT_TTL_SECONDS", str(7 * 24 * 3600))), "name": "updated_at_ttl"}),
+]
+
+
+def build_paper_document(paper_data: PaperData) -> Dict[str, Any]:
+    """저장할 논문 문서를 구성합니다."""
+    return {
+        "title": paper_data.get("title", ""),
+        "summary": paper_data.get("summary", ""),
+        "contentBlocks": paper_data.get("contentBlocks", []),
+        "url": paper_data.get("url", ""),
+        "authors": paper_data.get("authors", []),
+        "categories": paper_data.get("categories", []),
+        "abstract": paper_data.get("abstract", ""),
+        "lastPublishDate": paper_data.get("lastPublishDate"),
+        "createdAt": datetime.utcnow(),
+        "updatedAt": datetime.utcnow()
+    }
+
+
+def is_analysis_completed(paper_data: Optional[Dict[str, Any]]) -> bool:
+    """
+    논문 본문 분석이 완료되었는지 확인합니다.
+    analysisProgress가 없는 기존 문서는 contentBlocks 존재 여부로 판단합니다.
+    """
+    if not paper_data:
+        return False
+    progress = paper_data.get("analysisProgress")
+    if progress:
+        return progress.get("status") == "completed"
+    return bool(paper_data.get("contentBlocks"))
+
+
+def build_content_block_update(paper_id: str, block: ContentAnalysisResult):
+    """
+    섹션 분석 결과 하나를 order 순서로 contentBlocks에 추가하는 (filter, update)를 구성합니다.
+    같은 order가 이미 저장되어 있으면 filter가 매칭되지 않아 중복 저장되지 않습니다.
+    """
+    query = {"_id": ObjectId(paper_id), "contentBlocks.order": {"$ne": block["order"]}}
+    update = {
+        "$push": {"contentBlocks": {"$each": [block], "$sort": {"order": 1}}},
+        "$inc": {"analysisProgress.completed": 1},
+        "$set": {"analysisProgress.updatedAt": datetime.utcnow()}
+    }
+    return query, update
+
+
+def paper_url_for(arxiv_id: str) -> str:
+    """ArXiv ID로 논문 문서의 url(유니크 키)을 생성합니다."""
+    return f"https://arxiv.org/abs/{arxiv_id}"
+
+
+def build_start_progress_update(total: int, completed: int) -> Dict[str, Any]:
+    """분석 진행 상태를 running으로 기록하는 update를 구성합니다. (이미 저장된 섹션 수는 completed로 유지)"""
+    now = datetime.utcnow()
+    return {"$set": {
+        "analysisProgress.status": "running",
+        "analysisProgress.total": total,
+        "analysisProgress.completed": completed,
+        "analysisProgress.startedAt": now,
+        "analysisProgress.updatedAt": now
+    }}
+
+
+def build_finish_progress_update(status: str) -> Dict[str, Any]:
+    """분석 진행 상태를 종료 상태로 바꾸는 update를 구성합니다."""
+    return {"$set": {"analysisProgress.status": status, "analysisProgress.updatedAt": datetime.utcnow()}}
+
+
+def build_user_paper_abstract_upsert(user_id, paper_id):
+    """사용자 논문 초록 추가 정보 upsert용 (filter, update)를 구성합니다."""
+    return {"user_id": user_id, "paper_id": paper_id}, {"$setOnInsert": {"createdAt": datetime.utcnow()}}
+
+
+def build_user_library_upsert(user_id: str, paper_id: str):
+    """사용자 논문 라이브러리 upsert용 (filter, update)를 구성합니다."""
+    return (
+        {"userId": ObjectId(user_id), "paperId": ObjectId(paper_id)},
+        {"$setOnInsert": {"createdAt": datetime.utcnow()}}
+    )
+
+
+def build_uploaded_image_upsert(object_name: str, public_url: str, size: int):
+    """업로드 이미지 인덱스 upsert용 (filter, update)를 구성합니다."""
+    return {"_id": object_name}, {"$setOnInsert": {"url": public_url, "size": size, "createdAt": datetime.utcnow()}}
+
+
+def build_llm_response_query(key: str) -> Dict[str, Any]:
+    """만료되지 않은 LLM 응답 캐시 조회 filter를 구성합니다."""
+    return {"_id": key, "expiresAt": {"$gt": datetime.utcnow()}}
+
+
+def build_llm_response_upsert(key: str, model: str, value: str, ttl_seconds: int):
+    """LLM 응답 캐시 upsert용 (filter, update)를 구성합니다."""
+    now = datetime.utcnow()
+    return (
+        {"_id": key},
+        {"$set": {"model": model, "value": value, "createdAt": now, "expiresAt": now + timedelta(seconds=ttl_seconds)}}
+    )
+
+
+def build_checkpoint_update(sections: str, image_keys: List[str]) -> Dict[str, Any]:
+    """파싱 체크포인트를 저장하는 update를 구성합니다. 이전에 기록된 이미지 URL은 초기화됩니다."""
+    return {"$set": {"sections": sections, "imageKeys": image_keys, "imageUrls": [], "updatedAt": datetime.utcnow()}}
 
+
+def build_checkpoint_image_update(image_key: str, public_url: str) -> Dict[str, Any]:
+    """업로드가 끝난 이미지 URL을 체크포인트에 추가하는 update를 구성합니다."""
+    return {
+        "$addToSet": {"imageUrls": {"key": image_key, "url": public_url}},
+        "$set": {"updatedAt": datetime.utcnow()}
+    }
+
+
+def build_claim_job_query(job_key: str, owner: str, lease_seconds: int):
+    """
+    작업 선점용 (filter, update)를 구성합니다.
+    다른 소유자가 유효한 lease로 실행 중이면 filter가 매칭되지 않아 upsert가 DuplicateKeyError로 실패합니다.
+    """
+    now = datetime.utcnow()
+    query = {
+        "_id": job_key,
+        "$or": [
+            {"status": {"$ne": "running"}},
+            {"leaseExpiresAt": {"$lt": now}},
+            {"owner": owner}
+        ]
+    }
+    update = {
+        "$set": {
+            "owner": owner,
+            "status": "running",
+            "startedAt": now,
+            "leaseExpiresAt": now + timedelta(seconds=lease_seconds)
+        },
+        "$setOnInsert": {"waiters": []}
+    }
+    return query, update
+
+
+def build_renew_lease_update(job_key: str, owner: str, lease_seconds: int):
+    """lease 연장용 (filter, update)를 구성합니다. 소유자가 바뀌었거나 종료된 작업이면 매칭되지 않습니다."""
+    return (
+        {"_id": job_key, "owner": owner, "status": "running"},
+        {"$set": {"leaseExpiresAt": datetime.utcnow() + timedelta(seconds=lease_seconds)}}
+    )
+
+
+def build_release_job_update(job_key: str, owner: str, status: str):
+    """작업 종료용 (filter, update)를 구성합니다."""
+    return {"_id": job_key, "owner": owner}, {"$set": {"status": status, "finishedAt": datetime.utcnow()}}
+
+
+def build_add_job_waiter_update(job_key: str, waiter: str):
+    """작업 대기자 등록용 (filter, update)를 구성합니다."""
+    return {"_id": job_key}, {"$addToSet": {"waiters": waiter}}
+
+
+# find_job 이 조회하는 필드 (대기자가 종료/lease 만료를 판단하는 데 사용)
+JOB_STATUS_PROJECTION = {"status": 1, "owner": 1, "leaseExpiresAt": 1}
+
+
+@instrument_methods("mongo")
 class MongoService:
     """논문 데이터베이스 레포지토리"""
     
@@ -38,14 +211,34 @@ class MongoService:
         self.collection = self.db.papers
         self.user_collection = self.db.user_paper_abstracts
         self.user_library_collection = self.db.user_libraries
+        self.uploaded_image_collection = self.db.uploaded_images
+        self.llm_cache_collection = self.db.llm_cache
+        self.job_collection = self.db.paper_jobs
+        self.checkpoint_collection = self.db.analysis_checkpoints
 
-        # 연결 테스트
-        try:
-            self.client.admin.command('ping')
-            logger.info(f"MongoDB 연결 성공: {database_name}")
-        except Exception as e:
-            logger.error(f"MongoDB 연결 실패: {e}")
-            raise
+        # MONGODB_STARTUP_CHECK=true 이면 시작 시 연결 테스트 후 인덱스를 생성하고,
+        # 아니면 연결 대기로 시작이 늦어지지 않도록 인덱스 생성을 백그라운드에서 수행
+        if os.getenv("MONGODB_STARTUP_CHECK", "false").lower() == "true":
+            try:
+                self.client.admin.command('ping')
+                logger.info(f"MongoDB 연결 성공: {database_name}")
+            except Exception as e:
+                logger.error(f"MongoDB 연결 실패: {e}")
+                raise
+            self.ensure_indexes()
+        else:
+            threading.Thread(target=self.ensure_indexes, name="mongo-ensure-indexes", daemon=True).start()
+
+    def ensure_indexes(self):
+        """
+        서비스가 사용하는 인덱스를 생성합니다. (이미 있으면 무시됨)
+        기존 중복 데이터로 unique 인덱스 생성에 실패해도 서비스는 계속 동작합니다.
+        """
+        for collection_name, keys, options in INDEX_SPECS:
+            try:
+                self.db[collection_name].create_index(keys, **options)
+            except Exception as e:
+                logger.error(f"인덱스 생성 실패 ({collection_name}.{options['name']}): {e}")
     
     def find_by_id(self, id: str) -> Optional[PaperData]:
         """
@@ -73,24 +266,12 @@ class MongoService:
         """
         try:
             # 저장할 문서 구성
-            document = {
-                "title": paper_data.get("title", ""),
-                "summary": paper_data.get("summary", ""),
-                "contentBlocks": paper_data.get("contentBlocks", []),
-                "url": paper_data.get("url", ""),
-                "authors": paper_data.get("authors", []),
-                "categories": paper_data.get("categories", []),
-                "abstract": paper_data.get("abstract", ""),
-                "lastPublishDate": paper_data.get("lastPublishDate"),
-                "createdAt": datetime.utcnow(),
-                "updatedAt": datetime.utcnow()
-            }
-            
+            document = build_paper_document(paper_data)
 
-            # 새 문서 삽입
-            result = self.collection.insert_one(document)
+            # url 기준 upsert (이미 있으면 기존 문서 ID 반환)
+            result = self._upsert_returning_id(self.collection, {"url": document["url"]}, document)
             logger.info(f"논문 저장됨: {paper_data.get('title', 'Unknown')}")
-            return result.inserted_id
+            return result
                 
         except Exception as e:
             logger.error(f"논문 저장 실패: {e}")
@@ -110,10 +291,10 @@ class MongoService:
         """
         try:
             # ArXiv ID로 URL 생성
-            url = f"https://arxiv.org/abs/{arxiv_id}"
+            url = paper_url_for(arxiv_id)
             
-            # URL로 논문 존재 확인
-            paper = self.collection.find_one({"url": url})
+            # URL로 논문 존재 확인 (url 인덱스만 사용하고 _id만 조회)
+            paper = self.collection.find_one({"url": url}, {"_id": 1})
             
             exists = paper is not None
             if exists:
@@ -136,31 +317,65 @@ class MongoService:
             paper_id: 논문 ID
             abstract: 논문 초록
         """    
+        query, update = build_user_paper_abstract_upsert(user_id, paper_id)
         try:
-            self.user_collection.insert_one({"user_id": user_id, "paper_id": paper_id})
+            self.user_collection.update_one(query, update, upsert=True)
             logger.info(f"사용자 논문 초록 추가 정보 저장됨: {user_id} (논문 ID: {paper_id})")
             return True
         except Exception as e:
             logger.error(f"사용자 논문 초록 추가 정보 저장 실패: {e}")
             return False
 
-    def update_paper_content(self, paper_id: str, paper_content: List[ContentAnalysisResult]) -> Optional[str]:
+    def start_paper_progress(self, paper_id: str, total: int) -> bool:
         """
-        논문 콘텐츠를 업데이트합니다.
+        섹션 단위 저장을 시작하기 전에 분석 진행 상태를 기록합니다.
+        이미 저장된 섹션(contentBlocks)은 유지합니다.
         
         Args:
             paper_id: 논문 ID
-            paper_content: 논문 콘텐츠
+            total: 전체 섹션 수
+        """
+        try:
+            paper = self.collection.find_one({"_id": ObjectId(paper_id)}, {"contentBlocks.order": 1})
+            completed = len((paper or {}).get("contentBlocks") or [])
+            self.collection.update_one({"_id": ObjectId(paper_id)}, build_start_progress_update(total, completed))
+            return True
+        except Exception as e:
+            logger.error(f"논문 분석 진행 상태 저장 실패: {e}")
+            return False
+
+    def save_content_block(self, paper_id: str, block: ContentAnalysisResult) -> bool:
+        """
+        분석이 끝난 섹션 하나를 contentBlocks에 order 순서로 저장합니다.
+        
+        Args:
+            paper_id: 논문 ID
+            block: 섹션 분석 결과
             
         Returns:
-            bool: 성공 여부
+            bool: 새로 저장되었는지 여부 (이미 저장된 order이면 False)
+        """
+        query, update = build_content_block_update(paper_id, block)
+        try:
+            result = self.collection.update_one(query, update)
+            return result.modified_count == 1
+        except Exception as e:
+            logger.error(f"논문 섹션 저장 실패: {paper_id} ({block['order']}) - {e}")
+            return False
+
+    def finish_paper_progress(self, paper_id: str, status: str) -> bool:
+        """
+        분석 진행 상태를 종료 상태로 변경합니다.
+        
+        Args:
+            paper_id: 논문 ID
+            status: "completed" 또는 "partial"(일부 섹션 실패)
         """
         try:
-            self.collection.update_one({"_id": ObjectId(paper_id)}, {"$set": {"contentBlocks": paper_content}})
-            logger.info(f"논문 콘텐츠 업데이트됨: {paper_id}")
+            self.collection.update_one({"_id": ObjectId(paper_id)}, build_finish_progress_update(status))
             return True
         except Exception as e:
-            logger.error(f"논문 콘텐츠 업데이트 실패: {e}")
+            logger.error(f"논문 분석 진행 상태 저장 실패: {e}")
             return False
 
 
@@ -169,7 +384,8 @@ class MongoService:
         사용자 논문 라이브러리를 저장합니다.
         """
         try:
-            self.user_library_collection.insert_one({"userId": ObjectId(user_id), "paperId":ObjectId(paper_id), "createdAt": datetime.utcnow()})
+            query, update = build_user_library_upsert(user_id, paper_id)
+            self.user_library_collection.update_one(query, update, upsert=True)
             logger.info(f"사용자 논문 라이브러리 저장됨: {user_id} (논문 ID: {paper_id})")
             return True
         except Exception as e:
@@ -177,6 +393,248 @@ class MongoService:
             return False
 
 
+    def find_uploaded_image(self, object_name: str) -> Optional[str]:
+        """
+        콘텐츠 해시 기반 객체 이름으로 이미 업로드된 이미지의 공개 URL을 조회합니다.
+        
+        Args:
+            object_name: 오브젝트 스토리지 객체 이름 (예: "images/<sha256>.png")
+            
+        Returns:
+            str: 공개 URL 또는 None
+        """
+        try:
+            image = self.uploaded_image_collection.find_one({"_id": object_name}, {"url": 1})
+            return image["url"] if image else None
+        except Exception as e:
+            logger.error(f"업로드 이미지 조회 실패: {e}")
+            return None
+
+    def save_uploaded_image(self, object_name: str, public_url: str, size: int) -> bool:
+        """
+        업로드된 이미지를 인덱스에 기록합니다.
+        
+        Args:
+            object_name: 오브젝트 스토리지 객체 이름
+            public_url: 공개 URL
+            size: 이미지 크기 (bytes)
+        """
+        query, update = build_uploaded_image_upsert(object_name, public_url, size)
+        try:
+            self.uploaded_image_collection.update_one(query, update, upsert=True)
+            return True
+        except Exception as e:
+            logger.error(f"업로드 이미지 기록 실패: {e}")
+            return False
+
+
+    def find_llm_response(self, key: str) -> Optional[str]:
+        """
+        캐시된 LLM 응답을 조회합니다.
+        
+        Args:
+            key: 모델 이름 + 프롬프트 해시 키
+            
+        Returns:
+            str: 캐시된 응답 또는 None
+        """
+        try:
+            cached = self.llm_cache_collection.find_one(build_llm_response_query(key), {"value": 1})
+            return cached["value"] if cached else None
+        except Exception as e:
+            logger.error(f"LLM 응답 캐시 조회 실패: {e}")
+            return None
+
+    def save_llm_response(self, key: str, model: str, value: str, ttl_seconds: int) -> bool:
+        """
+        LLM 응답을 캐시에 저장합니다.
+        
+        Args:
+            key: 모델 이름 + 프롬프트 해시 키
+            model: 모델 이름
+            value: LLM 응답
+            ttl_seconds: 유효 시간 (초)
+        """
+        query, update = build_llm_response_upsert(key, model, value, ttl_seconds)
+        try:
+            self.llm_cache_collection.update_one(query, update, upsert=True)
+            return True
+        except Exception as e:
+            logger.error(f"LLM 응답 캐시 저장 실패: {e}")
+            return False
+
+
+    def find_analysis_checkpoint(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        """
+        논문 분석 체크포인트(파싱된 섹션, 업로드된 이미지 URL)를 조회합니다.
+        
+        Args:
+            paper_id: 논문 ID
+        """
+        try:
+            return self.checkpoint_collection.find_one({"_id": paper_id})
+        except Exception as e:
+            logger.error(f"분석 체크포인트 조회 실패: {e}")
+            return None
+
+    def save_analysis_checkpoint(self, paper_id: str, sections: str, image_keys: List[str]) -> bool:
+        """
+        파싱된 섹션을 체크포인트로 저장합니다. 이전에 기록된 이미지 URL은 초기화됩니다.
+        
+        Args:
+            paper_id: 논문 ID
+            sections: [{"title": 섹션 제목, "chunks": [{"type": "text" | "img", "content": ...}, ...]}, ...] 형태의 JSON 문자열
+            image_keys: 본문이 참조하는 이미지 키 목록
+        """
+        try:
+            self.checkpoint_collection.update_one({"_id": paper_id}, build_checkpoint_update(sections, image_keys), upsert=True)
+            return True
+        except Exception as e:
+            logger.error(f"분석 체크포인트 저장 실패: {e}")
+            return False
+
+    def save_checkpoint_image_url(self, paper_id: str, image_key: str, public_url: str) -> bool:
+        """
+        업로드가 끝난 이미지의 공개 URL을 체크포인트에 추가합니다.
+        
+        Args:
+            paper_id: 논문 ID
+            image_key: 이미지 키 (예: "picture-1.png")
+            public_url: 공개 URL
+        """
+        try:
+            self.checkpoint_collection.update_one({"_id": paper_id}, build_checkpoint_image_update(image_key, public_url))
+            return True
+        except Exception as e:
+            logger.error(f"분석 체크포인트 이미지 저장 실패: {e}")
+            return False
+
+    def delete_analysis_checkpoint(self, paper_id: str) -> bool:
+        """
+        분석이 완료된 논문의 체크포인트를 삭제합니다.
+        """
+        try:
+            self.checkpoint_collection.delete_one({"_id": paper_id})
+            return True
+        except Exception as e:
+            logger.error(f"분석 체크포인트 삭제 실패: {e}")
+            return False
+
+
+    def claim_job(self, job_key: str, owner: str, lease_seconds: int) -> bool:
+        """
+        작업을 원자적으로 선점합니다. 다른 소유자의 유효한 lease가 있으면 실패합니다.
+        
+        Args:
+            job_key: 작업 키 (예: "analysis:<paper_id>")
+            owner: 작업 소유자 식별자
+            lease_seconds: lease 유효 시간 (초)
+            
+        Returns:
+            bool: 선점 성공 여부
+        """
+        query, update = build_claim_job_query(job_key, owner, lease_seconds)
+        try:
+            self.job_collection.update_one(query, update, upsert=True)
+            logger.info(f"작업 선점 성공: {job_key} ({owner})")
+            return True
+        except DuplicateKeyError:
+            # 조건에 맞지 않아 upsert가 같은 _id로 insert를 시도한 경우 = 다른 소유자가 실행 중
+            logger.info(f"작업이 이미 실행 중: {job_key}")
+            return False
+
+    def renew_job_lease(self, job_key: str, owner: str, lease_seconds: int) -> Optional[bool]:
+        """
+        작업 lease를 연장합니다 (heartbeat).
+        
+        Args:
+            job_key: 작업 키
+            owner: 작업 소유자 식별자
+            lease_seconds: 연장할 lease 유효 시간 (초)
+            
+        Returns:
+            bool: 연장 성공 여부 (lease를 잃은 경우 False)
+            None: Mongo 오류 등으로 확인하지 못한 경우 (재시도 대상)
+        """
+        query, update = build_renew_lease_update(job_key, owner, lease_seconds)
+        try:
+            result = self.job_collection.update_one(query, update)
+            return result.matched_count == 1
+        except Exception as e:
+            logger.error(f"작업 lease 연장 실패: {e}")
+            return None
+
+    def release_job(self, job_key: str, owner: str, status: str) -> Optional[Dict[str, Any]]:
+        """
+        작업을 종료 상태로 변경하고 대기자 목록을 포함한 작업 문서를 반환합니다.
+        
+        Args:
+            job_key: 작업 키
+            owner: 작업 소유자 식별자
+            status: 종료 상태 ("completed" 또는 "failed")
+            
+        Returns:
+            Dict: 종료된 작업 문서 또는 None (소유자가 아닌 경우)
+        """
+        query, update = build_release_job_update(job_key, owner, status)
+        try:
+            return self.job_collection.find_one_and_update(query, update, return_document=ReturnDocument.AFTER)
+        except Exception as e:
+            logger.error(f"작업 종료 처리 실패: {e}")
+            return None
+
+    def add_job_waiter(self, job_key: str, waiter: str) -> Optional[Dict[str, Any]]:
+        """
+        실행 중인 작업의 결과를 기다리는 요청자를 등록합니다.
+        
+        Args:
+            job_key: 작업 키
+            waiter: 요청자 식별자 (예: user_id)
+            
+        Returns:
+            Dict: 등록 후 작업 문서 또는 None
+        """
+        query, update = build_add_job_waiter_update(job_key, waiter)
+        try:
+            return self.job_collection.find_one_and_update(query, update, return_document=ReturnDocument.AFTER)
+        except Exception as e:
+            logger.error(f"작업 대기자 등록 실패: {e}")
+            return None
+
+    def find_job(self, job_key: str) -> Optional[Dict[str, Any]]:
+        """
+        작업 문서를 조회합니다.
+        
+        Args:
+            job_key: 작업 키
+        """
+        try:
+            return self.job_collection.find_one({"_id": job_key}, JOB_STATUS_PROJECTION)
+        except Exception as e:
+            logger.error(f"작업 조회 실패: {e}")
+            return None
+
+
+    def _upsert_returning_id(self, collection, query: Dict[str, Any], document: Dict[str, Any]) -> ObjectId:
+        """
+        문서가 없으면 삽입하고, 있으면 그대로 두고 _id를 반환합니다. (한 번의 round trip)
+        동시 upsert로 unique 인덱스 충돌이 나면 한 번 재시도합니다.
+        """
+        for attempt in range(2):
+            try:
+                result = collection.find_one_and_update(
+                    query,
+                    {"$setOnInsert": document},
+                    projection={"_id": 1},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                return result["_id"]
+            except DuplicateKeyError:
+                if attempt:
+                    raise
+
+
     def close(self):
         """MongoDB 연결 종료"""
         if self.client:
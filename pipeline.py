@@ -0,0 +1,409 @@
+"""
+논문 본문 분석 스테이지 파이프라인 모듈
+
+download(스레드) -> parse(프로세스 풀) -> analyze(스레드) 단계를 bounded 큐로 연결하여
+CPU 중심의 docling 변환이 Redis 구독 스레드나 다른 메시지 처리를 막지 않도록 합니다.
+
+Author: Minseok kim
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from arxiv_runner import ArXivRunner
+from checkpoint_store import CheckpointStore
+from job_lease import JobLease
+from metrics import timed
+from mongo_service import MongoService, is_analysis_completed
+from type import ContentAnalysisResult, PaperMessage, Section
+from utils.str_utils import convert_arxiv_url_to_pdf
+
+logger = logging.getLogger(__name__)
+
+
+def parse_worker_count() -> int:
+    """docling 변환 프로세스 수 (PIPELINE_PARSE_WORKERS, 기본값: CPU 수)"""
+    return int(os.getenv("PIPELINE_PARSE_WORKERS", str(os.cpu_count() or 1)))
+
+
+def parse_pdf_worker(
+    pdf_bytes: bytes,
+    page_range: Optional[Tuple[int, int]] = None,
+    image_prefix: str = ""
+) -> Tuple[List[Section], Dict[str, bytes]]:
+    """
+    프로세스 풀에서 실행되는 PDF 파싱 함수입니다.
+
+    Args:
+        pdf_bytes: PDF 파일 바이트
+        page_range: 변환할 페이지 범위 (1부터 시작, 끝 포함). None이면 전체
+        image_prefix: 이미지 키 접두어
+
+    Returns:
+        Tuple[List[Section], Dict[str, bytes]]: 문서 순서의 섹션 목록, 이미지 키 -> PNG 바이트
+    """
+    from docling.datamodel.base_models import DocumentStream
+
+    doc_stream = DocumentStream(name=str(uuid4()) + ".pdf", stream=BytesIO(pdf_bytes))
+    return ArXivRunner._parse_pdf_to_sections(doc_stream, page_range, image_prefix)
+
+
+def plan_parse_tasks(pdf_bytes: bytes, max_shards: int) -> List[Tuple[Optional[Tuple[int, int]], str]]:
+    """
+    parse_pdf_worker에 넘길 (페이지 범위, 이미지 키 접두어) 목록을 만듭니다.
+    페이지 수가 많은 PDF는 페이지 범위로 나누어 여러 프로세스에서 동시에 변환합니다.
+
+    Args:
+        pdf_bytes: PDF 파일 바이트
+        max_shards: 최대 조각 수 (변환 프로세스 수)
+
+    Returns:
+        List[Tuple[Optional[Tuple[int, int]], str]]: 나누지 않으면 [(None, "")]
+    """
+    import converter_pool
+
+    try:
+        shards = converter_pool.plan_page_shards(converter_pool.page_count(pdf_bytes), max_shards)
+    except Exception as e:
+        logger.error(f"PDF 페이지 수 조회 실패, 전체를 한 번에 변환합니다: {e}")
+        shards = []
+    if not shards:
+        return [(None, "")]
+    return [(page_range, f"s{index}-") for index, page_range in enumerate(shards, start=1)]
+
+
+class AnalysisJob:
+    """파이프라인 단계 사이를 이동하는 논문 분석 작업"""
+
+    def __init__(self, message: PaperMessage):
+        self.message = message
+        self.future: Future = Future()
+        self.pdf_url: Optional[str] = None
+        self.pdf_bytes: Optional[bytes] = None
+        self.sections: Optional[List[Section]] = None
+        self.images: Dict[str, bytes] = {}
+        # 이전 실행의 체크포인트 (업로드된 이미지 URL, 완료된 섹션)
+        self.uploaded_urls: Dict[str, str] = {}
+        self.completed_blocks: Dict[int, ContentAnalysisResult] = {}
+        self.lease: Optional[JobLease] = None
+        # 다른 워커의 작업이 실패하여 대기자가 작업을 이어받은 횟수
+        self.takeovers = 0
+        self.enqueued_at = time.perf_counter()
+
+    def lease_lost(self) -> bool:
+        """보유 중인 lease를 잃었는지 확인합니다. (True이면 결과를 쓰지 말고 중단)"""
+        return self.lease is not None and self.lease.lost
+
+    def finish(self, success: bool, status: Optional[str] = None):
+        """
+        작업 완료 처리 (보유 중인 lease 해제)
+
+        Args:
+            success: 요청 처리 성공 여부
+            status: lease 종료 상태 (기본값: 성공이면 "completed", 아니면 "failed")
+        """
+        self.images = {}
+        if self.lease:
+            self.lease.release(status or ("completed" if success else "failed"))
+            self.lease = None
+        if not self.future.done():
+            self.future.set_result(success)
+
+
+class _Stage:
+    """bounded 입력 큐와 워커 스레드로 구성된 파이프라인 단계"""
+
+    def __init__(self, name: str, handler: Callable[[AnalysisJob], bool], workers: int, queue_size: int):
+        """
+        Args:
+            name: 단계 이름 (로그/스레드 이름용)
+            handler: 작업 처리 함수. True를 반환하면 다음 단계로 전달합니다.
+            workers: 워커 스레드 수
+            queue_size: 입력 큐 크기 (가득 차면 이전 단계가 대기)
+        """
+        self.name = name
+        self.handler = handler
+        self.queue: "queue.Queue[AnalysisJob]" = queue.Queue(maxsize=queue_size)
+        self.next_stage: Optional["_Stage"] = None
+        for i in range(workers):
+            threading.Thread(target=self._run, name=f"pipeline-{name}-{i}", daemon=True).start()
+
+    def put(self, job: AnalysisJob):
+        self.queue.put(job)
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if self.handler(job) and self.next_stage:
+                    self.next_stage.put(job)
+            except Exception as e:
+                logger.error(f"파이프라인 {self.name} 단계 처리 중 오류 발생: {job.message.get('paper_id')} - {e}")
+                job.finish(False)
+            finally:
+                self.queue.task_done()
+
+
+class AnalysisPipeline:
+    """paper:analysis 메시지를 스테이지 파이프라인으로 처리하는 클래스"""
+
+    def __init__(self, runner: ArXivRunner, mongo_service: MongoService, process_pool: ProcessPoolExecutor):
+        """
+        Args:
+            runner: ArXivRunner (다운로드/LLM 분석용)
+            mongo_service: MongoService
+            process_pool: docling 변환용 프로세스 풀 (converter_pool.create_process_pool, 다른 스레드 시작 전에 생성)
+        """
+        self.runner = runner
+        self.mongo_service = mongo_service
+        self.checkpoints = CheckpointStore(mongo_service)
+
+        queue_size = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+        parse_workers = parse_worker_count()
+        self.parse_workers = parse_workers
+        self.process_pool = process_pool
+
+        self.download_stage = _Stage("download", self._download, int(os.getenv("PIPELINE_DOWNLOAD_WORKERS", "4")), queue_size)
+        # 스레드 하나가 프로세스 하나의 결과를 기다리므로 프로세스 수와 동일하게 설정
+        self.parse_stage = _Stage("parse", self._parse, parse_workers, queue_size)
+        self.analyze_stage = _Stage("analyze", self._analyze, int(os.getenv("PIPELINE_ANALYZE_WORKERS", "4")), queue_size)
+
+        self.download_stage.next_stage = self.parse_stage
+        self.parse_stage.next_stage = self.analyze_stage
+
+        # 다른 워커가 실행 중인 작업을 기다리는 대기자 (작업이 끝날 때까지 Future를 완료하지 않음)
+        self.waiter_poll_seconds = float(os.getenv("PIPELINE_WAITER_POLL_SECONDS", "2"))
+        self.max_takeovers = int(os.getenv("PIPELINE_WAITER_MAX_TAKEOVERS", "3"))
+        self._waiters: List[AnalysisJob] = []
+        self._waiters_lock = threading.Lock()
+        threading.Thread(target=self._watch_waiters, name="pipeline-waiters", daemon=True).start()
+
+    def submit(self, message: PaperMessage) -> Future:
+        """
+        분석 작업을 파이프라인에 제출합니다. 다운로드 큐가 가득 찬 경우 대기합니다.
+
+        Args:
+            message: 논문 분석 요청 메시지
+
+        Returns:
+            Future: 작업 완료 시 성공 여부(bool)가 설정되는 Future
+        """
+        job = AnalysisJob(message)
+        self.download_stage.put(job)
+        return job.future
+
+    @timed("pipeline.download")
+    def _download(self, job: AnalysisJob) -> bool:
+        message = job.message
+        paper_data = self.mongo_service.find_by_id(message["paper_id"])
+
+        if not paper_data:
+            logger.info(f"논문 데이터 조회 실패: {message['paper_id']}")
+            job.finish(False)
+            return False
+
+        if is_analysis_completed(paper_data):
+            logger.info(f"논문 콘텐츠 이미 존재함: {message['paper_id']}")
+            self.mongo_service.save_user_library(message["user_id"], message["paper_id"])
+            job.finish(True)
+            return False
+
+        # 같은 논문을 다른 워커가 분석 중이면 대기자로 등록하고 종료
+        lease = JobLease(self.mongo_service, f"analysis:{message['paper_id']}")
+        if not lease.acquire():
+            self._attach_to_running_job(job)
+            return False
+        job.lease = lease
+
+        # 선점 전에 다른 워커가 완료했을 수 있으므로 다시 확인
+        paper_data = self.mongo_service.find_by_id(message["paper_id"])
+        if is_analysis_completed(paper_data):
+            logger.info(f"논문 콘텐츠 이미 존재함: {message['paper_id']}")
+            self.mongo_service.save_user_library(message["user_id"], message["paper_id"])
+            job.finish(True)
+            return False
+
+        paper_id = message["paper_id"]
+        job.pdf_url = convert_arxiv_url_to_pdf(paper_data["url"])
+        job.completed_blocks = CheckpointStore.completed_blocks(paper_data)
+        logger.info(f"논문 본문 요약/정리 시작: {job.pdf_url} (완료된 섹션 {len(job.completed_blocks)}개)")
+
+        # 파싱 결과와 모든 이미지 URL이 체크포인트에 있으면 다운로드/파싱을 건너뜀
+        sections, image_urls, image_keys = self.checkpoints.load_parsed(paper_id)
+        if sections is not None and set(image_keys) <= set(image_urls):
+            logger.info(f"파싱 체크포인트에서 재개: {paper_id}")
+            job.sections, job.uploaded_urls = sections, image_urls
+            return True
+
+        job.pdf_bytes = self.checkpoints.load_pdf(paper_id)
+        if job.pdf_bytes is not None:
+            logger.info(f"PDF 체크포인트에서 재개: {paper_id}")
+            return True
+
+        job.pdf_bytes = self.runner._read_pdf_to_binary(job.pdf_url).getvalue()
+        self.checkpoints.save_pdf(paper_id, job.pdf_bytes)
+        return True
+
+    @timed("pipeline.parse")
+    def _parse(self, job: AnalysisJob) -> bool:
+        if job.sections is not None:
+            return True
+
+        started = time.perf_counter()
+        # 큰 PDF는 페이지 범위별로 나누어 프로세스 풀에서 동시에 변환한 뒤 합침
+        tasks = plan_parse_tasks(job.pdf_bytes, self.parse_workers)
+        futures = [
+            self.process_pool.submit(parse_pdf_worker, job.pdf_bytes, page_range, image_prefix)
+            for page_range, image_prefix in tasks
+        ]
+        job.sections, job.images = ArXivRunner._merge_section_shards([future.result() for future in futures])
+        job.pdf_bytes = None
+        self.checkpoints.save_parsed(job.message["paper_id"], job.sections, list(job.images))
+        logger.info(f"PDF 파싱 완료: {job.pdf_url} ({len(tasks)}개 범위, {time.perf_counter() - started:.2f}s)")
+        return True
+
+    @timed("pipeline.analyze")
+    def _analyze(self, job: AnalysisJob) -> bool:
+        message = job.message
+        paper_id = message["paper_id"]
+
+        # 섹션 분석이 끝나는 대로 저장하여 사용자가 완료된 섹션부터 볼 수 있도록 함
+        self.mongo_service.start_paper_progress(paper_id, len(job.sections))
+
+        def save_section(block):
+            # lease를 잃었으면 다른 워커가 이어서 처리하므로 쓰지 않음
+            if block["content"] is not None and not job.lease_lost():
+                self.mongo_service.save_content_block(paper_id, block)
+
+        # 업로드가 끝난 이미지 URL을 체크포인트에 기록
+        uploads = self.runner._submit_image_uploads(job.images, job.uploaded_urls)
+        for key, future in uploads.items():
+            if key not in job.uploaded_urls:
+                future.add_done_callback(lambda f, key=key: self._save_image_checkpoint(paper_id, key, f))
+
+        paper_content = self.runner._analyze_sections(
+            job.sections,
+            job.images,
+            on_section_done=save_section,
+            uploads=uploads,
+            completed_blocks=job.completed_blocks,
+            should_stop=job.lease_lost
+        )
+
+        if job.lease_lost():
+            logger.error(f"작업 lease를 잃어 분석 결과를 저장하지 않고 중단합니다: {paper_id}")
+            job.finish(False)
+            return False
+
+        if not any(block and block["content"] is not None for block in paper_content):
+            logger.error(f"논문 콘텐츠 요약 실패: {paper_id}")
+            self.mongo_service.finish_paper_progress(paper_id, "partial")
+            job.finish(False)
+            return False
+
+        # 실패한 섹션이 있으면 partial로 남겨 다음 요청에서 누락된 섹션만 다시 저장되도록 함
+        completed = all(block["content"] is not None for block in paper_content)
+        self.mongo_service.finish_paper_progress(paper_id, "completed" if completed else "partial")
+        if completed:
+            self.checkpoints.clear(paper_id)
+        self.mongo_service.save_user_library(message["user_id"], paper_id)
+        logger.info(
+            f"논문 콘텐츠 요약 정보 저장 완료: {paper_id} "
+            f"({time.perf_counter() - job.enqueued_at:.2f}s, {'completed' if completed else 'partial'})"
+        )
+
+        # 분석 중에 대기자로 등록된 다른 요청자들의 라이브러리에도 추가
+        # (partial이면 대기자/다음 요청이 누락된 섹션을 다시 분석할 수 있도록 상태를 구분)
+        job_doc = job.lease.release("completed" if completed else "partial")
+        job.lease = None
+        for user_id in (job_doc or {}).get("waiters", []):
+            if user_id != message["user_id"]:
+                self.mongo_service.save_user_library(user_id, paper_id)
+
+        job.finish(True)
+        return False
+
+    def _save_image_checkpoint(self, paper_id: str, image_key: str, future: Future):
+        if future.exception() is None:
+            self.checkpoints.save_image_url(paper_id, image_key, future.result())
+
+    def _attach_to_running_job(self, job: AnalysisJob):
+        """
+        다른 워커가 실행 중인 분석 작업에 대기자로 등록합니다.
+        작업이 끝나면 소유자가 대기자들의 라이브러리에 추가하고, 실패하면 대기자가 작업을 이어받습니다.
+        """
+        message = job.message
+        job_doc = self.mongo_service.add_job_waiter(f"analysis:{message['paper_id']}", message["user_id"])
+
+        if job_doc and job_doc.get("status") == "running":
+            logger.info(f"실행 중인 분석 작업에 대기자로 등록: {message['paper_id']} (user: {message['user_id']})")
+            with self._waiters_lock:
+                self._waiters.append(job)
+            return
+
+        # 등록 시점에 작업이 이미 끝난 경우 결과를 직접 확인
+        paper_data = self.mongo_service.find_by_id(message["paper_id"])
+        if is_analysis_completed(paper_data):
+            self.mongo_service.save_user_library(message["user_id"], message["paper_id"])
+            job.finish(True)
+        else:
+            # 작업이 실패한 경우: 대기자 스레드에서 이어받음 (다운로드 스레드가 자기 큐에 넣다가 막히지 않도록)
+            with self._waiters_lock:
+                self._waiters.append(job)
+
+    def _watch_waiters(self):
+        """대기 중인 작업의 상태를 주기적으로 확인하여, 끝난 작업의 대기자를 완료하거나 작업을 이어받습니다."""
+        while True:
+            time.sleep(self.waiter_poll_seconds)
+            with self._waiters_lock:
+                waiters, self._waiters = self._waiters, []
+
+            still_waiting = []
+            for job in waiters:
+                try:
+                    status = self._running_job_status(f"analysis:{job.message['paper_id']}")
+                    if status == "running":
+                        still_waiting.append(job)
+                    elif status in ("completed", "partial"):
+                        # 소유자가 release 시 대기자 라이브러리에 추가하지만, release 이후에 등록된 대기자를 위해 다시 저장 (upsert)
+                        logger.info(f"대기 중이던 분석 작업 완료: {job.message['paper_id']} ({status})")
+                        self.mongo_service.save_user_library(job.message["user_id"], job.message["paper_id"])
+                        job.finish(True)
+                    else:
+                        self._take_over(job)
+                except Exception as e:
+                    logger.error(f"분석 작업 대기 처리 중 오류 발생: {job.message.get('paper_id')} - {e}")
+                    still_waiting.append(job)
+
+            with self._waiters_lock:
+                self._waiters.extend(still_waiting)
+
+    def _running_job_status(self, job_key: str) -> str:
+        """작업 상태를 반환합니다. lease가 만료된 running 작업(소유자 종료)은 expired로 반환합니다."""
+        job_doc = self.mongo_service.find_job(job_key)
+        if not job_doc:
+            return "missing"
+        status = job_doc.get("status")
+        expires_at = job_doc.get("leaseExpiresAt")
+        if status == "running" and expires_at and expires_at < datetime.utcnow():
+            return "expired"
+        return status
+
+    def _take_over(self, job: AnalysisJob):
+        """다른 워커의 작업이 실패/중단된 경우 대기자가 파이프라인에 다시 넣어 lease 선점을 시도합니다."""
+        if job.takeovers >= self.max_takeovers:
+            logger.error(f"다른 워커의 분석 작업이 실패함 (이어받기 {job.takeovers}회 초과): {job.message['paper_id']}")
+            job.finish(False)
+            return
+
+        job.takeovers += 1
+        logger.warning(f"다른 워커의 분석 작업이 끝나지 않아 이어받습니다: {job.message['paper_id']} ({job.takeovers}회)")
+        self.download_stage.put(job)
@@ -1,3 +1,6 @@
+from typing import Dict, List
+
+
 
 
 def create_system_summary_prompt() -> str:
@@ -55,8 +58,41 @@ def create_summary_user_prompt(abstract: str, title: str = "") -> str:
 Based on the instructions above, provide a structured Korean summary with 3-5 bullet points following the problem → method → results framework. Each bullet point must be exactly one sentence in Korean, preserving English technical terminology where appropriate."""
 
 
+def create_batch_summary_user_prompt(papers: List[Dict[str, str]]) -> str:
+    """여러 논문의 초록을 한 번에 요약하는 프롬프트 (응답: arXiv ID -> 요약 JSON 객체)"""
+    paper_blocks = "\n\n".join(
+        f"""### {paper["arxiv_id"]}
+
+**Paper Title**: {paper["title"]}
+
+**Abstract**: {paper["abstract"]}""" for paper in papers
+    )
+    paper_ids = ", ".join(f'"{paper["arxiv_id"]}"' for paper in papers)
+
+    return f"""Please analyze each of the following {len(papers)} computer science research papers and provide a structured summary for each one independently.
+
+{paper_blocks}
+
+Based on the instructions above, write a structured Korean summary with 3-5 bullet points following the problem → method → results framework for EACH paper. Each bullet point must be exactly one sentence in Korean, preserving English technical terminology where appropriate. Do not mix content between papers.
+
+### OUTPUT FORMAT
+
+Respond with a single JSON object only, without code fences or any other text.
+- Keys: the arXiv IDs exactly as given ({paper_ids})
+- Values: the summary as a single string, one bullet point (starting with "•") per line separated by "\\n"
+"""
+
+
+
+def create_analyze_paper_content_prompt(content: str, has_image_placeholders: bool = False) -> str:
+    # 여러 텍스트 조각을 합친 청크는 사이의 그림 위치를 <<IMG_n>> 자리표시자로 표시함
+    image_placeholder_note = """
+**Image Placeholders:**
+- The content contains image placeholders such as <<IMG_1>>, <<IMG_2>> marking where figures appear
+- Output every placeholder exactly once, unchanged, on its own line, at the position matching the surrounding content
+- Do NOT translate, describe, renumber, or remove placeholders
+""" if has_image_placeholders else ""
 
-def create_analyze_paper_content_prompt(content: str) -> str:
     return f"""
 As an expert academic translator and research analyst specializing in scholarly content processing, your task is to translate and systematically organize academic paper content from any language into Korean.
 
@@ -94,7 +130,7 @@ You are required to process academic paper content with precision and scholarly
 - Translate ALL table content to Korean while preserving the table structure
 - Do NOT convert tables into bullet points
 - Keep table headers, rows, and columns in their original markdown format but with Korean content
-
+{image_placeholder_note}
 **Output Format:**
 - Provide your response directly in markdown format using bullet points only
 - Use bullet points for organized content presentation
@@ -0,0 +1,197 @@
+"""
+작업 스케줄러 모듈
+
+큐(작업 클래스)별 전용 워커 예산, 공유 워커의 strict/weighted 우선순위,
+클래스 내 사용자별 라운드로빈 공정성을 제공하고 큐 깊이/대기 시간을 집계하여
+Prometheus 메트릭(curatify_scheduler_*)으로 노출합니다.
+
+Author: Minseok kim
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from metrics import SCHEDULER_OLDEST_WAIT, SCHEDULER_QUEUE_DEPTH, SCHEDULER_RUNNING, SCHEDULER_WAIT
+
+logger = logging.getLogger(__name__)
+
+
+class _Task:
+    """스케줄러 대기열의 작업"""
+
+    def __init__(self, job_class: str, fn: Callable[..., Any], args: tuple):
+        self.job_class = job_class
+        self.fn = fn
+        self.args = args
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class _ClassQueue:
+    """작업 클래스 하나의 사용자별 대기열과 통계"""
+
+    def __init__(self, job_class: str):
+        self.users: "OrderedDict[str, Deque[_Task]]" = OrderedDict()
+        self.depth = 0
+        self.running = 0
+        self.completed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.depth_gauge = SCHEDULER_QUEUE_DEPTH.labels(job_class)
+        self.running_gauge = SCHEDULER_RUNNING.labels(job_class)
+        self.wait_histogram = SCHEDULER_WAIT.labels(job_class)
+
+    def push(self, user_id: str, task: _Task):
+        self.users.setdefault(user_id, deque()).append(task)
+        self.depth += 1
+        self.depth_gauge.inc()
+
+    def pop(self) -> _Task:
+        # 가장 앞의 사용자에게서 하나를 꺼내고, 남은 작업이 있으면 맨 뒤로 보냄 (라운드로빈)
+        user_id, tasks = next(iter(self.users.items()))
+        task = tasks.popleft()
+        del self.users[user_id]
+        if tasks:
+            self.users[user_id] = tasks
+        self.depth -= 1
+        self.depth_gauge.dec()
+        return task
+
+    def oldest_wait(self, now: float) -> float:
+        return max((now - tasks[0].enqueued_at for tasks in self.users.values()), default=0.0)
+
+
+class JobScheduler:
+    """작업 클래스별 워커 예산과 우선순위를 적용하는 스케줄러"""
+
+    def __init__(
+        self,
+        budgets: Dict[str, int],
+        shared_workers: int = 0,
+        policy: str = "strict",
+        weights: Optional[Dict[str, int]] = None
+    ):
+        """
+        스케줄러 초기화
+
+        Args:
+            budgets: 작업 클래스 -> 전용 워커 수 (딕셔너리 순서가 우선순위 순서)
+            shared_workers: 모든 클래스를 처리할 수 있는 공유 워커 수
+            policy: 공유 워커의 클래스 선택 정책 ("strict" 또는 "weighted")
+            weights: weighted 정책의 클래스별 가중치 (기본값: 모두 1)
+        """
+        if policy not in ("strict", "weighted"):
+            raise ValueError(f"지원되지 않는 스케줄링 정책입니다: {policy}")
+
+        self.priority: List[str] = list(budgets)
+        self.policy = policy
+        self.weights = {job_class: (weights or {}).get(job_class, 1) for job_class in self.priority}
+        self._current_weights = {job_class: 0 for job_class in self.priority}
+        self._queues = {job_class: _ClassQueue(job_class) for job_class in self.priority}
+        self._cond = threading.Condition()
+        for job_class in self.priority:
+            SCHEDULER_OLDEST_WAIT.labels(job_class).set_function(
+                lambda job_class=job_class: self._oldest_wait(job_class)
+            )
+
+        for job_class, count in budgets.items():
+            for i in range(count):
+                threading.Thread(target=self._run, args=([job_class],), name=f"sched-{job_class}-{i}", daemon=True).start()
+        for i in range(shared_workers):
+            threading.Thread(target=self._run, args=(None,), name=f"sched-shared-{i}", daemon=True).start()
+
+    def submit(self, job_class: str, user_id: str, fn: Callable[..., Any], *args) -> Future:
+        """
+        작업을 제출합니다.
+
+        Args:
+            job_class: 작업 클래스 (예: "paper:abstract")
+            user_id: 요청 사용자 ID (클래스 내 공정성 단위)
+            fn: 실행할 함수
+            *args: 함수 인자
+
+        Returns:
+            Future: 함수 반환값이 설정되는 Future
+        """
+        task = _Task(job_class, fn, args)
+        with self._cond:
+            self._queues[job_class].push(user_id, task)
+            self._cond.notify_all()
+        return task.future
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """클래스별 큐 깊이, 실행 수, 대기 시간 통계를 반환합니다."""
+        now = time.monotonic()
+        with self._cond:
+            return {
+                job_class: {
+                    "depth": q.depth,
+                    "running": q.running,
+                    "completed": q.completed,
+                    "avg_wait_seconds": q.wait_total / q.completed if q.completed else 0.0,
+                    "max_wait_seconds": q.wait_max,
+                    "oldest_wait_seconds": q.oldest_wait(now)
+                }
+                for job_class, q in self._queues.items()
+            }
+
+    def _oldest_wait(self, job_class: str) -> float:
+        with self._cond:
+            return self._queues[job_class].oldest_wait(time.monotonic())
+
+    def _select(self, classes: Optional[List[str]]) -> Optional[str]:
+        """실행할 작업 클래스를 선택합니다. (lock 보유 상태에서 호출)"""
+        candidates = [c for c in (classes or self.priority) if self._queues[c].depth]
+        if not candidates:
+            return None
+        if classes is not None or self.policy == "strict":
+            return candidates[0]
+
+        # smooth weighted round-robin
+        total = sum(self.weights[c] for c in candidates)
+        for c in candidates:
+            self._current_weights[c] += self.weights[c]
+        selected = max(candidates, key=lambda c: self._current_weights[c])
+        self._current_weights[selected] -= total
+        return selected
+
+    def _run(self, classes: Optional[List[str]]):
+        while True:
+            with self._cond:
+                job_class = self._select(classes)
+                while job_class is None:
+                    self._cond.wait()
+                    job_class = self._select(classes)
+
+                q = self._queues[job_class]
+                task = q.pop()
+                wait = time.monotonic() - task.enqueued_at
+                q.running += 1
+                q.running_gauge.inc()
+            q.wait_histogram.observe(wait)
+
+            if task.future.set_running_or_notify_cancel():
+                try:
+                    task.future.set_result(task.fn(*task.args))
+                except Exception as e:
+                    logger.error(f"스케줄러 작업 실행 중 오류 발생 ({job_class}): {e}")
+                    task.future.set_exception(e)
+
+            with self._cond:
+                q.running -= 1
+                q.running_gauge.dec()
+                q.completed += 1
+                q.wait_total += wait
+                q.wait_max = max(q.wait_max, wait)
+
+    def start_stats_logger(self, interval_seconds: float):
+        """주기적으로 큐 통계를 로그로 남깁니다."""
+        def _log():
+            while True:
+                time.sleep(interval_seconds)
+                logger.info(f"스케줄러 상태: {self.stats()}")
+        threading.Thread(target=_log, name="sched-stats", daemon=True).start()
@@ -0,0 +1,262 @@
+"""
+Redis Streams 컨슈머 그룹 모듈
+
+RedisSubscriber(pub/sub)와 같은 subscribe 데코레이터/핸들러 시그니처를 유지하면서
+컨슈머 그룹, 스트림별 동시 처리 수 제한, 배치 XREADGROUP, 처리 성공 후 ACK,
+pending 메시지 회수(XAUTOCLAIM)를 제공합니다.
+
+핸들러는 성공 시 참(True, ObjectId 등) 또는 참으로 완료되는 Future를 반환해야 합니다.
+예외/거짓/None은 실패로 보고 ACK 하지 않으며, 실패한 메시지는 STREAM_RECLAIM_IDLE_MS 이후 회수되어 재처리되고
+STREAM_MAX_DELIVERIES를 넘으면 dead-letter 스트림(<stream>:dead-letter)으로 옮긴 뒤 ACK 합니다.
+처리 중인 메시지는 주기적으로 XCLAIM JUSTID로 idle 시간을 갱신하여 다른 컨슈머가 회수하지 않도록 합니다.
+
+Author: Minseok kim
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+class _StreamWorker:
+    """스트림 하나를 읽고 핸들러를 실행하는 워커"""
+
+    def __init__(self, consumer: "RedisStreamConsumer", stream: str, handler: Callable[[str], object], concurrency: int):
+        self.consumer = consumer
+        self.client = consumer.client
+        self.stream = stream
+        self.handler = handler
+        self.concurrency = concurrency
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"stream-{stream}")
+        # 처리 중인 메시지 ID (idle 시간 갱신/중복 처리 방지용)
+        self._in_flight: Set[str] = set()
+        self._cond = threading.Condition()
+
+    def run(self):
+        self._ensure_group()
+        reclaim_every = max(1, self.consumer.reclaim_interval_ms // max(1, self.consumer.block_ms))
+        # 회수 기준 idle 시간의 1/3 간격으로 처리 중인 메시지의 idle 시간을 갱신
+        refresh_seconds = max(self.consumer.block_ms, self.consumer.reclaim_idle_ms // 3) / 1000
+        refreshed_at = time.monotonic()
+        loops = 0
+
+        while not self.consumer.stopped.is_set():
+            try:
+                if time.monotonic() - refreshed_at >= refresh_seconds:
+                    self._refresh_in_flight()
+                    refreshed_at = time.monotonic()
+
+                free = self._wait_for_slots()
+                if free == 0:
+                    continue
+
+                if loops % reclaim_every == 0:
+                    self._reclaim(free)
+                    free = self._free_slots()
+                loops += 1
+                if free == 0:
+                    continue
+
+                response = self.client.xreadgroup(
+                    self.consumer.group,
+                    self.consumer.consumer_name,
+                    {self.stream: ">"},
+                    count=min(free, self.consumer.batch_size),
+                    block=self.consumer.block_ms
+                )
+                for _, entries in response or []:
+                    for entry_id, fields in entries:
+                        self._dispatch(entry_id, fields)
+            except Exception as e:
+                logger.error(f"스트림 읽기 중 오류 발생 ({self.stream}): {e}")
+                self.consumer.stopped.wait(1)
+
+    def _ensure_group(self):
+        try:
+            self.client.xgroup_create(self.stream, self.consumer.group, id="0", mkstream=True)
+            logger.info(f"컨슈머 그룹 생성: {self.stream} / {self.consumer.group}")
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _free_slots(self) -> int:
+        with self._cond:
+            return self.concurrency - len(self._in_flight)
+
+    def _wait_for_slots(self) -> int:
+        with self._cond:
+            if len(self._in_flight) >= self.concurrency:
+                self._cond.wait(self.consumer.block_ms / 1000)
+            return self.concurrency - len(self._in_flight)
+
+    def _refresh_in_flight(self):
+        """처리 중인 메시지의 idle 시간을 0으로 갱신합니다. (오래 걸리는 분석이 다른 컨슈머에게 회수되지 않도록)"""
+        with self._cond:
+            entry_ids = list(self._in_flight)
+        if entry_ids:
+            # JUSTID: 전달 횟수를 늘리지 않고 소유자/idle 시간만 갱신
+            self.client.xclaim(
+                self.stream, self.consumer.group, self.consumer.consumer_name,
+                min_idle_time=0, message_ids=entry_ids, justid=True
+            )
+
+    def _reclaim(self, count: int):
+        """다른(죽은) 컨슈머가 오래 처리하지 못한 pending 메시지를 가져옵니다."""
+        response = self.client.xautoclaim(
+            self.stream,
+            self.consumer.group,
+            self.consumer.consumer_name,
+            min_idle_time=self.consumer.reclaim_idle_ms,
+            start_id="0-0",
+            count=count
+        )
+        entries: List[Tuple[str, Optional[Dict[str, str]]]] = response[1] if response else []
+        for entry_id, fields in entries:
+            if not fields:
+                # 스트림에서 이미 삭제된 메시지
+                self.client.xack(self.stream, self.consumer.group, entry_id)
+                continue
+
+            with self._cond:
+                if entry_id in self._in_flight:
+                    # 이 컨슈머가 아직 처리 중인 메시지 (idle 시간 갱신 전에 회수된 경우)
+                    continue
+
+            pending = self.client.xpending_range(self.stream, self.consumer.group, min=entry_id, max=entry_id, count=1)
+            deliveries = pending[0]["times_delivered"] if pending else 0
+            if deliveries > self.consumer.max_deliveries:
+                self._dead_letter(entry_id, fields, deliveries)
+                continue
+
+            logger.info(f"pending 메시지 회수: {self.stream} {entry_id} ({deliveries}회)")
+            self._dispatch(entry_id, fields)
+
+    def _dead_letter(self, entry_id: str, fields: Dict[str, str], deliveries: int):
+        """최대 재처리 횟수를 넘은 메시지를 dead-letter 스트림으로 옮기고 ACK 합니다."""
+        dead_letter_stream = f"{self.stream}{self.consumer.dead_letter_suffix}"
+        logger.error(f"최대 재처리 횟수 초과로 dead-letter 이동: {self.stream} {entry_id} ({deliveries}회) -> {dead_letter_stream}")
+        self.client.xadd(dead_letter_stream, {**fields, "source_id": entry_id, "deliveries": deliveries})
+        self.client.xack(self.stream, self.consumer.group, entry_id)
+
+    def _dispatch(self, entry_id: str, fields: Dict[str, str]):
+        with self._cond:
+            self._in_flight.add(entry_id)
+        self.executor.submit(self._handle, entry_id, fields)
+
+    def _handle(self, entry_id: str, fields: Dict[str, str]):
+        try:
+            result = self.handler(fields.get(self.consumer.field, ""))
+        except Exception as e:
+            logger.error(f"스트림 메시지 처리 실패 (ACK 하지 않음): {self.stream} {entry_id} - {e}")
+            self._release(entry_id)
+            return
+
+        # 핸들러가 Future를 반환하면 (파이프라인/워커 풀에 위임) 완료 후 결과가 참일 때만 ACK
+        if isinstance(result, Future):
+            result.add_done_callback(lambda f: self._complete_future(entry_id, f))
+        else:
+            self._complete(entry_id, bool(result))
+
+    def _complete_future(self, entry_id: str, future: Future):
+        """위임한 Future가 끝나면 ACK 여부를 결정합니다. (취소된 Future도 실패로 처리해 in-flight에서 반드시 해제)"""
+        success = not future.cancelled() and future.exception() is None and bool(future.result())
+        self._complete(entry_id, success)
+
+    def _complete(self, entry_id: str, success: bool):
+        try:
+            if success:
+                self.client.xack(self.stream, self.consumer.group, entry_id)
+            else:
+                # pending으로 남겨 STREAM_RECLAIM_IDLE_MS 이후 재처리 (최대 횟수 초과 시 dead-letter)
+                logger.error(f"스트림 메시지 처리 실패 (ACK 하지 않음): {self.stream} {entry_id}")
+        except Exception as e:
+            logger.error(f"스트림 메시지 ACK 실패: {self.stream} {entry_id} - {e}")
+        finally:
+            self._release(entry_id)
+
+    def _release(self, entry_id: str):
+        with self._cond:
+            self._in_flight.discard(entry_id)
+            self._cond.notify()
+
+
+class RedisStreamConsumer:
+    """Redis Streams 컨슈머 그룹 기반 메시지 소비자"""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        client: Optional[redis.Redis] = None,
+        group: Optional[str] = None,
+        consumer_name: Optional[str] = None
+    ):
+        """
+        컨슈머 초기화
+
+        Args:
+            redis_url: Redis 연결 URL
+            username: Redis 사용자 이름
+            password: Redis 비밀번호
+            client: 외부에서 주입할 Redis 클라이언트 (fakeredis 등, decode_responses=True 필요)
+            group: 컨슈머 그룹 이름 (기본값: STREAM_GROUP 환경변수)
+            consumer_name: 컨슈머 이름 (기본값: 호스트명:PID)
+        """
+        self.client = client or redis.Redis.from_url(
+            redis_url, username=username, password=password, decode_responses=True
+        )
+        self.group = group or os.getenv("STREAM_GROUP", "curatify-background")
+        self.consumer_name = consumer_name or f"{socket.gethostname()}:{os.getpid()}"
+        self.field = os.getenv("STREAM_MESSAGE_FIELD", "data")
+        self.batch_size = int(os.getenv("STREAM_BATCH_SIZE", "16"))
+        self.block_ms = int(os.getenv("STREAM_BLOCK_MS", "1000"))
+        self.reclaim_idle_ms = int(os.getenv("STREAM_RECLAIM_IDLE_MS", "300000"))
+        self.reclaim_interval_ms = int(os.getenv("STREAM_RECLAIM_INTERVAL_MS", "30000"))
+        self.max_deliveries = int(os.getenv("STREAM_MAX_DELIVERIES", "5"))
+        self.dead_letter_suffix = os.getenv("STREAM_DEAD_LETTER_SUFFIX", ":dead-letter")
+
+        self.stopped = threading.Event()
+        self._workers: Dict[str, _StreamWorker] = {}
+
+    def subscribe(self, stream: str, concurrency: Optional[int] = None):
+        """
+        스트림 핸들러를 등록하는 데코레이터입니다.
+
+        Args:
+            stream: 스트림 이름 (예: "paper:abstract")
+            concurrency: 동시 처리 수 (기본값: STREAM_CONCURRENCY_<STREAM> 환경변수, 없으면 STREAM_CONCURRENCY)
+        """
+        if concurrency is None:
+            env_name = "STREAM_CONCURRENCY_" + "".join(c if c.isalnum() else "_" for c in stream).upper()
+            concurrency = int(os.getenv(env_name, os.getenv("STREAM_CONCURRENCY", "4")))
+
+        def decorator(handler: Callable[[str], object]):
+            self._workers[stream] = _StreamWorker(self, stream, handler, concurrency)
+            return handler
+        return decorator
+
+    def start(self):
+        """등록된 모든 스트림의 소비를 시작하고, stop() 호출 전까지 대기합니다."""
+        threads = [
+            threading.Thread(target=worker.run, name=f"stream-reader-{stream}", daemon=True)
+            for stream, worker in self._workers.items()
+        ]
+        for thread in threads:
+            thread.start()
+        logger.info(f"Redis Streams 소비 시작: {list(self._workers)} (group: {self.group}, consumer: {self.consumer_name})")
+
+        for thread in threads:
+            thread.join()
+
+    def stop(self):
+        """소비를 중지합니다."""
+        self.stopped.set()
@@ -0,0 +1,12 @@
+"""
+테스트 공통 설정: 저장소 루트의 모듈(llm_cache, scheduler 등)을 import 할 수 있도록 경로를 추가합니다.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# file_service 는 import 시 OCI 설정을 확인하므로 테스트용 값을 채움 (실제 업로드는 하지 않음)
+for _name in ("OCI_NAMESPACE", "OCI_ACCESS_KEY", "OCI_SECRET_KEY", "OCI_BUCKET"):
+    os.environ.setdefault(_name, "test")
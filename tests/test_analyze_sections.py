@@ -0,0 +1,57 @@
+import asyncio
+import gc
+
+from arxiv_runner import ArXivRunner
+
+
+def _runner(analyze_chunk):
+    runner = object.__new__(ArXivRunner)
+    runner._pack_chunks = lambda content: [{"type": "text", "content": text} for text in content]
+    runner._aanalyze_chunk = analyze_chunk
+    return runner
+
+
+def test_cancelling_analysis_cancels_pending_chunk_calls():
+    started, cancelled = [], []
+
+    async def analyze_chunk(chunk):
+        started.append(chunk["content"])
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(chunk["content"])
+            raise
+
+    async def scenario():
+        runner = _runner(analyze_chunk)
+        task = asyncio.ensure_future(runner._aanalyze_sections([{"title": "1", "chunks": ["a", "b", "c"]}], {}))
+        while len(started) < 3:
+            await asyncio.sleep(0)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.sleep(0.05)
+        # asyncio.run 종료 시의 일괄 취소 전에 확인
+        return sorted(cancelled)
+
+    assert asyncio.run(scenario()) == ["a", "b", "c"]
+
+
+def test_failed_sibling_chunks_do_not_leak_task_exceptions():
+    unretrieved = []
+
+    async def analyze_chunk(chunk):
+        await asyncio.sleep(0.01 if chunk["content"] == "a" else 0)
+        raise ValueError(chunk["content"])
+
+    async def scenario():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unretrieved.append(context))
+        results = await _runner(analyze_chunk)._aanalyze_sections([{"title": "1", "chunks": ["a", "b", "c"]}], {})
+        await asyncio.sleep(0.05)
+        gc.collect()
+        return results
+
+    assert asyncio.run(scenario()) == [{"order": 1, "contentTitle": "1", "content": None}]
+    assert unretrieved == []
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from utils.batcher import MicroBatcher
+from utils.ttl_cache import TTLCache
+
+
+def test_requests_within_window_are_batched_and_deduplicated():
+    calls = []
+
+    def batch_fn(keys):
+        calls.append(list(keys))
+        return {key: key.upper() for key in keys}
+
+    batcher = MicroBatcher(batch_fn, window_seconds=0.2, max_batch_size=10)
+    futures = [batcher.submit(key) for key in ("a", "b", "a", "c")]
+
+    assert [future.result(timeout=2) for future in futures] == ["A", "B", "A", "C"]
+    assert calls == [["a", "b", "c"]]
+
+
+def test_full_batch_is_dispatched_without_waiting_for_window():
+    batcher = MicroBatcher(lambda keys: {key: len(keys) for key in keys}, window_seconds=10, max_batch_size=2)
+
+    started = time.monotonic()
+    futures = [batcher.submit(key) for key in ("a", "b")]
+    assert [future.result(timeout=2) for future in futures] == [2, 2]
+    assert time.monotonic() - started < 5
+
+
+def test_missing_keys_resolve_to_none_and_errors_propagate():
+    batcher = MicroBatcher(lambda keys: {}, window_seconds=0.01, max_batch_size=10)
+    assert batcher.get("missing", timeout=2) is None
+
+    def failing(keys):
+        raise RuntimeError("boom")
+
+    failing_batcher = MicroBatcher(failing, window_seconds=0.01, max_batch_size=10)
+    with pytest.raises(RuntimeError):
+        failing_batcher.get("a", timeout=2)
+
+
+def test_concurrent_batches_do_not_wait_for_slow_batch():
+    release = threading.Event()
+
+    def batch_fn(keys):
+        if "slow" in keys:
+            release.wait(5)
+        return {key: key for key in keys}
+
+    batcher = MicroBatcher(batch_fn, window_seconds=0.01, max_batch_size=1, max_concurrent_batches=2)
+    slow = batcher.submit("slow")
+    assert batcher.get("fast", timeout=2) == "fast"
+    assert not slow.done()
+    release.set()
+    assert slow.result(timeout=2) == "slow"
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("utils.ttl_cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(ttl_seconds=10, max_size=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    now[0] += 11
+    assert cache.get("a") is None
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from checkpoint_store import CheckpointStore
+
+
+class _FakeMongo:
+    def __init__(self, checkpoint=None):
+        self.checkpoint = checkpoint
+
+    def find_analysis_checkpoint(self, paper_id):
+        return self.checkpoint
+
+    def save_analysis_checkpoint(self, paper_id, sections, image_keys):
+        self.checkpoint = {"_id": paper_id, "sections": sections, "imageKeys": image_keys, "imageUrls": []}
+        return True
+
+
+def test_parsed_sections_round_trip(tmp_path):
+    mongo = _FakeMongo()
+    store = CheckpointStore(mongo, directory=str(tmp_path))
+    sections = [{"title": "1 Intro", "chunks": [{"type": "text", "content": "a"}]}]
+
+    store.save_parsed("p", sections, ["picture-1.png"])
+    mongo.checkpoint["imageUrls"] = [{"key": "picture-1.png", "url": "https://example/1.png"}]
+
+    assert store.load_parsed("p") == (sections, {"picture-1.png": "https://example/1.png"}, ["picture-1.png"])
+
+
+@pytest.mark.parametrize("raw", [
+    "{not json",
+    json.dumps([["1 Intro", "legacy markdown body"]]),
+    json.dumps({"title": "x"}),
+    json.dumps([{"title": "x"}]),
+])
+def test_corrupt_or_legacy_checkpoint_falls_back_to_fresh_parse(tmp_path, raw):
+    store = CheckpointStore(_FakeMongo({"_id": "p", "sections": raw}), directory=str(tmp_path))
+
+    assert store.load_parsed("p") == (None, {}, [])
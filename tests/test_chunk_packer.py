@@ -0,0 +1,61 @@
+from utils.chunk_packer import pack_chunks, restore_image_placeholders, split_oversized
+
+
+def _words(text: str) -> int:
+    return len(text.split())
+
+
+def _text(content):
+    return {"type": "text", "content": content}
+
+
+def _img(key):
+    return {"type": "img", "content": key}
+
+
+def test_split_falls_back_to_whitespace_before_characters():
+    assert split_oversized("f g h i j k", 3, _words) == ["f g h ", "i j k"]
+
+
+def test_split_pieces_concatenate_to_original_text():
+    text = "a b c\n\nd e. f g h i\nj k l m n o p"
+    pieces = split_oversized(text, 3, _words)
+
+    assert "".join(pieces) == text
+    assert all(_words(piece) <= 3 for piece in pieces)
+
+
+def test_split_without_boundaries_cuts_characters():
+    pieces = split_oversized("x" * 40, 3, lambda text: (len(text) + 3) // 4)
+
+    assert "".join(pieces) == "x" * 40
+    assert all(len(piece) <= 12 for piece in pieces)
+
+
+def test_oversized_chunk_is_not_rejoined_with_separators():
+    packed = pack_chunks([_text("f g h i j k")], 3, _words)
+
+    assert [chunk["content"] for chunk in packed] == ["f g h ", "i j k"]
+
+
+def test_small_chunks_are_packed_with_image_placeholders():
+    packed = pack_chunks([_text("a b"), _img("picture-1.png"), _text("c d")], 20, _words)
+
+    assert packed == [{"type": "text", "content": "a b\n\n<<IMG_1>>\n\nc d", "images": ["picture-1.png"], "tokens": 5}]
+
+
+def test_placeholder_tokens_count_toward_budget():
+    # "a b" + "<<IMG_1>>" + "c d" = 5 단어: 예산 4이면 합치지 않고 이미지를 원래 위치에 둠
+    packed = pack_chunks([_text("a b"), _img("picture-1.png"), _text("c d")], 4, _words)
+
+    assert packed == [
+        {"type": "text", "content": "a b", "images": [], "tokens": 2},
+        _img("picture-1.png"),
+        {"type": "text", "content": "c d", "images": [], "tokens": 2},
+    ]
+
+
+def test_restore_image_placeholders_appends_missing_images():
+    restored = restore_image_placeholders("x <<IMG_2>> y <<IMG_9>>", ["![](1)", "![](2)"])
+
+    assert restored == "x \n![](2)\n y \n\n![](1)\n"
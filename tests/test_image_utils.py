@@ -0,0 +1,46 @@
+from io import BytesIO
+
+from PIL import Image
+
+from utils.image_utils import optimize_image
+
+
+def _chart_png(size=(400, 300)) -> bytes:
+    image = Image.new("RGB", size, "white")
+    for x in range(0, size[0], 40):
+        for y in range(size[1]):
+            image.putpixel((x, y), (x % 256, 0, 255 - x % 256))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", compress_level=0)
+    return buffer.getvalue()
+
+
+def _pixels(data: bytes):
+    return Image.open(BytesIO(data)).convert("RGB").tobytes()
+
+
+def test_png_is_reencoded_losslessly_by_default(monkeypatch):
+    monkeypatch.setenv("IMAGE_MAX_DIM", "0")
+    monkeypatch.delenv("IMAGE_PNG_PALETTE", raising=False)
+    data = _chart_png()
+
+    optimized, extension = optimize_image(data, ".png")
+
+    assert extension == ".png"
+    assert len(optimized) < len(data)
+    assert Image.open(BytesIO(optimized)).mode == "RGB"
+    assert _pixels(optimized) == _pixels(data)
+
+
+def test_palette_quantization_is_opt_in(monkeypatch):
+    monkeypatch.setenv("IMAGE_MAX_DIM", "0")
+    monkeypatch.setenv("IMAGE_PNG_PALETTE", "true")
+
+    optimized, extension = optimize_image(_chart_png(), ".png")
+
+    assert extension == ".png"
+    assert Image.open(BytesIO(optimized)).mode == "P"
+
+
+def test_non_raster_files_are_uploaded_as_is():
+    assert optimize_image(b"<svg/>", ".svg") == (b"<svg/>", ".svg")
@@ -0,0 +1,120 @@
+import time
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+import mongo_service
+from job_lease import JobLease
+from mongo_service import MongoService
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    monkeypatch.setenv("MONGODB_URL", "mongodb://localhost")
+    monkeypatch.setenv("MONGODB_DATABASE", "curatify_test")
+    monkeypatch.setenv("MONGODB_STARTUP_CHECK", "true")
+    monkeypatch.setattr(mongo_service, "MongoClient", mongomock.MongoClient)
+    return MongoService()
+
+
+class _FlakyRenewService:
+    """renew_job_lease가 정해진 결과를 차례로 반환하는 MongoService 대역"""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.renewals = 0
+        self.released = []
+
+    def claim_job(self, job_key, owner, lease_seconds):
+        return True
+
+    def renew_job_lease(self, job_key, owner, lease_seconds):
+        self.renewals += 1
+        return self.results.pop(0) if self.results else True
+
+    def release_job(self, job_key, owner, status):
+        self.released.append(status)
+        return {"status": status, "waiters": []}
+
+
+def _wait_until(predicate, timeout: float = 3.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_only_one_owner_can_claim_a_running_job(mongo):
+    first = JobLease(mongo, "analysis:p1", lease_seconds=60)
+    second = JobLease(mongo, "analysis:p1", lease_seconds=60)
+
+    assert first.acquire()
+    assert not second.acquire()
+
+    job_doc = first.release("failed")
+    assert job_doc["status"] == "failed"
+    assert second.acquire()
+    second.release("completed")
+
+
+def test_expired_lease_can_be_claimed_and_old_owner_loses_it(mongo):
+    first = JobLease(mongo, "analysis:p2", lease_seconds=60)
+    assert first.acquire()
+    first._stop.set()
+    mongo.job_collection.update_one(
+        {"_id": "analysis:p2"}, {"$set": {"leaseExpiresAt": datetime.utcnow() - timedelta(seconds=1)}}
+    )
+
+    second = JobLease(mongo, "analysis:p2", lease_seconds=60)
+    assert second.acquire()
+    assert mongo.renew_job_lease("analysis:p2", first.owner, 60) is False
+    assert mongo.release_job("analysis:p2", first.owner, "failed") is None
+    second.release("completed")
+
+
+def test_waiters_are_returned_on_release(mongo):
+    lease = JobLease(mongo, "analysis:p3", lease_seconds=60)
+    assert lease.acquire()
+    mongo.add_job_waiter("analysis:p3", "user-a")
+    mongo.add_job_waiter("analysis:p3", "user-a")
+    mongo.add_job_waiter("analysis:p3", "user-b")
+
+    job_doc = lease.release("partial")
+    assert job_doc["status"] == "partial"
+    assert job_doc["waiters"] == ["user-a", "user-b"]
+
+
+def test_heartbeat_retries_transient_errors():
+    service = _FlakyRenewService([None, None, True])
+    lease = JobLease(service, "analysis:p4", lease_seconds=1)
+    assert lease.acquire()
+
+    assert _wait_until(lambda: service.renewals >= 4)
+    assert not lease.lost
+    lease.release("completed")
+    assert service.released == ["completed"]
+
+
+def test_heartbeat_marks_lost_when_errors_outlast_the_lease():
+    service = _FlakyRenewService([None] * 1000)
+    lease = JobLease(service, "analysis:p5", lease_seconds=1)
+    assert lease.acquire()
+
+    time.sleep(0.5)
+    assert not lease.lost
+    assert _wait_until(lambda: lease.lost)
+    # lease를 잃은 작업은 종료 상태를 기록하지 않음
+    assert lease.release("completed") is None
+    assert service.released == []
+
+
+def test_heartbeat_marks_lost_when_another_owner_took_over():
+    service = _FlakyRenewService([False])
+    lease = JobLease(service, "analysis:p6", lease_seconds=1)
+    assert lease.acquire()
+
+    assert _wait_until(lambda: lease.lost)
+    assert service.renewals == 1
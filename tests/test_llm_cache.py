@@ -0,0 +1,127 @@
+import asyncio
+
+import llm_cache
+from llm_cache import LLMCache
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+class _RemoteTier:
+    def __init__(self):
+        self.items = {}
+
+    def find_llm_response(self, key):
+        return self.items.get(key, (None,))[0]
+
+    def save_llm_response(self, key, model, value, ttl_seconds):
+        self.items[key] = (value, model, ttl_seconds)
+
+
+class _AsyncRemoteTier(_RemoteTier):
+    async def find_llm_response(self, key):
+        return super().find_llm_response(key)
+
+    async def save_llm_response(self, key, model, value, ttl_seconds):
+        super().save_llm_response(key, model, value, ttl_seconds)
+
+
+def _cache(tmp_path, **kwargs) -> LLMCache:
+    return LLMCache(path=str(tmp_path / "cache.sqlite3"), enabled=True, **kwargs)
+
+
+def test_make_key_depends_on_model_and_prompt():
+    messages = [{"role": "user", "content": "hello"}]
+    assert LLMCache.make_key("a", messages) == LLMCache.make_key("a", [{"content": "hello", "role": "user"}])
+    assert LLMCache.make_key("a", messages) != LLMCache.make_key("b", messages)
+    assert LLMCache.make_key("a", "x") != LLMCache.make_key("a", "y")
+
+
+def test_get_returns_value_until_ttl_expires(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(llm_cache.time, "time", clock.time)
+    cache = _cache(tmp_path, ttl_seconds=60)
+
+    cache.set("k", "v")
+    clock.now += 60
+    assert cache.get("k") == "v"
+    clock.now += 1
+    assert cache.get("k") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used_entries(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(llm_cache.time, "time", clock.time)
+    monkeypatch.setattr(LLMCache, "EVICT_INTERVAL", 1)
+    cache = _cache(tmp_path, ttl_seconds=3600, max_entries=2)
+
+    cache.set("a", "1")
+    clock.now += 1
+    cache.set("b", "2")
+    clock.now += 1
+    # a를 사용하여 b가 가장 오래 사용되지 않은 항목이 됨
+    assert cache.get("a") == "1"
+    clock.now += 1
+    cache.set("c", "3")
+
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+
+def test_eviction_removes_expired_entries(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(llm_cache.time, "time", clock.time)
+    monkeypatch.setattr(LLMCache, "EVICT_INTERVAL", 1)
+    cache = _cache(tmp_path, ttl_seconds=10)
+
+    cache.set("old", "1")
+    clock.now += 11
+    cache.set("new", "2")
+
+    count = cache._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+    assert count == 1
+
+
+def test_remote_tier_fills_local_cache(tmp_path):
+    remote = _RemoteTier()
+    cache = _cache(tmp_path, ttl_seconds=60)
+    cache.set_remote_tier(remote)
+
+    cache.set("k", "v", "model-a")
+    assert remote.items["k"] == ("v", "model-a", 60)
+
+    remote.items["other"] = ("remote-value", "model-a", 60)
+    assert cache.get("other") == "remote-value"
+    cache.set_remote_tier(None)
+    assert cache.get("other") == "remote-value"
+
+
+def test_async_remote_tier_is_awaited(tmp_path):
+    remote = _AsyncRemoteTier()
+    cache = _cache(tmp_path, ttl_seconds=60)
+    cache.set_remote_tier(remote)
+
+    async def scenario():
+        await cache.aset("k", "v", "model-a")
+        remote.items["other"] = ("remote-value", "model-a", 60)
+        return await cache.aget("k"), await cache.aget("other"), await cache.aget("missing")
+
+    assert asyncio.run(scenario()) == ("v", "remote-value", None)
+    assert remote.items["k"] == ("v", "model-a", 60)
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = LLMCache(path=str(tmp_path / "cache.sqlite3"), enabled=False)
+    cache.set("k", "v")
+    assert cache.get("k") is None
+    assert not (tmp_path / "cache.sqlite3").exists()
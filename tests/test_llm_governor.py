@@ -0,0 +1,129 @@
+import threading
+
+import fakeredis
+import pytest
+
+import llm_governor
+from llm_governor import LLMGovernor, _LocalBuckets
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class _RateLimitError(Exception):
+    status_code = 429
+
+
+@pytest.fixture(autouse=True)
+def governor_env(monkeypatch):
+    monkeypatch.setenv("LLM_GOVERNOR_ENABLED", "true")
+    monkeypatch.setenv("LLM_GOVERNOR_REDIS", "false")
+    monkeypatch.setenv("LLM_AIMD_COOLDOWN_SECONDS", "0")
+    monkeypatch.delenv("LLM_INITIAL_CONCURRENCY", raising=False)
+
+
+def test_local_bucket_waits_until_refilled(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(llm_governor.time, "monotonic", clock.monotonic)
+    buckets = _LocalBuckets()
+    rpm = [("m:rpm", 2, 1)]
+
+    assert buckets.take(rpm) == 0
+    assert buckets.take(rpm) == 0
+    assert buckets.take(rpm) == pytest.approx(30)
+
+    clock.now += 30
+    assert buckets.take(rpm) == 0
+
+
+def test_forced_take_settles_actual_usage(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(llm_governor.time, "monotonic", clock.monotonic)
+    buckets = _LocalBuckets()
+
+    assert buckets.take([("m:tpm", 100, 80)]) == 0
+    # 실제 사용량이 추정치보다 적으면 환급
+    buckets.take([("m:tpm", 100, -60)], force=True)
+    assert buckets.take([("m:tpm", 100, 70)]) == 0
+
+
+def test_aimd_halves_on_429_and_grows_on_success():
+    governor = LLMGovernor(max_concurrency=8, rpm=0, tpm=0)
+    assert governor.limit == 8
+
+    with pytest.raises(_RateLimitError):
+        with governor.limit_call("prompt", "m"):
+            raise _RateLimitError()
+    assert governor.limit == 4
+    assert governor.in_flight == 0
+
+    for _ in range(4):
+        with governor.limit_call("prompt", "m"):
+            pass
+    assert 4.9 < governor.limit < 5.1
+
+
+def test_concurrency_limit_blocks_until_release():
+    governor = LLMGovernor(max_concurrency=1, rpm=0, tpm=0)
+    entered = threading.Event()
+    release = threading.Event()
+    second_entered = threading.Event()
+
+    def first():
+        with governor.limit_call("a", "m"):
+            entered.set()
+            release.wait(5)
+
+    def second():
+        with governor.limit_call("b", "m"):
+            second_entered.set()
+
+    threading.Thread(target=first, daemon=True).start()
+    assert entered.wait(2)
+    threading.Thread(target=second, daemon=True).start()
+    assert not second_entered.wait(0.2)
+
+    release.set()
+    assert second_entered.wait(2)
+
+
+def test_redis_bucket_is_shared_between_governors():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    first = LLMGovernor(max_concurrency=4, rpm=1, tpm=0, redis_client=client)
+    second = LLMGovernor(max_concurrency=4, rpm=1, tpm=0, redis_client=client)
+
+    assert first._try_acquire(first._new_permit("a", "m")) == 0
+    assert second._try_acquire(second._new_permit("b", "m")) > 0
+    # 버킷이 부족해 허가되지 않은 호출은 동시 호출 자리를 차지하지 않음
+    assert second.in_flight == 0
+
+
+def test_redis_round_trip_does_not_hold_governor_lock():
+    governor = LLMGovernor(max_concurrency=4, rpm=10, tpm=0)
+    in_take = threading.Event()
+    finish_take = threading.Event()
+
+    class _SlowBuckets:
+        def take(self, buckets, force=False):
+            in_take.set()
+            finish_take.wait(5)
+            return 0.0
+
+    governor._redis_buckets = _SlowBuckets()
+    result = []
+    thread = threading.Thread(target=lambda: result.append(governor._try_acquire(governor._new_permit("a", "m"))))
+    thread.start()
+    try:
+        assert in_take.wait(2)
+        assert governor._cond.acquire(timeout=0.5)
+        governor._cond.release()
+    finally:
+        finish_take.set()
+        thread.join(2)
+    assert result == [0.0]
+    assert governor.in_flight == 1
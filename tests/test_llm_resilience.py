@@ -0,0 +1,182 @@
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import openai
+import pytest
+
+from llm_governor import LLMGovernor
+from llm_resilience import LLMCallRunner, _is_retryable
+
+_REQUEST = httpx.Request("POST", "https://api.example/v1/chat/completions")
+
+
+def _status_error(cls, status_code):
+    return cls("error", response=httpx.Response(status_code, request=_REQUEST), body=None)
+
+
+@pytest.fixture(autouse=True)
+def policy_env(monkeypatch):
+    monkeypatch.setenv("LLM_GOVERNOR_ENABLED", "true")
+    monkeypatch.setenv("LLM_GOVERNOR_REDIS", "false")
+    monkeypatch.setenv("LLM_TEST_TIMEOUT_SECONDS", "0.3")
+    monkeypatch.setenv("LLM_TEST_DEADLINE_SECONDS", "5")
+    monkeypatch.setenv("LLM_TEST_MAX_RETRIES", "2")
+    monkeypatch.setenv("LLM_TEST_BACKOFF_BASE_SECONDS", "0")
+    monkeypatch.setenv("LLM_TEST_HEDGE", "false")
+    monkeypatch.setenv("LLM_TEST_HEDGE_INITIAL_DELAY_SECONDS", "0.05")
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (TimeoutError(), True),
+    (asyncio.TimeoutError(), True),
+    (httpx.ReadTimeout("slow", request=_REQUEST), True),
+    (httpx.ConnectError("refused", request=_REQUEST), True),
+    (openai.APITimeoutError(request=_REQUEST), True),
+    (openai.APIConnectionError(request=_REQUEST), True),
+    (_status_error(openai.RateLimitError, 429), True),
+    (_status_error(openai.InternalServerError, 503), True),
+    (_status_error(openai.APIStatusError, 408), True),
+    (_status_error(openai.BadRequestError, 400), False),
+    (_status_error(openai.AuthenticationError, 401), False),
+    (httpx.HTTPStatusError("bad gateway", request=_REQUEST, response=httpx.Response(502, request=_REQUEST)), True),
+    (ValueError("invalid JSON"), False),
+    (KeyError("content"), False),
+    (RuntimeError("bug"), False),
+])
+def test_retry_classification(error, retryable):
+    assert _is_retryable(error) is retryable
+
+
+def _flaky(errors):
+    calls = []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+    return attempt, calls
+
+
+def test_retryable_errors_are_retried():
+    attempt, calls = _flaky([openai.APIConnectionError(request=_REQUEST), _status_error(openai.RateLimitError, 429)])
+
+    assert LLMCallRunner().call("test", attempt) == "ok"
+    assert len(calls) == 3
+
+
+def test_non_retryable_error_is_raised_immediately():
+    attempt, calls = _flaky([ValueError("invalid JSON")])
+
+    with pytest.raises(ValueError):
+        LLMCallRunner().call("test", attempt)
+    assert len(calls) == 1
+
+
+def test_sync_attempt_timeout_is_enforced_and_releases_permit(monkeypatch):
+    monkeypatch.setenv("LLM_TEST_MAX_RETRIES", "0")
+    governor = LLMGovernor(max_concurrency=2, rpm=0, tpm=0)
+    release = threading.Event()
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        LLMCallRunner().call("test", lambda timeout: release.wait(5), governor.limiter("p", "m"))
+    try:
+        assert time.monotonic() - started < 1
+        # 결과를 버린 요청은 아직 실행 중이어도 동시 호출 자리를 차지하지 않음
+        assert governor.in_flight == 0
+    finally:
+        release.set()
+
+
+def test_governor_wait_is_not_counted_in_attempt_timeout_or_latency():
+    governor = LLMGovernor(max_concurrency=1, rpm=0, tpm=0)
+    runner = LLMCallRunner()
+    holder = governor.acquire("p", "m")
+    threading.Timer(0.5, governor.release, args=(holder,)).start()
+
+    # 허가를 0.5초 기다린 뒤 0.1초 걸리는 요청: 시도 타임아웃(0.3초)을 넘기지 않음
+    result = runner.call("test", lambda timeout: time.sleep(0.1) or "ok", governor.limiter("p", "m"))
+
+    assert result == "ok"
+    assert runner.latencies["test"].quantile(0.5, 1) < 0.3
+    assert governor.in_flight == 0
+
+
+def test_hedge_wins_and_abandoned_primary_frees_budget(monkeypatch):
+    monkeypatch.setenv("LLM_TEST_HEDGE", "true")
+    monkeypatch.setenv("LLM_TEST_TIMEOUT_SECONDS", "2")
+    governor = LLMGovernor(max_concurrency=2, rpm=0, tpm=0)
+    calls = []
+    release = threading.Event()
+
+    def attempt(timeout):
+        calls.append(timeout)
+        if len(calls) == 1:
+            release.wait(5)
+            return "primary"
+        return "hedge"
+
+    try:
+        assert LLMCallRunner().call("test", attempt, governor.limiter("p", "m")) == "hedge"
+        assert len(calls) == 2
+        assert governor.in_flight == 0
+    finally:
+        release.set()
+
+
+def test_hedge_is_skipped_without_budget(monkeypatch):
+    monkeypatch.setenv("LLM_TEST_HEDGE", "true")
+    monkeypatch.setenv("LLM_TEST_TIMEOUT_SECONDS", "2")
+    governor = LLMGovernor(max_concurrency=1, rpm=0, tpm=0)
+    calls = []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        time.sleep(0.2)
+        return "primary"
+
+    assert LLMCallRunner().call("test", attempt, governor.limiter("p", "m")) == "primary"
+    assert len(calls) == 1
+
+
+def test_async_timeout_and_hedge_release_permits(monkeypatch):
+    monkeypatch.setenv("LLM_TEST_HEDGE", "true")
+    monkeypatch.setenv("LLM_TEST_MAX_RETRIES", "0")
+    governor = LLMGovernor(max_concurrency=2, rpm=0, tpm=0)
+    calls = []
+
+    async def hedged(timeout):
+        calls.append(timeout)
+        await asyncio.sleep(5 if len(calls) == 1 else 0.01)
+        return len(calls)
+
+    async def hanging(timeout):
+        await asyncio.sleep(5)
+
+    async def scenario():
+        runner = LLMCallRunner()
+        result = await runner.acall("test", hedged, governor.limiter("p", "m"))
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            await runner.acall("test", hanging, governor.limiter("p", "m"))
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(scenario())
+    assert result == 2
+    assert elapsed < 1
+    assert governor.in_flight == 0
+
+
+def test_module_does_not_import_sdks_at_startup():
+    code = "import sys, llm_resilience; print('openai' in sys.modules, 'httpx' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        cwd=Path(__file__).resolve().parent.parent
+    ).stdout
+    assert output.split() == ["False", "False"]
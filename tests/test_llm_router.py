@@ -0,0 +1,101 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from prometheus_client import REGISTRY
+
+import llm_router
+from llm_router import LLMRoute, LLMRouter
+
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    monkeypatch.setattr(llm_router, "count_prompt_tokens", lambda prompt: len(str(prompt).split()))
+    monkeypatch.delenv("LLM_ROUTES", raising=False)
+    monkeypatch.delenv("LLM_ROUTES_FILE", raising=False)
+    monkeypatch.setenv("OPENAI_MODEL", "default-model")
+
+
+def _router():
+    return LLMRouter([
+        LLMRoute("short-chunk", "small-model", prompt_types=["chunk"], max_tokens=5),
+        LLMRoute("long-chunk", "large-model", prompt_types=["chunk"], min_tokens=5),
+        LLMRoute("any-huge", "huge-model", min_tokens=100),
+    ])
+
+
+def test_first_matching_route_wins_with_token_bounds():
+    router = _router()
+
+    assert router.route("one two three four", "chunk").name == "short-chunk"
+    # max_tokens는 미포함, min_tokens는 포함
+    assert router.route("one two three four five", "chunk").name == "long-chunk"
+    assert router.route("word " * 200, "chunk").name == "long-chunk"
+    assert router.route("word " * 200, "abstract").name == "any-huge"
+
+
+def test_explicit_tokens_override_prompt_token_count():
+    router = _router()
+    # 템플릿이 포함된 전체 프롬프트는 길어도 청크 본문의 토큰 수로 라우팅
+    prompt = "template " * 50 + "one two"
+
+    assert router.route(prompt, "chunk").name == "long-chunk"
+    assert router.route(prompt, "chunk", tokens=2).name == "short-chunk"
+
+
+def test_unmatched_prompt_falls_back_to_default_route():
+    router = _router()
+
+    route = router.route("short abstract", "abstract")
+    assert route is router.default_route
+    assert route.model == "default-model"
+    empty = LLMRouter([])
+    assert empty.route("anything", "chunk") is empty.default_route
+
+
+def test_clients_are_created_once_per_route():
+    router = _router()
+    short, long = router.routes[0], router.routes[1]
+
+    assert router.client(short) is router.client(short)
+    assert router.client(short) is not router.client(long)
+    assert router.client(long).model_name == "large-model"
+    assert router.client(long).max_retries == 0
+
+
+def test_routes_are_loaded_from_env_json_and_file(monkeypatch, tmp_path):
+    specs = [{"name": "batch", "prompt_types": ["abstract_batch"], "model": "batch-model"}]
+    monkeypatch.setenv("LLM_ROUTES", json.dumps(specs))
+    assert LLMRouter().route("x", "abstract_batch").model == "batch-model"
+
+    monkeypatch.delenv("LLM_ROUTES")
+    path = tmp_path / "routes.json"
+    path.write_text(json.dumps(specs), encoding="utf-8")
+    monkeypatch.setenv("LLM_ROUTES_FILE", str(path))
+    assert LLMRouter().route("x", "abstract_batch").model == "batch-model"
+
+
+def test_invalid_routes_fail_at_startup(monkeypatch):
+    monkeypatch.setenv("LLM_ROUTES", json.dumps([{"name": "missing-model"}]))
+
+    with pytest.raises(RuntimeError):
+        LLMRouter()
+
+
+def test_record_tracks_requests_and_cost():
+    route = LLMRoute("priced", "priced-model", input_cost_per_1k=1.0, output_cost_per_1k=2.0)
+    response = SimpleNamespace(usage_metadata={"input_tokens": 1000, "output_tokens": 500})
+
+    assert route.cost(response) == pytest.approx(2.0)
+    LLMRouter([route]).record(route, "chunk", 0.5, response)
+
+    assert REGISTRY.get_sample_value(
+        "curatify_llm_route_requests_total", {"route": "priced", "model": "priced-model", "prompt_type": "chunk"}
+    ) == 1
+
+
+def test_candidate_models_ignore_token_bounds_and_include_default():
+    router = _router()
+
+    assert router.candidate_models("chunk") == ["small-model", "large-model", "huge-model", "default-model"]
+    assert router.candidate_models("abstract") == ["huge-model", "default-model"]
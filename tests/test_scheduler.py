@@ -0,0 +1,95 @@
+import threading
+
+from prometheus_client import REGISTRY
+
+from scheduler import JobScheduler
+
+
+def _run_after_blocker(scheduler, blocker_class, submissions):
+    """공유 워커 하나를 blocker 로 붙잡아 둔 뒤 작업을 쌓고, 풀어 준 다음의 실행 순서를 반환합니다."""
+    gate = threading.Event()
+    started = threading.Event()
+    order = []
+
+    def blocker():
+        started.set()
+        gate.wait(5)
+
+    scheduler.submit(blocker_class, "blocker", blocker)
+    assert started.wait(2)
+
+    futures = [
+        scheduler.submit(job_class, user_id, order.append, label)
+        for job_class, user_id, label in submissions
+    ]
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+    return order
+
+
+def test_users_are_served_round_robin_within_a_class():
+    scheduler = JobScheduler({"t:rr": 0}, shared_workers=1)
+
+    order = _run_after_blocker(scheduler, "t:rr", [
+        ("t:rr", "alice", "a1"),
+        ("t:rr", "alice", "a2"),
+        ("t:rr", "alice", "a3"),
+        ("t:rr", "bob", "b1"),
+        ("t:rr", "carol", "c1"),
+    ])
+
+    assert order == ["a1", "b1", "c1", "a2", "a3"]
+
+
+def test_strict_policy_drains_higher_priority_class_first():
+    scheduler = JobScheduler({"t:strict-high": 0, "t:strict-low": 0}, shared_workers=1, policy="strict")
+
+    order = _run_after_blocker(scheduler, "t:strict-low", [
+        ("t:strict-low", "u", "low1"),
+        ("t:strict-low", "u", "low2"),
+        ("t:strict-high", "u", "high1"),
+        ("t:strict-high", "u", "high2"),
+    ])
+
+    assert order == ["high1", "high2", "low1", "low2"]
+
+
+def test_weighted_policy_interleaves_by_weight():
+    scheduler = JobScheduler(
+        {"t:w-fast": 0, "t:w-slow": 0}, shared_workers=1, policy="weighted",
+        weights={"t:w-fast": 3, "t:w-slow": 1}
+    )
+
+    submissions = [("t:w-fast", "u", f"fast{i}") for i in range(6)]
+    submissions += [("t:w-slow", "u", f"slow{i}") for i in range(6)]
+    order = _run_after_blocker(scheduler, "t:w-fast", submissions)
+
+    first_eight = order[:8]
+    assert sum(label.startswith("fast") for label in first_eight) == 6
+    assert sum(label.startswith("slow") for label in first_eight) == 2
+
+
+def test_dedicated_budget_is_not_starved_by_other_class():
+    scheduler = JobScheduler({"t:busy": 1, "t:reserved": 1})
+    gate = threading.Event()
+
+    busy = scheduler.submit("t:busy", "u", gate.wait, 5)
+    reserved = scheduler.submit("t:reserved", "u", lambda: "done")
+
+    assert reserved.result(timeout=2) == "done"
+    assert not busy.done()
+    gate.set()
+    assert busy.result(timeout=2) is True
+
+
+def test_queue_depth_and_wait_are_exported_as_metrics():
+    scheduler = JobScheduler({"t:metrics": 0}, shared_workers=1)
+
+    _run_after_blocker(scheduler, "t:metrics", [("t:metrics", "u", i) for i in range(3)])
+
+    labels = {"queue": "t:metrics"}
+    assert REGISTRY.get_sample_value("curatify_scheduler_queue_depth", labels) == 0
+    assert REGISTRY.get_sample_value("curatify_scheduler_oldest_wait_seconds", labels) == 0
+    assert REGISTRY.get_sample_value("curatify_scheduler_wait_seconds_count", labels) == 4
+    assert scheduler.stats()["t:metrics"]["completed"] == 4
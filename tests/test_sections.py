@@ -0,0 +1,52 @@
+from arxiv_runner import ArXivRunner
+
+
+def _text(content):
+    return {"type": "text", "content": content}
+
+
+def test_shard_starting_without_title_continues_previous_section():
+    shards = [
+        ([{"title": "1 Intro", "chunks": [_text("a")]}], {"p0-picture-1.png": b"1"}),
+        ([{"title": "", "chunks": [_text("b")]}, {"title": "2 Method", "chunks": [_text("c")]}], {}),
+    ]
+
+    sections, images = ArXivRunner._merge_section_shards(shards)
+
+    assert sections == [
+        {"title": "1 Intro", "chunks": [_text("a\n\nb")]},
+        {"title": "2 Method", "chunks": [_text("c")]},
+    ]
+    assert images == {"p0-picture-1.png": b"1"}
+
+
+def test_title_only_sections_are_merged_into_next_section():
+    shards = [([
+        {"title": "3 Method", "chunks": []},
+        {"title": "3.1 Setup", "chunks": [_text("x")]},
+        {"title": "4 Results", "chunks": []},
+        {"title": "4.1 Main", "chunks": []},
+        {"title": "", "chunks": [_text("y")]},
+        {"title": "Appendix", "chunks": []},
+    ], {})]
+
+    sections, _ = ArXivRunner._merge_section_shards(shards)
+
+    assert sections == [
+        {"title": "3 Method / 3.1 Setup", "chunks": [_text("x")]},
+        {"title": "4 Results / 4.1 Main", "chunks": [_text("y")]},
+    ]
+
+
+def test_heading_at_page_boundary_keeps_body_from_next_shard():
+    shards = [
+        ([{"title": "1 Intro", "chunks": [_text("a")]}, {"title": "2 Method", "chunks": []}], {}),
+        ([{"title": "", "chunks": [_text("b")]}], {}),
+    ]
+
+    sections, _ = ArXivRunner._merge_section_shards(shards)
+
+    assert sections == [
+        {"title": "1 Intro", "chunks": [_text("a")]},
+        {"title": "2 Method", "chunks": [_text("b")]},
+    ]
@@ -0,0 +1,191 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import fakeredis
+import pytest
+import redis
+
+from stream_consumer import RedisStreamConsumer
+
+STREAM = "paper:test"
+GROUP = "test-group"
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setenv("STREAM_BLOCK_MS", "20")
+    monkeypatch.setenv("STREAM_RECLAIM_IDLE_MS", "300")
+    monkeypatch.setenv("STREAM_RECLAIM_INTERVAL_MS", "20")
+    monkeypatch.setenv("STREAM_MAX_DELIVERIES", "2")
+    return fakeredis.FakeServer()
+
+
+def _client(server):
+    return fakeredis.FakeRedis(server=server, decode_responses=True)
+
+
+def _start(server, handler, name="c1", concurrency=2):
+    consumer = RedisStreamConsumer(client=_client(server), group=GROUP, consumer_name=name)
+    consumer.subscribe(STREAM, concurrency=concurrency)(handler)
+    thread = threading.Thread(target=consumer.start, daemon=True)
+    thread.start()
+    assert _wait_until(lambda: _group_exists(server))
+    return consumer, thread
+
+
+def _group_exists(server) -> bool:
+    try:
+        return any(group["name"] == GROUP for group in _client(server).xinfo_groups(STREAM))
+    except redis.exceptions.ResponseError:
+        return False
+
+
+def _stop(consumer, thread):
+    consumer.stop()
+    thread.join(timeout=5)
+
+
+def _pending(server) -> int:
+    return _client(server).xpending(STREAM, GROUP)["pending"]
+
+
+def _wait_until(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_successful_message_is_acked(server):
+    handled = []
+    consumer, thread = _start(server, lambda msg: handled.append(msg) or True)
+    try:
+        _client(server).xadd(STREAM, {"data": "m1"})
+        assert _wait_until(lambda: handled == ["m1"])
+        assert _wait_until(lambda: _pending(server) == 0)
+    finally:
+        _stop(consumer, thread)
+
+
+def test_future_resolving_to_true_is_acked_after_completion(server):
+    future: Future = Future()
+    consumer, thread = _start(server, lambda msg: future)
+    try:
+        _client(server).xadd(STREAM, {"data": "m1"})
+        assert _wait_until(lambda: _pending(server) == 1)
+        time.sleep(0.1)
+        assert _pending(server) == 1
+        future.set_result(True)
+        assert _wait_until(lambda: _pending(server) == 0)
+    finally:
+        _stop(consumer, thread)
+
+
+@pytest.mark.parametrize("outcome", ["false", "none", "future_false", "future_error", "raise"])
+def test_failed_message_is_not_acked(server, outcome):
+    def handler(msg):
+        if outcome == "raise":
+            raise RuntimeError("boom")
+        if outcome.startswith("future"):
+            future: Future = Future()
+            if outcome == "future_false":
+                future.set_result(False)
+            else:
+                future.set_exception(RuntimeError("boom"))
+            return future
+        return False if outcome == "false" else None
+
+    calls = []
+    consumer, thread = _start(server, lambda msg: calls.append(msg) or handler(msg))
+    try:
+        _client(server).xadd(STREAM, {"data": "m1"})
+        assert _wait_until(lambda: len(calls) == 1)
+        time.sleep(0.1)
+        assert _pending(server) == 1
+    finally:
+        _stop(consumer, thread)
+
+
+def test_cancelled_future_releases_message_for_reclaim(server):
+    calls = []
+
+    def handler(msg):
+        calls.append(msg)
+        future: Future = Future()
+        if len(calls) == 1:
+            # 예: 스케줄러가 cancel_futures 로 종료되며 대기 중인 작업을 취소
+            future.cancel()
+        else:
+            future.set_result(True)
+        return future
+
+    consumer, thread = _start(server, handler)
+    try:
+        _client(server).xadd(STREAM, {"data": "m1"})
+        assert _wait_until(lambda: len(calls) == 2)
+        assert _wait_until(lambda: _pending(server) == 0)
+    finally:
+        _stop(consumer, thread)
+
+
+def test_failed_message_is_retried_then_dead_lettered(server):
+    calls = []
+    consumer, thread = _start(server, lambda msg: calls.append(msg) and False)
+    try:
+        entry_id = _client(server).xadd(STREAM, {"data": "m1"})
+        # 최초 전달 + 회수 후 재처리(최대 2회 전달), 이후 dead-letter
+        assert _wait_until(lambda: _client(server).xlen(f"{STREAM}:dead-letter") == 1)
+        assert calls == ["m1", "m1"]
+        assert _pending(server) == 0
+
+        _, fields = _client(server).xrange(f"{STREAM}:dead-letter")[0]
+        assert fields["data"] == "m1"
+        assert fields["source_id"] == entry_id
+    finally:
+        _stop(consumer, thread)
+
+
+def test_message_of_dead_consumer_is_reclaimed(server):
+    client = _client(server)
+    client.xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+    client.xadd(STREAM, {"data": "orphan"})
+    # 다른 컨슈머가 읽고 ACK 하지 못한 채 종료된 상태
+    client.xreadgroup(GROUP, "dead-consumer", {STREAM: ">"}, count=1)
+
+    handled = []
+    consumer, thread = _start(server, lambda msg: handled.append(msg) or True)
+    try:
+        assert _wait_until(lambda: handled == ["orphan"])
+        assert _wait_until(lambda: _pending(server) == 0)
+    finally:
+        _stop(consumer, thread)
+
+
+def test_long_running_message_is_not_reclaimed_while_in_flight(server):
+    release = threading.Event()
+    calls = []
+
+    def slow_handler(msg):
+        calls.append(msg)
+        release.wait(5)
+        return True
+
+    # c1은 슬롯이 가득 차 스스로 회수하지 않으므로 idle 시간 갱신으로만 보호됨
+    first, first_thread = _start(server, slow_handler, name="c1", concurrency=1)
+    second, second_thread = _start(server, slow_handler, name="c2")
+    try:
+        _client(server).xadd(STREAM, {"data": "long"})
+        assert _wait_until(lambda: len(calls) == 1)
+        # 회수 기준 idle 시간(300ms)보다 오래 처리
+        time.sleep(1.0)
+        assert calls == ["long"]
+        release.set()
+        assert _wait_until(lambda: _pending(server) == 0)
+        assert calls == ["long"]
+    finally:
+        release.set()
+        _stop(first, first_thread)
+        _stop(second, second_thread)
@@ -5,6 +5,18 @@ class ContentChunk(TypedDict):
     type: Literal["text", "img"]
     content: str
 
+class PackedChunk(ContentChunk, total=False):
+    # 텍스트 청크에 합쳐진 이미지 (<<IMG_n>> 자리표시자 순서)
+    images: List[str]
+    # 합쳐진 본문의 토큰 수 (프롬프트 템플릿 제외, 모델 라우팅에 사용)
+    tokens: int
+
+class Section(TypedDict):
+    # 섹션 제목 (첫 제목 이전의 본문은 빈 문자열)
+    title: str
+    # 문서 순서의 텍스트/이미지 청크 (이미지 청크의 content는 이미지 키)
+    chunks: List[ContentChunk]
+
 class ContentAnalysisResult(TypedDict):
     order: int
     contentTitle: str
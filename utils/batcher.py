@@ -0,0 +1,109 @@
+"""
+마이크로 배치 유틸리티
+
+짧은 시간 창 안에 들어온 요청들을 모아 한 번의 배치 호출로 처리하고,
+각 요청자에게 결과를 Future로 돌려줍니다.
+
+Author: Minseok kim
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class MicroBatcher(Generic[K, V]):
+    """시간 창/최대 크기 기준으로 요청을 모아 배치 함수를 호출하는 클래스"""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[K]], Dict[K, V]],
+        window_seconds: float,
+        max_batch_size: int,
+        name: str = "batcher",
+        max_concurrent_batches: int = 1
+    ):
+        """
+        Args:
+            batch_fn: 키 리스트를 받아 키 -> 결과 딕셔너리를 반환하는 함수 (결과가 없는 키는 None)
+            window_seconds: 첫 요청 이후 배치를 모으는 시간 (초)
+            max_batch_size: 배치 최대 크기 (도달 시 즉시 실행)
+            name: 스레드 이름
+            max_concurrent_batches: 동시에 처리할 배치 수 (1이면 배치 스레드에서 차례로 처리)
+        """
+        self.batch_fn = batch_fn
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        # 배치 함수가 느리면(LLM 호출 등) 다음 배치가 앞 배치를 기다리지 않도록 별도 스레드에서 처리
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_batches, thread_name_prefix=name
+        ) if max_concurrent_batches > 1 else None
+
+        self._pending: Dict[K, List[Future]] = {}
+        self._first_at: Optional[float] = None
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, name=name, daemon=True).start()
+
+    def submit(self, key: K) -> Future:
+        """
+        요청을 다음 배치에 추가합니다. 같은 키는 한 번만 조회됩니다.
+
+        Args:
+            key: 조회 키
+
+        Returns:
+            Future: 배치 결과가 설정되는 Future
+        """
+        future: Future = Future()
+        with self._cond:
+            if not self._pending:
+                self._first_at = time.monotonic()
+            self._pending.setdefault(key, []).append(future)
+            self._cond.notify()
+        return future
+
+    def get(self, key: K, timeout: Optional[float] = None) -> Optional[V]:
+        """submit 후 결과를 기다립니다."""
+        return self.submit(key).result(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # 시간 창이 끝나거나 배치가 가득 찰 때까지 대기
+                while len(self._pending) < self.max_batch_size:
+                    remaining = self._first_at + self.window_seconds - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                keys = list(self._pending)[:self.max_batch_size]
+                batch = {key: self._pending.pop(key) for key in keys}
+                self._first_at = time.monotonic() if self._pending else None
+
+            if self._executor is not None:
+                self._executor.submit(self._dispatch, batch)
+            else:
+                self._dispatch(batch)
+
+    def _dispatch(self, batch: Dict[K, List[Future]]):
+        try:
+            results = self.batch_fn(list(batch))
+        except Exception as e:
+            logger.error(f"배치 처리 중 오류 발생 ({len(batch)}건): {e}")
+            for futures in batch.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+
+        for key, futures in batch.items():
+            for future in futures:
+                future.set_result(results.get(key))
@@ -0,0 +1,220 @@
+"""
+LLM 분석용 청크 패킹 유틸리티
+
+이미지로 잘린 작은 텍스트 조각들을 토큰 예산 안에서 하나의 프롬프트로 합치고,
+예산을 넘는 조각은 문단/줄/문장/공백 경계에서 나눕니다. 합쳐진 텍스트 사이의 이미지는 <<IMG_n>> 자리표시자로 남겨
+LLM 응답에서 원래 위치로 복원합니다.
+
+Author: Minseok kim
+"""
+
+import logging
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Union
+
+from type import ContentChunk, PackedChunk
+
+logger = logging.getLogger(__name__)
+
+IMAGE_PLACEHOLDER = "<<IMG_{}>>"
+_PLACEHOLDER_PATTERN = re.compile(r"<<IMG_(\d+)>>")
+# 서로 다른 텍스트 청크를 합칠 때 사이에 넣는 구분자
+_JOINER = "\n\n"
+# 공백 다음, 공백이 아닌 문자 앞 (공백은 앞 단위에 붙음)
+_WHITESPACE_BOUNDARY = re.compile(r"(?<=\s)(?=\S)")
+
+_encoder = None
+_encoder_loaded = False
+_encoder_lock = threading.Lock()
+
+
+def _get_encoder():
+    """tiktoken 인코더를 반환합니다. (tiktoken이 없거나 인코딩을 불러올 수 없으면 None)"""
+    global _encoder, _encoder_loaded
+    if _encoder_loaded:
+        return _encoder
+    with _encoder_lock:
+        if not _encoder_loaded:
+            try:
+                import tiktoken
+                try:
+                    _encoder = tiktoken.encoding_for_model(os.getenv("OPENAI_MODEL", "gpt-4o-mini"))
+                except KeyError:
+                    _encoder = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                logger.info(f"tiktoken을 사용할 수 없어 문자 수로 토큰 수를 추정합니다: {e}")
+                _encoder = None
+            _encoder_loaded = True
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수를 계산합니다. tiktoken이 없으면 문자 4개당 1토큰으로 추정합니다.
+
+    Args:
+        text: 텍스트
+
+    Returns:
+        int: 토큰 수
+    """
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def count_prompt_tokens(prompt: Union[str, List[Dict[str, str]]]) -> int:
+    """
+    프롬프트(문자열 또는 메시지 리스트)의 토큰 수를 계산합니다.
+
+    Args:
+        prompt: 프롬프트 문자열 또는 {"role", "content"} 메시지 리스트
+
+    Returns:
+        int: 토큰 수 (메시지는 content만 셈)
+    """
+    if isinstance(prompt, str):
+        return count_tokens(prompt)
+    return count_tokens("\n".join(str(message.get("content", "")) for message in prompt))
+
+
+def split_oversized(text: str, max_tokens: int, counter: Callable[[str], int] = count_tokens) -> List[str]:
+    """
+    예산을 넘는 텍스트를 문단 -> 줄 -> 문장 -> 공백 -> 문자 순서의 경계에서 나눕니다.
+    구분자는 앞 조각 끝에 남기므로 조각들을 그대로 이어 붙이면 원래 텍스트가 됩니다.
+
+    Args:
+        text: 텍스트
+        max_tokens: 조각당 최대 토큰 수
+        counter: 토큰 수 계산 함수
+
+    Returns:
+        List[str]: 예산 이하의 텍스트 조각들 (원래 순서)
+    """
+    if counter(text) <= max_tokens:
+        return [text]
+
+    for separator in ("\n\n", "\n", ". ", None):
+        if separator is None:
+            units = _WHITESPACE_BOUNDARY.split(text)
+        else:
+            parts = text.split(separator)
+            units = [part + separator for part in parts[:-1]] + [parts[-1]]
+        units = [unit for unit in units if unit]
+        if len(units) == 1:
+            continue
+        pieces: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for unit in units:
+            unit_tokens = counter(unit)
+            if current and current_tokens + unit_tokens > max_tokens:
+                pieces.append("".join(current))
+                current, current_tokens = [], 0
+            current.append(unit)
+            current_tokens += unit_tokens
+        if current:
+            pieces.append("".join(current))
+        # 한 단위가 여전히 예산을 넘으면 더 작은 경계로 다시 나눔
+        return [p for piece in pieces for p in split_oversized(piece, max_tokens, counter)]
+
+    # 경계가 없으면 문자 수 기준으로 자름
+    size = max(1, len(text) * max_tokens // counter(text))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def pack_chunks(chunks: List[ContentChunk], max_tokens: int, counter: Callable[[str], int] = count_tokens) -> List[PackedChunk]:
+    """
+    텍스트/이미지 청크를 토큰 예산 단위의 프롬프트 청크로 재구성합니다.
+
+    - 인접한 텍스트 조각들은 사이의 이미지를 <<IMG_n>> 자리표시자로 바꾸어 예산 안에서 하나로 합칩니다.
+      (자리표시자와 구분자의 토큰 수도 예산에 포함)
+    - 합쳐지지 않는 경계에 있는 이미지는 원래 위치에 이미지 청크로 남습니다.
+    - 예산을 넘는 텍스트 조각은 split_oversized로 나누고, 같은 조각에서 나온 부분끼리는 구분자 없이 이어 붙입니다.
+
+    Args:
+        chunks: 섹션의 텍스트/이미지 청크
+        max_tokens: 프롬프트 청크당 최대 토큰 수
+        counter: 토큰 수 계산 함수
+
+    Returns:
+        List[PackedChunk]: 텍스트 청크는 합쳐진 본문, 자리표시자 순서의 이미지 목록(images)과 본문 토큰 수(tokens)를 가짐
+    """
+    out: List[PackedChunk] = []
+    texts: List[str] = []
+    images: List[str] = []
+    pending_images: List[str] = []
+    tokens = 0
+
+    def flush():
+        nonlocal texts, images, tokens
+        if texts:
+            out.append({"type": "text", "content": _JOINER.join(texts), "images": images, "tokens": tokens})
+        texts, images, tokens = [], [], 0
+
+    joiner_tokens = counter(_JOINER)
+
+    for chunk in chunks:
+        if chunk["type"] == "img":
+            if texts:
+                pending_images.append(chunk["content"])
+            else:
+                out.append(chunk)
+            continue
+
+        for index, piece in enumerate(split_oversized(chunk["content"], max_tokens, counter)):
+            piece_tokens = counter(piece)
+            if index > 0:
+                # 같은 조각에서 나뉜 부분은 원래 텍스트대로 이어 붙임 (사이에 이미지가 올 수 없음)
+                added_tokens = piece_tokens
+            else:
+                placeholders = [IMAGE_PLACEHOLDER.format(len(images) + i) for i in range(1, len(pending_images) + 1)]
+                added_tokens = sum(counter(p) for p in placeholders) + piece_tokens + joiner_tokens * (len(placeholders) + 1)
+            if texts and tokens + added_tokens <= max_tokens:
+                if index > 0:
+                    texts[-1] += piece
+                else:
+                    # 사이에 있던 이미지는 자리표시자로 합침
+                    images.extend(pending_images)
+                    texts.extend(placeholders)
+                    texts.append(piece)
+                tokens += added_tokens
+            else:
+                flush()
+                out.extend({"type": "img", "content": image} for image in pending_images)
+                texts, tokens = [piece], piece_tokens
+            pending_images = []
+
+    flush()
+    out.extend({"type": "img", "content": image} for image in pending_images)
+    return out
+
+
+def restore_image_placeholders(text: str, images: List[str]) -> str:
+    """
+    LLM 응답의 <<IMG_n>> 자리표시자를 원래 이미지 마크다운으로 바꿉니다.
+    응답에서 빠진 이미지는 끝에 순서대로 추가하고, 알 수 없는 자리표시자는 제거합니다.
+
+    Args:
+        text: LLM 응답
+        images: 자리표시자 순서의 이미지 마크다운 목록
+
+    Returns:
+        str: 이미지가 복원된 텍스트
+    """
+    used = set()
+
+    def replace(match: re.Match) -> str:
+        index = int(match.group(1))
+        if 1 <= index <= len(images) and index not in used:
+            used.add(index)
+            return f"\n{images[index - 1]}\n"
+        return ""
+
+    restored = _PLACEHOLDER_PATTERN.sub(replace, text)
+    missing = [f"\n{image}\n" for i, image in enumerate(images, start=1) if i not in used]
+    return "\n".join([restored, *missing]) if missing else restored
+
@@ -0,0 +1,100 @@
+"""
+업로드 전 이미지 후처리 유틸리티
+
+docling이 images_scale로 크게 렌더링한 그림을 업로드 전에 최대 크기로 줄이고,
+색 수가 적은 차트/도표는 무손실 PNG로, 사진 같은 이미지는 WebP로 인코딩합니다.
+
+환경변수:
+- IMAGE_OPTIMIZE: 후처리 사용 여부 (기본값: true)
+- IMAGE_MAX_DIM: 긴 변의 최대 픽셀 수 (기본값: 1600, 0이면 크기 유지)
+- IMAGE_FORMAT: auto | png | webp (기본값: auto)
+- IMAGE_GRAPHIC_MAX_COLORS: 이 값 이하의 색을 쓰는 이미지는 차트/도표로 판단 (기본값: 4096)
+- IMAGE_WEBP_QUALITY: WebP 품질 (기본값: 80)
+- IMAGE_PNG_PALETTE: 색이 256개 이하인 그래픽을 팔레트 PNG로 양자화할지 여부 (기본값: false)
+  축소 시 생긴 중간색이 팔레트로 합쳐지므로 손실이 있습니다. 끄면 PNG는 무손실(optimize)로만 다시 인코딩합니다.
+
+Author: Minseok kim
+"""
+
+import logging
+import os
+from io import BytesIO
+from typing import Tuple
+
+from PIL import Image
+
+from metrics import IMAGE_BYTES, timed
+
+logger = logging.getLogger(__name__)
+
+# 후처리 대상 형식 (GIF/SVG 등은 그대로 업로드)
+_RASTER_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+
+
+def _count_colors(image: Image.Image, max_colors: int) -> int:
+    """이미지의 색 수를 반환합니다. max_colors를 넘으면 max_colors + 1"""
+    colors = image.getcolors(maxcolors=max_colors)
+    return len(colors) if colors is not None else max_colors + 1
+
+
+def _encode(image: Image.Image, file_format: str, palette: bool) -> bytes:
+    buffer = BytesIO()
+    if file_format == "webp":
+        image.save(buffer, format="WEBP", quality=int(os.getenv("IMAGE_WEBP_QUALITY", "80")), method=4)
+    else:
+        if palette and image.mode in ("RGB", "L"):
+            # 색이 256개 이하인 그래픽은 팔레트 PNG로 저장 (축소 시 생긴 중간색은 팔레트로 합침, 손실 있음)
+            image = image.convert("P", palette=Image.Palette.ADAPTIVE, colors=256)
+        image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+@timed("image.optimize")
+def optimize_image(data: bytes, file_extension: str) -> Tuple[bytes, str]:
+    """
+    이미지를 최대 크기로 줄이고 내용에 맞는 형식으로 다시 인코딩합니다.
+    결과가 원본보다 크면 원본을 그대로 반환합니다.
+
+    Args:
+        data: 이미지 바이트
+        file_extension: 파일 확장자 (예: ".png")
+
+    Returns:
+        Tuple[bytes, str]: (이미지 바이트, 파일 확장자)
+    """
+    file_extension = file_extension.lower()
+    if os.getenv("IMAGE_OPTIMIZE", "true").lower() != "true" or file_extension not in _RASTER_EXTENSIONS:
+        return data, file_extension
+
+    try:
+        image = Image.open(BytesIO(data))
+        image.load()
+        if image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        # 축소하면 중간색이 생기므로 색 수는 원본 크기에서 셈
+        max_colors = int(os.getenv("IMAGE_GRAPHIC_MAX_COLORS", "4096"))
+        colors = _count_colors(image, max_colors)
+
+        max_dim = int(os.getenv("IMAGE_MAX_DIM", "1600"))
+        if max_dim > 0 and max(image.size) > max_dim:
+            image.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+
+        file_format = os.getenv("IMAGE_FORMAT", "auto").lower()
+        if file_format not in ("png", "webp"):
+            file_format = "png" if colors <= max_colors else "webp"
+
+        palette = colors <= 256 and os.getenv("IMAGE_PNG_PALETTE", "false").lower() == "true"
+        optimized = _encode(image, file_format, palette=palette)
+        if len(optimized) >= len(data):
+            optimized, optimized_extension = data, file_extension
+        else:
+            optimized_extension = f".{file_format}"
+    except Exception as e:
+        logger.error(f"이미지 후처리 실패, 원본을 업로드합니다: {e}")
+        return data, file_extension
+
+    IMAGE_BYTES.labels(stage="original").inc(len(data))
+    IMAGE_BYTES.labels(stage="optimized").inc(len(optimized))
+    logger.info(f"이미지 후처리: {len(data)} -> {len(optimized)} bytes ({optimized_extension})")
+    return optimized, optimized_extension
@@ -0,0 +1,57 @@
+"""
+워커 시작 시간 측정 유틸리티
+
+import와 초기화 단계별 소요 시간을 기록하여 시작이 느려진 원인을 찾을 수 있도록
+보고서(로그)와 Prometheus 게이지(curatify_startup_seconds)로 남깁니다.
+
+Author: Minseok kim
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    """워커 시작 단계별 소요 시간 기록"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """
+        단계 하나의 소요 시간을 기록하는 컨텍스트 매니저입니다.
+
+        Args:
+            name: 단계 이름 (예: "import arxiv_runner")
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - started))
+
+    def report(self) -> str:
+        """
+        단계별 소요 시간을 느린 순서로 로그에 남기고 메트릭으로 기록합니다.
+
+        Returns:
+            str: 보고서 문자열
+        """
+        from metrics import STARTUP_SECONDS
+
+        total = time.perf_counter() - self.started
+        lines = [f"워커 시작 완료: {total:.3f}s"]
+        for name, seconds in sorted(self.steps, key=lambda step: step[1], reverse=True):
+            lines.append(f"  {seconds:8.3f}s  {seconds / total * 100 if total else 0:5.1f}%  {name}")
+            STARTUP_SECONDS.labels(step=name).set(seconds)
+        STARTUP_SECONDS.labels(step="total").set(total)
+
+        report = "\n".join(lines)
+        logger.info(report)
+        return report
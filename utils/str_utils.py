@@ -4,8 +4,9 @@
 Author: Minseok kim
 """
 
+import os
 import re
-from typing import Optional, List, Union
+from typing import Callable, Optional, List, Union
 from type import ContentChunk
 
 
@@ -29,7 +30,8 @@ def convert_arxiv_url_to_pdf(arxiv_url: str) -> Optional[str]:
             paper_id = match.group(1)
             # 버전 번호 제거 (v1, v2 등)
             clean_id = paper_id.split('v')[0]
-            return f"https://arxiv.org/pdf/{clean_id}.pdf"
+            pdf_base_url = os.getenv("ARXIV_PDF_BASE_URL", "https://arxiv.org/pdf")
+            return f"{pdf_base_url}/{clean_id}.pdf"
         
         # 이미 PDF URL인 경우 그대로 반환
         if arxiv_url.endswith('.pdf'):
@@ -131,4 +133,45 @@ def replace_image_url_in_markdown(markdown_img: str, new_url: str) -> str:
         return markdown_img
         
     except Exception:
-        return markdown_img
\ No newline at end of file
+        return markdown_img
+
+def image_markdown(url: str) -> str:
+    """
+    이미지 URL(또는 이미지 키)을 마크다운 이미지 태그로 만듭니다.
+    
+    Args:
+        url: 이미지 URL 또는 이미지 키
+        
+    Returns:
+        str: 마크다운 이미지 태그 (예: "![Image](https://example.com/image.png)")
+    """
+    return f"![Image]({url})"
+
+
+def find_markdown_images(text: str) -> List[str]:
+    """
+    텍스트 안의 마크다운 이미지 태그를 순서대로 반환합니다.
+    
+    Args:
+        text: 마크다운 텍스트
+        
+    Returns:
+        List[str]: 마크다운 이미지 태그 목록
+    """
+    md_img = r'!\[[^\]]*?\]\([^\s)]+(?:\s+"[^"]*")?\)'
+    return re.findall(md_img, text)
+
+
+def replace_markdown_images(text: str, replace_fn: Callable[[str], str]) -> str:
+    """
+    텍스트 안의 모든 마크다운 이미지 태그를 replace_fn 결과로 대체합니다.
+    
+    Args:
+        text: 마크다운 텍스트
+        replace_fn: 마크다운 이미지 태그 -> 대체할 문자열
+        
+    Returns:
+        str: 이미지 태그가 대체된 텍스트
+    """
+    md_img = r'!\[[^\]]*?\]\([^\s)]+(?:\s+"[^"]*")?\)'
+    return re.sub(md_img, lambda match: replace_fn(match.group(0)), text)
@@ -0,0 +1,44 @@
+"""
+TTL 기반 인메모리 캐시
+
+Author: Minseok kim
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """만료 시간과 최대 크기를 가진 스레드 안전 LRU 캐시"""
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        """
+        Args:
+            ttl_seconds: 항목 유효 시간 (초)
+            max_size: 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목 제거)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)